@@ -5,6 +5,7 @@
 
 use criterion::{criterion_group, criterion_main, BenchmarkId, Criterion, Throughput};
 use mopaq::{compression::flags, Archive, ArchiveBuilder, FormatVersion};
+use rand::{rngs::StdRng, Rng, SeedableRng};
 use std::hint::black_box;
 use std::path::Path;
 use tempfile::TempDir;
@@ -16,22 +17,12 @@ fn generate_test_data(size: usize, compressibility: &str) -> Vec<u8> {
         "medium" => {
             // Repeating pattern
             let pattern = b"The quick brown fox jumps over the lazy dog. ";
-            let mut data = Vec::with_capacity(size);
-            while data.len() < size {
-                let remaining = size - data.len();
-                let to_copy = remaining.min(pattern.len());
-                data.extend_from_slice(&pattern[..to_copy]);
-            }
-            data
+            pattern.iter().cycle().take(size).copied().collect()
         }
         "low" => {
-            // Pseudo-random data
-            let mut data = Vec::with_capacity(size);
-            let mut seed = 0x12345678u32;
-            for _ in 0..size {
-                seed = seed.wrapping_mul(1664525).wrapping_add(1013904223);
-                data.push((seed >> 16) as u8);
-            }
+            // Pseudo-random data, filled in bulk from a seeded generator
+            let mut data = vec![0u8; size];
+            StdRng::seed_from_u64(0x12345678).fill(&mut data[..]);
             data
         }
         _ => panic!("Unknown compressibility level"),
@@ -0,0 +1,34 @@
+//! Helpers shared by the examples
+
+/// Run `job` over every item, returning the results in item order
+///
+/// A single item runs on the calling thread; otherwise each item gets its own
+/// scoped thread, since the examples only fan out a handful of independent,
+/// heavyweight jobs. A panic on a worker is resumed on the calling thread.
+pub fn run_concurrently<T, R, F>(items: &[T], job: F) -> Vec<R>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&T) -> R + Sync,
+{
+    if items.len() < 2 {
+        return items.iter().map(job).collect();
+    }
+
+    std::thread::scope(|scope| {
+        let job = &job;
+        let handles: Vec<_> = items
+            .iter()
+            .map(|item| scope.spawn(move || job(item)))
+            .collect();
+
+        handles
+            .into_iter()
+            .map(|handle| {
+                handle
+                    .join()
+                    .unwrap_or_else(|panic| std::panic::resume_unwind(panic))
+            })
+            .collect()
+    })
+}
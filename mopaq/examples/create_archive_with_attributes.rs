@@ -18,61 +18,55 @@ fn main() -> Result<(), Box<dyn Error>> {
         ("data/file2.dat", b"More binary data"),
     ];
 
-    // Calculate attributes for ALL files (including special files)
-    let mut file_attributes = Vec::new();
-
-    // Add attributes for regular files
-    for (_name, content) in &files {
-        let mut attrs = FileAttributes::new();
-        attrs.crc32 = Some(crc32(content));
-        attrs.md5 = Some(md5(content));
-        attrs.filetime = Some(current_filetime());
-        attrs.is_patch = Some(false);
-        file_attributes.push(attrs);
+    // The listfile will be auto-generated by the builder; build the same
+    // content here so its attributes can be calculated
+    let mut listfile_content = Vec::new();
+    for (name, _) in &files {
+        listfile_content.extend_from_slice(name.as_bytes());
+        listfile_content.extend_from_slice(b"\r\n");
     }
+    listfile_content.extend_from_slice(b"(attributes)\r\n(listfile)\r\n");
+
+    // Every file shares the same build timestamp
+    let filetime = current_filetime();
 
-    // Add dummy attributes for (attributes) file itself
-    let mut attrs = FileAttributes::new();
-    attrs.crc32 = Some(0); // Will be calculated later
-    attrs.md5 = Some([0; 16]); // Will be calculated later
-    attrs.filetime = Some(current_filetime());
-    attrs.is_patch = Some(false);
-    file_attributes.push(attrs);
-
-    // Add attributes for (listfile)
-    // The listfile will be auto-generated by the builder
-    let listfile_content = files
+    // Calculate attributes for ALL files in one pass: the regular files, a
+    // placeholder for the (attributes) file itself and the (listfile)
+    let attributes_placeholder = FileAttributes {
+        crc32: Some(0),     // Will be calculated later
+        md5: Some([0; 16]), // Will be calculated later
+        ..FileAttributes::new()
+    };
+    let file_attributes = files
         .iter()
-        .map(|(name, _)| format!("{}\r\n", name))
-        .collect::<String>()
-        + "(attributes)\r\n(listfile)\r\n";
-    let mut attrs = FileAttributes::new();
-    attrs.crc32 = Some(crc32(listfile_content.as_bytes()));
-    attrs.md5 = Some(md5(listfile_content.as_bytes()));
-    attrs.filetime = Some(current_filetime());
-    attrs.is_patch = Some(false);
-    file_attributes.push(attrs);
+        .map(|(_name, content)| FileAttributes::from_data(content))
+        .chain([
+            attributes_placeholder,
+            FileAttributes::from_data(&listfile_content),
+        ])
+        .map(|attrs| FileAttributes {
+            filetime: Some(filetime),
+            is_patch: Some(false),
+            ..attrs
+        })
+        .collect();
 
     // Create the attributes structure
-    let attributes = Attributes {
+    let mut attributes = Attributes {
         version: Attributes::EXPECTED_VERSION,
         flags: AttributeFlags::new(AttributeFlags::ALL),
-        file_attributes: file_attributes.clone(),
+        file_attributes,
     };
 
     // Convert attributes to bytes
     let attributes_data = attributes.to_bytes()?;
 
-    // Update the (attributes) entry with correct CRC32 and MD5
-    file_attributes[files.len()].crc32 = Some(crc32(&attributes_data));
-    file_attributes[files.len()].md5 = Some(md5(&attributes_data));
-
-    // Recreate attributes with updated data
-    let attributes = Attributes {
-        version: Attributes::EXPECTED_VERSION,
-        flags: AttributeFlags::new(AttributeFlags::ALL),
-        file_attributes,
-    };
+    // Update the (attributes) entry in place with the correct CRC32 and MD5,
+    // then serialize again
+    let checksums = FileAttributes::from_data(&attributes_data);
+    let own_attributes = &mut attributes.file_attributes[files.len()];
+    own_attributes.crc32 = checksums.crc32;
+    own_attributes.md5 = checksums.md5;
     let attributes_data = attributes.to_bytes()?;
 
     // Create the archive
@@ -103,19 +97,6 @@ fn main() -> Result<(), Box<dyn Error>> {
 
 // Helper functions
 
-fn crc32(data: &[u8]) -> u32 {
-    let mut hasher = crc32fast::Hasher::new();
-    hasher.update(data);
-    hasher.finalize()
-}
-
-fn md5(data: &[u8]) -> [u8; 16] {
-    use md5::{Digest, Md5};
-    let mut hasher = Md5::new();
-    hasher.update(data);
-    hasher.finalize().into()
-}
-
 fn current_filetime() -> u64 {
     // Windows FILETIME: 100-nanosecond intervals since January 1, 1601
     // For simplicity, we'll use a fixed timestamp
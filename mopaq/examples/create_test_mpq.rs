@@ -6,10 +6,16 @@
 //!     cargo run --example create_test_mpq -- minimal --version 1
 //!     cargo run --example create_test_mpq -- compressed --compression zlib
 //!     cargo run --example create_test_mpq -- all
+//!     cargo run --example create_test_mpq -- all --verify
 
-use mopaq::{compression, ArchiveBuilder, FormatVersion, ListfileOption};
+use mopaq::{compression, Archive, ArchiveBuilder, FormatVersion, ListfileOption};
 use std::env;
-use std::path::Path;
+use std::path::{Path, PathBuf};
+
+mod common;
+
+/// An archive builder returning the path of the archive it created
+type BuildJob<'a> = Box<dyn Fn() -> Result<PathBuf, Box<dyn std::error::Error>> + Sync + 'a>;
 
 fn main() -> Result<(), Box<dyn std::error::Error>> {
     let args: Vec<String> = env::args().collect();
@@ -27,6 +33,7 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
         eprintln!("  --version <1-4>       - MPQ version (for minimal/comprehensive)");
         eprintln!("  --compression <type>  - Compression type (for compressed)");
         eprintln!("  --output-dir <dir>    - Output directory (default: test-data)");
+        eprintln!("  --verify              - Re-open the created archives and read every file");
         std::process::exit(1);
     }
 
@@ -34,6 +41,7 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
     let mut output_dir = "test-data";
     let mut version = 2; // Default to v2
     let mut compression_type = "zlib";
+    let mut verify = false;
 
     // Parse options
     let mut i = 2;
@@ -51,6 +59,10 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
                 compression_type = &args[i + 1];
                 i += 2;
             }
+            "--verify" => {
+                verify = true;
+                i += 1;
+            }
             _ => {
                 eprintln!("Unknown option: {}", args[i]);
                 std::process::exit(1);
@@ -61,28 +73,44 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
     let output_path = Path::new(output_dir);
     std::fs::create_dir_all(output_path)?;
 
+    let mut created = Vec::new();
+
     if archive_type == "all" {
         println!("Creating all test archives in: {}", output_path.display());
 
+        let mut jobs: Vec<BuildJob<'_>> = Vec::new();
+
         // Create minimal archives for each version
         for v in 1..=4 {
-            create_minimal_archive(output_path, v)?;
+            jobs.push(Box::new(move || create_minimal_archive(output_path, v)));
         }
 
         // Create compressed archives
         for comp in ["zlib", "bzip2", "lzma", "sparse"] {
-            create_compressed_archive(output_path, comp)?;
+            jobs.push(Box::new(move || {
+                create_compressed_archive(output_path, comp)
+            }));
         }
 
         // Create other test archives
-        create_encrypted_archive(output_path)?;
-        create_edge_cases_archive(output_path)?;
-        create_comprehensive_archive(output_path, 2)?;
-        create_comprehensive_archive(output_path, 4)?;
+        jobs.push(Box::new(|| create_encrypted_archive(output_path)));
+        jobs.push(Box::new(|| create_edge_cases_archive(output_path)));
+        jobs.push(Box::new(|| create_comprehensive_archive(output_path, 2)));
+        jobs.push(Box::new(|| create_comprehensive_archive(output_path, 4)));
+
+        // The archives are independent, so build them all concurrently. The
+        // builders' boxed errors aren't `Send`, so they are turned into their
+        // messages before leaving the worker threads.
+        let results: Vec<Result<PathBuf, String>> =
+            common::run_concurrently(&jobs, |job| job().map_err(|e| e.to_string()));
+
+        for result in results {
+            created.push(result?);
+        }
 
         println!("\nAll test archives created successfully!");
     } else {
-        match archive_type.as_str() {
+        created.push(match archive_type.as_str() {
             "minimal" => create_minimal_archive(output_path, version)?,
             "compressed" => create_compressed_archive(output_path, compression_type)?,
             "encrypted" => create_encrypted_archive(output_path)?,
@@ -92,16 +120,41 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
                 eprintln!("Unknown archive type: {}", archive_type);
                 std::process::exit(1);
             }
+        });
+    }
+
+    // Verify in this process instead of running storm-cli once per archive
+    if verify {
+        for archive_path in &created {
+            verify_archive(archive_path)?;
         }
     }
 
     Ok(())
 }
 
+/// Open a created archive and read back every listed file
+fn verify_archive(archive_path: &Path) -> Result<(), Box<dyn std::error::Error>> {
+    let mut archive = Archive::open(archive_path)?;
+    let entries = archive.list()?;
+
+    for entry in &entries {
+        archive.read_file(&entry.name)?;
+    }
+
+    println!(
+        "Verified {}: {} files readable",
+        archive_path.display(),
+        entries.len()
+    );
+
+    Ok(())
+}
+
 fn create_minimal_archive(
     output_path: &Path,
     version: u8,
-) -> Result<(), Box<dyn std::error::Error>> {
+) -> Result<PathBuf, Box<dyn std::error::Error>> {
     let format_version = match version {
         1 => FormatVersion::V1,
         2 => FormatVersion::V2,
@@ -130,13 +183,13 @@ fn create_minimal_archive(
 
     builder.build(&archive_path)?;
 
-    Ok(())
+    Ok(archive_path)
 }
 
 fn create_compressed_archive(
     output_path: &Path,
     compression_type: &str,
-) -> Result<(), Box<dyn std::error::Error>> {
+) -> Result<PathBuf, Box<dyn std::error::Error>> {
     let compression_flag = match compression_type {
         "zlib" => compression::flags::ZLIB,
         "bzip2" => compression::flags::BZIP2,
@@ -177,10 +230,10 @@ fn create_compressed_archive(
 
     builder.build(&archive_path)?;
 
-    Ok(())
+    Ok(archive_path)
 }
 
-fn create_encrypted_archive(output_path: &Path) -> Result<(), Box<dyn std::error::Error>> {
+fn create_encrypted_archive(output_path: &Path) -> Result<PathBuf, Box<dyn std::error::Error>> {
     let archive_path = output_path.join("encrypted.mpq");
     println!("Creating encrypted archive: {}", archive_path.display());
 
@@ -208,10 +261,10 @@ fn create_encrypted_archive(output_path: &Path) -> Result<(), Box<dyn std::error
 
     builder.build(&archive_path)?;
 
-    Ok(())
+    Ok(archive_path)
 }
 
-fn create_edge_cases_archive(output_path: &Path) -> Result<(), Box<dyn std::error::Error>> {
+fn create_edge_cases_archive(output_path: &Path) -> Result<PathBuf, Box<dyn std::error::Error>> {
     let archive_path = output_path.join("edge_cases.mpq");
     println!("Creating edge cases archive: {}", archive_path.display());
 
@@ -247,13 +300,13 @@ fn create_edge_cases_archive(output_path: &Path) -> Result<(), Box<dyn std::erro
 
     builder.build(&archive_path)?;
 
-    Ok(())
+    Ok(archive_path)
 }
 
 fn create_comprehensive_archive(
     output_path: &Path,
     version: u8,
-) -> Result<(), Box<dyn std::error::Error>> {
+) -> Result<PathBuf, Box<dyn std::error::Error>> {
     let format_version = match version {
         1 => FormatVersion::V1,
         2 => FormatVersion::V2,
@@ -292,10 +345,7 @@ fn create_comprehensive_archive(
     );
 
     // Binary pattern
-    let mut binary_data = Vec::with_capacity(10 * 1024);
-    for i in 0..10 * 1024 {
-        binary_data.push((i & 0xFF) as u8);
-    }
+    let binary_data: Vec<u8> = (0..=u8::MAX).cycle().take(10 * 1024).collect();
     builder = builder.add_file_data_with_options(
         binary_data,
         "data/binary.dat",
@@ -328,8 +378,8 @@ fn create_comprehensive_archive(
     if version >= 2 {
         // Simple attributes (just version and flags)
         let attributes = [
-            100u32.to_le_bytes().to_vec(),  // Version
-            0x03u32.to_le_bytes().to_vec(), // Flags (CRC32 + TIMESTAMP)
+            100u32.to_le_bytes(),  // Version
+            0x03u32.to_le_bytes(), // Flags (CRC32 + TIMESTAMP)
         ]
         .concat();
         builder = builder.add_file_data(attributes, "(attributes)");
@@ -337,5 +387,5 @@ fn create_comprehensive_archive(
 
     builder.build(&archive_path)?;
 
-    Ok(())
+    Ok(archive_path)
 }
@@ -7,10 +7,13 @@
 //!     cargo run --example generate_test_data -- all
 
 use rand::{rngs::StdRng, Rng, SeedableRng};
+use std::collections::HashSet;
 use std::env;
 use std::fs;
 use std::path::{Path, PathBuf};
 
+mod common;
+
 // Re-implement the test data generation logic here
 // (In a real project, this would be in a separate crate or workspace member)
 
@@ -239,10 +242,14 @@ fn generate_test_data(
         fs::remove_dir_all(&output_dir)?;
     }
 
+    // Remember the directories created up front so file parents aren't recreated
+    let mut created_dirs = HashSet::new();
     fs::create_dir_all(&output_dir)?;
-
+    created_dirs.insert(output_dir.clone());
     for dir in &config.directories {
-        fs::create_dir_all(output_dir.join(dir))?;
+        let dir_path = output_dir.join(dir);
+        fs::create_dir_all(&dir_path)?;
+        created_dirs.insert(dir_path);
     }
 
     let mut files_created = Vec::new();
@@ -250,8 +257,11 @@ fn generate_test_data(
     for file_config in &config.files {
         let file_path = output_dir.join(&file_config.path);
 
+        // Only create each parent directory once
         if let Some(parent) = file_path.parent() {
-            fs::create_dir_all(parent)?;
+            if created_dirs.insert(parent.to_path_buf()) {
+                fs::create_dir_all(parent)?;
+            }
         }
 
         match file_config.file_type {
@@ -280,15 +290,7 @@ fn generate_test_data(
 fn generate_text_content(size_kb: usize) -> Vec<u8> {
     let target_size = size_kb * 1024;
     let pattern = b"The quick brown fox jumps over the lazy dog. ";
-    let mut content = Vec::with_capacity(target_size);
-
-    while content.len() < target_size {
-        let remaining = target_size - content.len();
-        let to_copy = remaining.min(pattern.len());
-        content.extend_from_slice(&pattern[..to_copy]);
-    }
-
-    content
+    pattern.iter().cycle().take(target_size).copied().collect()
 }
 
 fn generate_binary_content(size_kb: usize) -> Vec<u8> {
@@ -342,9 +344,13 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
     println!("Generating test data in: {}", output_base.display());
     println!();
 
-    for config in configs {
+    // Each configuration writes its own directory tree, so generate them concurrently
+    let results =
+        common::run_concurrently(&configs, |config| generate_test_data(output_base, config));
+
+    for (config, result) in configs.iter().zip(results) {
         println!("Creating '{}': {}", config.name, config.description);
-        let result = generate_test_data(output_base, &config)?;
+        let result = result?;
         println!(
             "  Created {} files in {}",
             result.files_created.len(),
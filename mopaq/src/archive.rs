@@ -11,7 +11,9 @@
 use crate::{
     builder::ArchiveBuilder,
     compression,
-    crypto::{decrypt_block, decrypt_dword, hash_string, hash_type},
+    crypto::{
+        decrypt_bytes, decrypt_dword, hash_string, hash_type, BLOCK_TABLE_KEY, HASH_TABLE_KEY,
+    },
     header::{self, MpqHeader, UserDataHeader},
     special_files,
     tables::{BetTable, BlockTable, HashTable, HetTable, HiBlockTable},
@@ -21,17 +23,6 @@ use std::fs::File;
 use std::io::{BufReader, Read, Seek, SeekFrom};
 use std::path::{Path, PathBuf};
 
-/// Helper trait for reading little-endian integers
-trait ReadLittleEndian: Read {
-    fn read_u32_le(&mut self) -> Result<u32> {
-        let mut buf = [0u8; 4];
-        self.read_exact(&mut buf)?;
-        Ok(u32::from_le_bytes(buf))
-    }
-}
-
-impl<R: Read> ReadLittleEndian for R {}
-
 /// Detailed information about an MPQ archive
 #[derive(Debug, Clone)]
 pub struct ArchiveInfo {
@@ -369,7 +360,7 @@ impl Archive {
                         );
 
                         // HET table key is based on table name
-                        let key = hash_string("(hash table)", hash_type::FILE_KEY);
+                        let key = HASH_TABLE_KEY;
 
                         match HetTable::read(
                             &mut self.reader,
@@ -425,7 +416,7 @@ impl Archive {
                         );
 
                         // BET table key is based on table name
-                        let key = hash_string("(block table)", hash_type::FILE_KEY);
+                        let key = BLOCK_TABLE_KEY;
 
                         match BetTable::read(
                             &mut self.reader,
@@ -531,7 +522,9 @@ impl Archive {
             None => return Ok(None),
         };
 
-        // Helper function to calculate MD5 of raw table data
+        // Helper function to calculate MD5 of raw table data, reusing one read
+        // buffer for all tables
+        let mut table_data = Vec::new();
         let mut validate_table_md5 =
             |expected: &[u8; 16], offset: u64, size: u64| -> Result<bool> {
                 if size == 0 {
@@ -541,13 +534,11 @@ impl Archive {
                 // Read raw table data
                 self.reader
                     .seek(SeekFrom::Start(self.archive_offset + offset))?;
-                let mut table_data = vec![0u8; size as usize];
+                table_data.resize(size as usize, 0);
                 self.reader.read_exact(&mut table_data)?;
 
                 // Calculate MD5
-                let mut hasher = Md5::new();
-                hasher.update(&table_data);
-                let actual_md5: [u8; 16] = hasher.finalize().into();
+                let actual_md5: [u8; 16] = Md5::digest(&table_data).into();
 
                 Ok(actual_md5 == *expected)
             };
@@ -609,12 +600,10 @@ impl Archive {
         // Validate header MD5 (first 192 bytes of header, excluding the MD5 field itself)
         let header_valid = {
             self.reader.seek(SeekFrom::Start(self.archive_offset))?;
-            let mut header_data = vec![0u8; 192];
+            let mut header_data = [0u8; 192];
             self.reader.read_exact(&mut header_data)?;
 
-            let mut hasher = Md5::new();
-            hasher.update(&header_data);
-            let actual_md5: [u8; 16] = hasher.finalize().into();
+            let actual_md5: [u8; 16] = Md5::digest(header_data).into();
 
             actual_md5 == v4_data.md5_mpq_header
         };
@@ -1126,10 +1115,9 @@ impl Archive {
     pub fn list_with_hashes(&mut self) -> Result<Vec<FileEntry>> {
         let mut entries = self.list()?;
 
-        // Calculate hashes for each entry
+        // Calculate both name hashes for each entry in a single pass over the name
         for entry in &mut entries {
-            let hash1 = crate::crypto::hash_string(&entry.name, crate::crypto::hash_type::NAME_A);
-            let hash2 = crate::crypto::hash_string(&entry.name, crate::crypto::hash_type::NAME_B);
+            let (_, hash1, hash2) = crate::crypto::hash_string_lookup(&entry.name);
             entry.hashes = Some((hash1, hash2));
         }
 
@@ -1271,6 +1259,30 @@ impl Archive {
                 }
             }
 
+            // Decompress if needed
+            let data = if file_info.is_compressed() {
+                // All compressed files should have a compression type byte prefix
+                // This matches StormLib's behavior
+                if data.is_empty() {
+                    return Err(Error::compression("Empty compressed data"));
+                }
+                let compression_type = data[0];
+                let compressed_data = &data[1..];
+                log::debug!(
+                    "Decompressing file: type=0x{:02X}, compressed_size={}, expected_size={}",
+                    compression_type,
+                    compressed_data.len(),
+                    actual_file_size
+                );
+                compression::decompress(
+                    compressed_data,
+                    compression_type,
+                    actual_file_size as usize,
+                )?
+            } else {
+                data
+            };
+
             // Validate CRC if present for single unit files
             if file_info.has_sector_crc() && file_info.is_single_unit() {
                 // For single unit files, there's one CRC after the data
@@ -1278,22 +1290,10 @@ impl Archive {
                 self.reader.read_exact(&mut crc_bytes)?;
                 let expected_crc = u32::from_le_bytes(crc_bytes);
 
-                // CRC is calculated on the decompressed data
-                let data_to_check = if file_info.is_compressed() {
-                    // We need to decompress first to check CRC
-                    let compression_type = data[0];
-                    let compressed_data = &data[1..];
-                    compression::decompress(
-                        compressed_data,
-                        compression_type,
-                        actual_file_size as usize,
-                    )?
-                } else {
-                    data.clone()
-                };
-
+                // CRC is calculated on the decompressed data, which is checked
+                // in place rather than copied or decompressed a second time.
                 // MPQ uses ADLER32 for sector checksums, not CRC32 despite the name
-                let actual_crc = adler::adler32_slice(&data_to_check);
+                let actual_crc = adler::adler32_slice(&data);
                 if actual_crc != expected_crc {
                     return Err(Error::ChecksumMismatch {
                         file: name.to_string(),
@@ -1305,30 +1305,7 @@ impl Archive {
                 log::debug!("Single unit file CRC validated: 0x{:08X}", actual_crc);
             }
 
-            // Decompress if needed
-            if file_info.is_compressed() {
-                // All compressed files should have a compression type byte prefix
-                // This matches StormLib's behavior
-                if !data.is_empty() {
-                    let compression_type = data[0];
-                    let compressed_data = &data[1..];
-                    log::debug!(
-                        "Decompressing file: type=0x{:02X}, compressed_size={}, expected_size={}",
-                        compression_type,
-                        compressed_data.len(),
-                        actual_file_size
-                    );
-                    compression::decompress(
-                        compressed_data,
-                        compression_type,
-                        actual_file_size as usize,
-                    )
-                } else {
-                    Err(Error::compression("Empty compressed data"))
-                }
-            } else {
-                Ok(data)
-            }
+            Ok(data)
         } else {
             // Multi-sector compressed file
             self.read_sectored_file(&file_info, key)
@@ -1359,11 +1336,7 @@ impl Archive {
         }
 
         // Parse sector offsets
-        let mut sector_offsets = Vec::with_capacity(sector_count + 1);
-        let mut cursor = std::io::Cursor::new(&offset_data);
-        for _ in 0..=sector_count {
-            sector_offsets.push(cursor.read_u32_le()?);
-        }
+        let sector_offsets = u32s_from_le_bytes(&offset_data);
 
         log::debug!(
             "Sector offsets: first={}, last={}",
@@ -1386,11 +1359,7 @@ impl Archive {
                 self.reader.read_exact(&mut crc_data)?;
 
                 // CRC table is not encrypted
-                let mut crcs = Vec::with_capacity(sector_count);
-                let mut cursor = std::io::Cursor::new(&crc_data);
-                for _ in 0..sector_count {
-                    crcs.push(cursor.read_u32_le()?);
-                }
+                let crcs = u32s_from_le_bytes(&crc_data);
 
                 // Log before moving
                 log::debug!(
@@ -1760,43 +1729,22 @@ impl Archive {
     }
 }
 
+/// Parse a table of little-endian u32 values (sector offsets or checksums) in one pass
+fn u32s_from_le_bytes(data: &[u8]) -> Vec<u32> {
+    data.chunks_exact(4)
+        .map(|chunk| u32::from_le_bytes([chunk[0], chunk[1], chunk[2], chunk[3]]))
+        .collect()
+}
+
 /// Decrypt file data in-place
 fn decrypt_file_data(data: &mut [u8], key: u32) {
     if data.is_empty() || key == 0 {
         return;
     }
 
-    // Process full u32 chunks
+    // Decrypt full u32 chunks in place
     let chunks = data.len() / 4;
-    if chunks > 0 {
-        // Create a properly aligned u32 slice
-        let mut u32_data = Vec::with_capacity(chunks);
-
-        // Copy data as u32 values (little-endian)
-        for i in 0..chunks {
-            let offset = i * 4;
-            let value = u32::from_le_bytes([
-                data[offset],
-                data[offset + 1],
-                data[offset + 2],
-                data[offset + 3],
-            ]);
-            u32_data.push(value);
-        }
-
-        // Decrypt the u32 data
-        decrypt_block(&mut u32_data, key);
-
-        // Copy back to byte array
-        for (i, &value) in u32_data.iter().enumerate() {
-            let offset = i * 4;
-            let bytes = value.to_le_bytes();
-            data[offset] = bytes[0];
-            data[offset + 1] = bytes[1];
-            data[offset + 2] = bytes[2];
-            data[offset + 3] = bytes[3];
-        }
-    }
+    decrypt_bytes(data, key);
 
     // Handle remaining bytes if not aligned to 4
     let remainder = data.len() % 4;
@@ -1926,7 +1874,7 @@ impl FileEntry {
 #[cfg(test)]
 mod tests {
     use super::*;
-    use crate::encrypt_block;
+    use crate::crypto::encrypt_bytes;
 
     #[test]
     fn test_open_options() {
@@ -1960,42 +1908,8 @@ mod tests {
         let mut data = vec![0x12, 0x34, 0x56, 0x78, 0x9A, 0xBC, 0xDE, 0xF0];
         let original = data.clone();
 
-        // For testing, we need an encrypt function
-        fn encrypt_test_data(data: &mut [u8], key: u32) {
-            if data.is_empty() || key == 0 {
-                return;
-            }
-
-            // Convert to u32 for encryption
-            let chunks = data.len() / 4;
-            if chunks > 0 {
-                let mut u32_data = Vec::with_capacity(chunks);
-                for i in 0..chunks {
-                    let offset = i * 4;
-                    let value = u32::from_le_bytes([
-                        data[offset],
-                        data[offset + 1],
-                        data[offset + 2],
-                        data[offset + 3],
-                    ]);
-                    u32_data.push(value);
-                }
-
-                encrypt_block(&mut u32_data, key);
-
-                for (i, &value) in u32_data.iter().enumerate() {
-                    let offset = i * 4;
-                    let bytes = value.to_le_bytes();
-                    data[offset] = bytes[0];
-                    data[offset + 1] = bytes[1];
-                    data[offset + 2] = bytes[2];
-                    data[offset + 3] = bytes[3];
-                }
-            }
-        }
-
         // Encrypt
-        encrypt_test_data(&mut data, 0xDEADBEEF);
+        encrypt_bytes(&mut data, 0xDEADBEEF);
         assert_ne!(data, original, "Data should be changed after encryption");
 
         // Decrypt
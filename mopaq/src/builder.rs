@@ -1,15 +1,22 @@
 //! Archive builder for creating MPQ archives
 
 use crate::{
-    compression::{compress, flags as compression_flags},
-    crypto::{encrypt_block, hash_string, hash_type, jenkins_hash},
+    compression::{
+        compress, compress_with_checksum, compress_with_level, flags as compression_flags,
+    },
+    crypto::{
+        encrypt_block, encrypt_bytes, hash_string, hash_string_lookup, hash_type, jenkins_hash,
+        BLOCK_TABLE_KEY, HASH_TABLE_KEY,
+    },
     header::{FormatVersion, MpqHeaderV4Data},
+    parallel::{map_chunks, worker_count},
     tables::{BetHeader, BlockEntry, BlockTable, HashEntry, HashTable, HetHeader, HiBlockTable},
     Error, Result,
 };
 use md5::{Digest, Md5};
+use std::borrow::Cow;
 use std::fs::{self};
-use std::io::{Read, Seek, SeekFrom, Write};
+use std::io::{BufWriter, Read, Seek, SeekFrom, Write};
 use std::path::{Path, PathBuf};
 use tempfile::NamedTempFile;
 
@@ -29,10 +36,75 @@ trait WriteLittleEndian: Write {
         self.write_all(&value.to_le_bytes())?;
         Ok(())
     }
+
+    /// Pack a u32 table into a stack buffer and write it in as few calls as possible
+    ///
+    /// Tables of up to 256 entries (e.g. the sector offsets and CRCs of files up
+    /// to 1 MiB with 4 KiB sectors) go out in a single write without a heap
+    /// allocation.
+    fn write_u32_slice_le(&mut self, values: &[u32]) -> Result<()> {
+        let mut buffer = [0u8; 1024];
+        for chunk in values.chunks(buffer.len() / 4) {
+            for (bytes, value) in buffer.chunks_exact_mut(4).zip(chunk) {
+                bytes.copy_from_slice(&value.to_le_bytes());
+            }
+            self.write_all(&buffer[..chunk.len() * 4])?;
+        }
+        Ok(())
+    }
 }
 
 impl<W: Write> WriteLittleEndian for W {}
 
+/// Buffer size used when streaming v1/v2 archives to disk
+const ARCHIVE_WRITE_BUFFER_SIZE: usize = 1 << 20;
+
+/// Largest v1/v2 archive that is staged in memory and written in one go
+/// instead of being streamed through the write buffer
+const IN_MEMORY_ARCHIVE_LIMIT: usize = 64 << 20;
+
+/// Highest hash table occupancy, in percent, that automatic sizing allows
+///
+/// Linear probing stays short up to roughly 70-75% load; sizing for twice the
+/// file count instead left large archives' hash tables up to 75% empty.
+const MAX_HASH_TABLE_LOAD_PERCENT: usize = 70;
+
+/// Number of hash table slots for `entry_count` entries
+///
+/// Shared by the classic hash table and the HET table, which both resolve
+/// collisions by linear probing. The result is a power of two of at least 16,
+/// as both tables locate their starting slot by masking the name hash.
+fn hash_table_size_for(entry_count: usize) -> u32 {
+    // Size for at most MAX_HASH_TABLE_LOAD_PERCENT occupancy, minimum 16
+    let optimal_size = (entry_count * 100)
+        .div_ceil(MAX_HASH_TABLE_LOAD_PERCENT)
+        .max(16) as u32;
+
+    // Round up to next power of 2, which can only lower the load further
+    optimal_size.next_power_of_two()
+}
+
+/// Minimum amount of file data in a batch before compression is spread over threads
+const PARALLEL_PREPARE_THRESHOLD: usize = 64 * 1024;
+
+/// Minimum number of files before their name hashes are computed on worker threads
+const PARALLEL_HASH_THRESHOLD: usize = 4096;
+
+/// Constant leading bytes (signature, version 1) of the HET extended header
+const HET_EXTENDED_HEADER_PREFIX: [u8; 8] = extended_header_prefix(crate::signatures::HET_TABLE);
+
+/// Constant leading bytes (signature, version 1) of the BET extended header
+const BET_EXTENDED_HEADER_PREFIX: [u8; 8] = extended_header_prefix(crate::signatures::BET_TABLE);
+
+/// Pack an extended table header's signature and version at compile time
+const fn extended_header_prefix(signature: u32) -> [u8; 8] {
+    let sig = signature.to_le_bytes();
+    let version = 1u32.to_le_bytes();
+    [
+        sig[0], sig[1], sig[2], sig[3], version[0], version[1], version[2], version[3],
+    ]
+}
+
 /// File to be added to the archive
 #[derive(Debug)]
 struct PendingFile {
@@ -56,24 +128,47 @@ enum FileSource {
     Data(Vec<u8>),
 }
 
+impl PendingFile {
+    /// Load the file contents, borrowing in-memory data instead of copying it
+    fn data(&self) -> Result<Cow<'_, [u8]>> {
+        Ok(match &self.source {
+            FileSource::Path(path) => Cow::Owned(fs::read(path)?),
+            FileSource::Data(data) => Cow::Borrowed(data),
+        })
+    }
+}
+
+/// Number of files compressed together before they are written out
+fn prepare_batch_size() -> usize {
+    worker_count()
+}
+
 /// Parameters for writing a file to the archive
 struct FileWriteParams<'a> {
-    /// File data to write
+    /// Uncompressed file data
     file_data: &'a [u8],
     /// Archive name for the file
     archive_name: &'a str,
-    /// Compression method
-    compression: u8,
     /// Whether to encrypt
     encrypt: bool,
     /// Whether to use FIX_KEY encryption
     use_fix_key: bool,
-    /// Sector size
-    sector_size: usize,
     /// File position in archive (64-bit for large archives)
     file_pos: u64,
 }
 
+/// A file that has been compressed and checksummed but not yet encrypted
+struct PreparedFile {
+    /// Block flags known before encryption (single unit, compression, CRC)
+    flags: u32,
+    /// Compressed payload; all sectors back to back for multi-sector files
+    data: Vec<u8>,
+    /// Unencrypted sector offset table (empty for single unit files)
+    sector_offsets: Vec<u32>,
+    /// Sector checksums, or the whole-file checksum for single unit files
+    sector_crcs: Vec<u32>,
+}
+
 /// Parameters for writing the MPQ header
 struct HeaderWriteParams {
     archive_size: u64,
@@ -154,6 +249,8 @@ pub struct ArchiveBuilder {
     listfile_option: ListfileOption,
     /// Default compression method
     default_compression: u8,
+    /// Compression level for file data (`None` uses each algorithm's default)
+    compression_level: Option<u32>,
     /// Whether to generate sector CRCs for files
     generate_crcs: bool,
     /// Whether to compress HET/BET tables (v3+ only)
@@ -171,6 +268,7 @@ impl ArchiveBuilder {
             pending_files: Vec::new(),
             listfile_option: ListfileOption::Generate,
             default_compression: compression_flags::ZLIB,
+            compression_level: None,
             generate_crcs: false,
             compress_tables: false, // Default to uncompressed for compatibility
             table_compression: compression_flags::ZLIB,
@@ -215,6 +313,25 @@ impl ArchiveBuilder {
         self
     }
 
+    /// Set the compression level used for file data
+    ///
+    /// Only zlib (0-9) and BZip2 (1-9) honor the level; other methods ignore it.
+    /// Lower levels compress faster at the cost of a larger archive, which is a
+    /// good trade-off when generating throwaway or test archives.
+    ///
+    /// # Examples
+    /// ```no_run
+    /// use mopaq::ArchiveBuilder;
+    ///
+    /// // Favor speed over ratio
+    /// let builder = ArchiveBuilder::new().compression_level(1);
+    /// # Ok::<(), mopaq::Error>(())
+    /// ```
+    pub fn compression_level(mut self, level: u32) -> Self {
+        self.compression_level = Some(level);
+        self
+    }
+
     /// Set the listfile option
     pub fn listfile_option(mut self, option: ListfileOption) -> Self {
         self.listfile_option = option;
@@ -507,18 +624,29 @@ impl ArchiveBuilder {
     }
 
     /// Calculate optimal hash table size based on file count
+    ///
+    /// Called once `prepare_listfile` has queued the listfile, so the pending
+    /// files already include it.
     fn calculate_hash_table_size(&self) -> u32 {
-        let file_count = self.pending_files.len()
-            + match &self.listfile_option {
-                ListfileOption::Generate | ListfileOption::External(_) => 1,
-                ListfileOption::None => 0,
-            };
+        hash_table_size_for(self.pending_files.len())
+    }
 
-        // Use 2x the file count for good performance, minimum 16
-        let optimal_size = (file_count * 2).max(16) as u32;
+    /// Estimate the size of the finished archive for buffer pre-allocation
+    ///
+    /// Uses uncompressed file sizes plus the classic tables, which is usually a
+    /// slight overestimate since compression shrinks the file data.
+    fn estimated_archive_size(&self) -> usize {
+        let file_data: u64 = self
+            .pending_files
+            .iter()
+            .map(|file| match &file.source {
+                FileSource::Path(path) => fs::metadata(path).map_or(0, |meta| meta.len()),
+                FileSource::Data(data) => data.len() as u64,
+            })
+            .sum();
+        let tables = (self.calculate_hash_table_size() as usize + self.pending_files.len()) * 16;
 
-        // Round up to next power of 2
-        optimal_size.next_power_of_two()
+        self.version.header_size() as usize + file_data as usize + tables
     }
 
     /// Build the archive and write to the specified path
@@ -536,12 +664,17 @@ impl ArchiveBuilder {
             let file = temp_file.as_file_mut();
             use std::io::{Seek as _, Write as _};
 
-            // For v3+ archives that need read-back support, we need to write everything
-            // to a buffer first, then copy to file
-            if self.version >= FormatVersion::V3 {
-                // Pre-allocate buffer with header space
+            // v3+ archives are always assembled in memory. v1/v2 archives up to
+            // IN_MEMORY_ARCHIVE_LIMIT are too: the header is written last, and
+            // seeking back to it would flush a BufWriter, so staging the image
+            // lets it reach the file in one write.
+            let estimated_size = self.estimated_archive_size();
+            if self.version >= FormatVersion::V3 || estimated_size <= IN_MEMORY_ARCHIVE_LIMIT {
+                // Pre-allocate the whole archive image up front so it isn't
+                // regrown while files and tables are appended
                 let header_size = self.version.header_size() as usize;
-                let vec = vec![0u8; header_size];
+                let mut vec = Vec::with_capacity(estimated_size);
+                vec.resize(header_size, 0);
                 let mut buffer = std::io::Cursor::new(vec);
                 buffer.seek(SeekFrom::Start(header_size as u64))?;
 
@@ -551,9 +684,12 @@ impl ArchiveBuilder {
                 file.write_all(buffer.get_ref())?;
                 file.flush()?;
             } else {
-                // For v1/v2, we can write directly
-                self.write_archive(file)?;
-                file.flush()?;
+                // Large v1/v2 archives stream straight to the file through a large
+                // write buffer so the many small table and header writes don't each
+                // hit the OS
+                let mut writer = BufWriter::with_capacity(ARCHIVE_WRITE_BUFFER_SIZE, file);
+                self.write_classic_archive(&mut writer)?;
+                writer.flush()?;
             }
         }
 
@@ -567,19 +703,25 @@ impl ArchiveBuilder {
     fn prepare_listfile(&mut self) -> Result<()> {
         match &self.listfile_option {
             ListfileOption::Generate => {
-                // Generate listfile content from pending files
-                let mut content = String::new();
+                // Generate listfile content from pending files, sized up front
+                const LISTFILE_ENTRY: &[u8] = b"(listfile)\r\n";
+                let capacity = self
+                    .pending_files
+                    .iter()
+                    .map(|file| file.archive_name.len() + 2)
+                    .sum::<usize>()
+                    + LISTFILE_ENTRY.len();
+                let mut content = Vec::with_capacity(capacity);
                 for file in &self.pending_files {
-                    content.push_str(&file.archive_name);
-                    content.push('\r');
-                    content.push('\n');
+                    content.extend_from_slice(file.archive_name.as_bytes());
+                    content.extend_from_slice(b"\r\n");
                 }
 
                 // Add the listfile itself
-                content.push_str("(listfile)\r\n");
+                content.extend_from_slice(LISTFILE_ENTRY);
 
                 self.pending_files.push(PendingFile {
-                    source: FileSource::Data(content.into_bytes()),
+                    source: FileSource::Data(content),
                     archive_name: "(listfile)".to_string(),
                     compression: self.default_compression,
                     encrypt: false,
@@ -615,6 +757,11 @@ impl ArchiveBuilder {
             return self.write_archive_with_het_bet(writer);
         }
 
+        self.write_classic_archive(writer)
+    }
+
+    /// Write an archive with only hash/block tables (v1/v2)
+    fn write_classic_archive<W: Write + Seek>(&self, writer: &mut W) -> Result<()> {
         let hash_table_size = self.calculate_hash_table_size();
         let block_table_size = self.pending_files.len() as u32;
 
@@ -625,8 +772,15 @@ impl ArchiveBuilder {
         let header_size = self.version.header_size();
         writer.seek(SeekFrom::Start(header_size as u64))?;
 
-        // Build tables and write files
-        let mut hash_table = HashTable::new(hash_table_size as usize)?;
+        // Track the write offset locally: querying the stream position would
+        // flush a BufWriter and cost a seek for every file
+        let mut archive_pos = header_size as u64;
+
+        // Assign every hash table slot up front, so duplicate names fail before
+        // any file is compressed or written
+        let hash_table = self.build_hash_table(hash_table_size)?;
+
+        // Build the remaining tables and write files
         let mut block_table = BlockTable::new(block_table_size as usize)?;
         let mut hi_block_table = if self.version >= FormatVersion::V2 {
             Some(HiBlockTable::new(block_table_size as usize))
@@ -635,70 +789,76 @@ impl ArchiveBuilder {
         };
 
         // Write all files and populate tables
-        for (block_index, pending_file) in self.pending_files.iter().enumerate() {
-            let file_pos = writer.stream_position()?;
-
-            // Read file data
-            let file_data = match &pending_file.source {
-                FileSource::Path(path) => fs::read(path)?,
-                FileSource::Data(data) => data.clone(),
-            };
-
-            // Write file and get sizes
-            let params = FileWriteParams {
-                file_data: &file_data,
-                archive_name: &pending_file.archive_name,
-                compression: pending_file.compression,
-                encrypt: pending_file.encrypt,
-                use_fix_key: pending_file.use_fix_key,
-                sector_size,
-                file_pos,
-            };
-            let (compressed_size, flags) = self.write_file(writer, &params)?;
-
-            // Add to hash table
-            self.add_to_hash_table(
-                &mut hash_table,
-                &pending_file.archive_name,
-                block_index as u32,
-                pending_file.locale,
-            )?;
-
-            // Add to block table and hi-block table if needed
-            let block_entry = BlockEntry {
-                file_pos: file_pos as u32, // Low 32 bits
-                compressed_size: compressed_size as u32,
-                file_size: file_data.len() as u32,
-                flags: flags | BlockEntry::FLAG_EXISTS,
-            };
+        let batch_size = prepare_batch_size();
+        for (batch_index, batch) in self.pending_files.chunks(batch_size).enumerate() {
+            // Load the batch, borrowing in-memory sources instead of copying them,
+            // then compress it before writing the files out in order
+            let batch_data = batch
+                .iter()
+                .map(PendingFile::data)
+                .collect::<Result<Vec<_>>>()?;
+            let prepared_files = self.prepare_files(batch, &batch_data, sector_size)?;
+
+            for (i, ((pending_file, file_data), prepared)) in batch
+                .iter()
+                .zip(&batch_data)
+                .zip(prepared_files)
+                .enumerate()
+            {
+                let block_index = batch_index * batch_size + i;
+                let file_pos = archive_pos;
+
+                // Encrypt and write file and get sizes
+                let params = FileWriteParams {
+                    file_data: &file_data[..],
+                    archive_name: &pending_file.archive_name,
+                    encrypt: pending_file.encrypt,
+                    use_fix_key: pending_file.use_fix_key,
+                    file_pos,
+                };
+                let (compressed_size, written_size, flags) =
+                    self.write_file(writer, &params, prepared)?;
+                archive_pos += written_size as u64;
+
+                // Add to block table and hi-block table if needed
+                let block_entry = BlockEntry {
+                    file_pos: file_pos as u32, // Low 32 bits
+                    compressed_size: compressed_size as u32,
+                    file_size: file_data.len() as u32,
+                    flags: flags | BlockEntry::FLAG_EXISTS,
+                };
 
-            // Store high 16 bits in hi-block table if needed
-            if let Some(ref mut hi_table) = hi_block_table {
-                let high_bits = (file_pos >> 32) as u16;
-                hi_table.set(block_index, high_bits);
-            }
+                // Store high 16 bits in hi-block table if needed
+                if let Some(ref mut hi_table) = hi_block_table {
+                    let high_bits = (file_pos >> 32) as u16;
+                    hi_table.set(block_index, high_bits);
+                }
 
-            // Get mutable reference and update
-            if let Some(entry) = block_table.get_mut(block_index) {
-                *entry = block_entry;
-            } else {
-                return Err(Error::invalid_format("Block index out of bounds"));
+                // Get mutable reference and update
+                if let Some(entry) = block_table.get_mut(block_index) {
+                    *entry = block_entry;
+                } else {
+                    return Err(Error::invalid_format("Block index out of bounds"));
+                }
             }
         }
 
         // Write hash table
-        let hash_table_pos = writer.stream_position()?;
+        let hash_table_pos = archive_pos;
         self.write_hash_table(writer, &hash_table)?;
+        archive_pos += hash_table_size as u64 * 16;
 
         // Write block table
-        let block_table_pos = writer.stream_position()?;
+        let block_table_pos = archive_pos;
         self.write_block_table(writer, &block_table)?;
+        archive_pos += block_table_size as u64 * 16;
 
         // Write hi-block table if needed
         let hi_block_table_pos = if let Some(ref hi_table) = hi_block_table {
             if hi_table.is_needed() {
-                let pos = writer.stream_position()?;
+                let pos = archive_pos;
                 self.write_hi_block_table(writer, hi_table)?;
+                archive_pos += block_table_size as u64 * 2;
                 Some(pos)
             } else {
                 None
@@ -708,7 +868,7 @@ impl ArchiveBuilder {
         };
 
         // Calculate archive size
-        let archive_size = writer.stream_position()?;
+        let archive_size = archive_pos;
 
         // Write header at the beginning
         writer.seek(SeekFrom::Start(0))?;
@@ -742,92 +902,107 @@ impl ArchiveBuilder {
         // Reserve space for header by seeking past it (we'll write it at the end)
         let header_size = self.version.header_size();
         writer.seek(SeekFrom::Start(header_size as u64))?;
+        let mut archive_pos = header_size as u64;
 
         // We'll still need block table data for file information
         let mut block_table = BlockTable::new(block_table_size as usize)?;
         let mut hi_block_table = Some(HiBlockTable::new(block_table_size as usize));
 
         // Write all files and populate block table
-        for (block_index, pending_file) in self.pending_files.iter().enumerate() {
-            let file_pos = writer.stream_position()?;
-
-            // Read file data
-            let file_data = match &pending_file.source {
-                FileSource::Path(path) => fs::read(path)?,
-                FileSource::Data(data) => data.clone(),
-            };
-
-            // Write file and get sizes
-            let params = FileWriteParams {
-                file_data: &file_data,
-                archive_name: &pending_file.archive_name,
-                compression: pending_file.compression,
-                encrypt: pending_file.encrypt,
-                use_fix_key: pending_file.use_fix_key,
-                sector_size,
-                file_pos,
-            };
-            let (compressed_size, flags) = self.write_file(writer, &params)?;
-
-            // Add to block table
-            let block_entry = BlockEntry {
-                file_pos: file_pos as u32, // Low 32 bits
-                compressed_size: compressed_size as u32,
-                file_size: file_data.len() as u32,
-                flags: flags | BlockEntry::FLAG_EXISTS,
-            };
+        let batch_size = prepare_batch_size();
+        for (batch_index, batch) in self.pending_files.chunks(batch_size).enumerate() {
+            // Load the batch, borrowing in-memory sources instead of copying them,
+            // then compress it before writing the files out in order
+            let batch_data = batch
+                .iter()
+                .map(PendingFile::data)
+                .collect::<Result<Vec<_>>>()?;
+            let prepared_files = self.prepare_files(batch, &batch_data, sector_size)?;
+
+            for (i, ((pending_file, file_data), prepared)) in batch
+                .iter()
+                .zip(&batch_data)
+                .zip(prepared_files)
+                .enumerate()
+            {
+                let block_index = batch_index * batch_size + i;
+                let file_pos = archive_pos;
+
+                // Encrypt and write file and get sizes
+                let params = FileWriteParams {
+                    file_data: &file_data[..],
+                    archive_name: &pending_file.archive_name,
+                    encrypt: pending_file.encrypt,
+                    use_fix_key: pending_file.use_fix_key,
+                    file_pos,
+                };
+                let (compressed_size, written_size, flags) =
+                    self.write_file(writer, &params, prepared)?;
+                archive_pos += written_size as u64;
+
+                // Add to block table
+                let block_entry = BlockEntry {
+                    file_pos: file_pos as u32, // Low 32 bits
+                    compressed_size: compressed_size as u32,
+                    file_size: file_data.len() as u32,
+                    flags: flags | BlockEntry::FLAG_EXISTS,
+                };
 
-            // Store high 16 bits in hi-block table
-            if let Some(ref mut hi_table) = hi_block_table {
-                let high_bits = (file_pos >> 32) as u16;
-                hi_table.set(block_index, high_bits);
-            }
+                // Store high 16 bits in hi-block table
+                if let Some(ref mut hi_table) = hi_block_table {
+                    let high_bits = (file_pos >> 32) as u16;
+                    hi_table.set(block_index, high_bits);
+                }
 
-            // Update block table entry
-            if let Some(entry) = block_table.get_mut(block_index) {
-                *entry = block_entry;
-            } else {
-                return Err(Error::invalid_format("Block index out of bounds"));
+                // Update block table entry
+                if let Some(entry) = block_table.get_mut(block_index) {
+                    *entry = block_entry;
+                } else {
+                    return Err(Error::invalid_format("Block index out of bounds"));
+                }
             }
         }
 
+        // Both HET and BET tables store the Jenkins hash of every filename,
+        // so hash each name once and share the results
+        let jenkins_hashes: Vec<u64> = self
+            .pending_files
+            .iter()
+            .map(|file| jenkins_hash(&file.archive_name))
+            .collect();
+
         // Create HET table
-        let het_table_pos = writer.stream_position()?;
-        let (het_data, _het_header) = self.create_het_table()?;
+        let het_table_pos = archive_pos;
+        let (het_data, _het_header) = self.create_het_table(&jenkins_hashes)?;
         let (het_table_size, het_table_md5) = self.write_het_table(writer, &het_data, true)?;
+        archive_pos += het_table_size;
 
         // Create BET table
-        let bet_table_pos = writer.stream_position()?;
-        let (bet_data, _bet_header) = self.create_bet_table(&block_table)?;
+        let bet_table_pos = archive_pos;
+        let (bet_data, _bet_header) = self.create_bet_table(&block_table, &jenkins_hashes)?;
         let (bet_table_size, bet_table_md5) = self.write_bet_table(writer, &bet_data, true)?;
+        archive_pos += bet_table_size;
 
         // For compatibility, also write classic tables
         let hash_table_size = self.calculate_hash_table_size();
-        let mut hash_table = HashTable::new(hash_table_size as usize)?;
-
-        // Populate hash table
-        for (block_index, pending_file) in self.pending_files.iter().enumerate() {
-            self.add_to_hash_table(
-                &mut hash_table,
-                &pending_file.archive_name,
-                block_index as u32,
-                pending_file.locale,
-            )?;
-        }
+        let hash_table = self.build_hash_table(hash_table_size)?;
 
         // Write hash table
-        let hash_table_pos = writer.stream_position()?;
+        let hash_table_pos = archive_pos;
         let hash_table_md5 = self.write_hash_table(writer, &hash_table)?;
+        archive_pos += hash_table_size as u64 * 16;
 
         // Write block table
-        let block_table_pos = writer.stream_position()?;
+        let block_table_pos = archive_pos;
         let block_table_md5 = self.write_block_table(writer, &block_table)?;
+        archive_pos += block_table_size as u64 * 16;
 
         // Write hi-block table if needed
         let (hi_block_table_pos, hi_block_table_md5) = if let Some(ref hi_table) = hi_block_table {
             if hi_table.is_needed() {
-                let pos = writer.stream_position()?;
+                let pos = archive_pos;
                 let md5 = self.write_hi_block_table(writer, hi_table)?;
+                archive_pos += block_table_size as u64 * 2;
                 (Some(pos), md5)
             } else {
                 (None, [0u8; 16])
@@ -837,10 +1012,7 @@ impl ArchiveBuilder {
         };
 
         // Calculate archive size
-        let archive_size = writer.stream_position()?;
-
-        // Save the current position (end of archive)
-        let _archive_end_pos = writer.stream_position()?;
+        let archive_size = archive_pos;
 
         // Write header at the beginning
         writer.seek(SeekFrom::Start(0))?;
@@ -863,7 +1035,7 @@ impl ArchiveBuilder {
                 md5_hi_block_table: hi_block_table_md5,
                 md5_bet_table: bet_table_md5,
                 md5_het_table: het_table_md5,
-                md5_mpq_header: [0u8; 16], // Will be calculated after header write
+                md5_mpq_header: [0u8; 16], // Calculated by write_header
             })
         } else {
             None
@@ -883,53 +1055,107 @@ impl ArchiveBuilder {
             v4_data,
         };
 
-        // Write header
+        // Write header (for V4 this includes the header MD5)
         self.write_header(writer, &header_params)?;
 
-        // For V4, calculate and write the header MD5
-        if self.version == FormatVersion::V4 {
-            self.finalize_v4_header_md5(writer)?;
+        Ok(())
+    }
+
+    /// Compress and checksum the files of one batch, in parallel when worthwhile
+    ///
+    /// Compression and sector CRCs do not depend on where a file ends up in the
+    /// archive, so they can run on worker threads. Encryption depends on the file
+    /// position and stays in [`Self::write_file`]. Results keep the batch order.
+    fn prepare_files(
+        &self,
+        batch: &[PendingFile],
+        batch_data: &[Cow<'_, [u8]>],
+        sector_size: usize,
+    ) -> Result<Vec<PreparedFile>> {
+        let total_size: usize = batch_data.iter().map(|data| data.len()).sum();
+
+        // Thread startup costs more than compressing a handful of small files
+        if batch.len() < 2 || total_size < PARALLEL_PREPARE_THRESHOLD {
+            return batch
+                .iter()
+                .zip(batch_data)
+                .map(|(pending_file, file_data)| {
+                    self.prepare_file(file_data, pending_file, sector_size, true)
+                })
+                .collect();
         }
 
-        Ok(())
+        std::thread::scope(|scope| {
+            let workers: Vec<_> = batch
+                .iter()
+                .zip(batch_data)
+                .map(|(pending_file, file_data)| {
+                    scope.spawn(move || {
+                        self.prepare_file(file_data, pending_file, sector_size, false)
+                    })
+                })
+                .collect();
+
+            workers
+                .into_iter()
+                .map(|worker| {
+                    worker
+                        .join()
+                        .unwrap_or_else(|panic| std::panic::resume_unwind(panic))
+                })
+                .collect()
+        })
     }
 
-    /// Write a single file to the archive
-    fn write_file<W: Write>(
+    /// Compress a single file and compute its sector CRCs
+    ///
+    /// `parallel_sectors` allows a large file's sectors to be compressed on
+    /// worker threads; it is off when files are already prepared in parallel.
+    fn prepare_file(
         &self,
-        writer: &mut W,
-        params: &FileWriteParams<'_>,
-    ) -> Result<(usize, u32)> {
-        let FileWriteParams {
-            file_data,
-            archive_name,
-            compression,
-            encrypt,
-            use_fix_key,
-            sector_size,
-            file_pos,
-        } = params;
+        file_data: &[u8],
+        pending_file: &PendingFile,
+        sector_size: usize,
+        parallel_sectors: bool,
+    ) -> Result<PreparedFile> {
+        let archive_name = &pending_file.archive_name;
+        let compression = pending_file.compression;
         let mut flags = 0u32;
 
+        // Set CRC flag early if enabled (needed for encryption key calculation)
+        if self.generate_crcs {
+            flags |= BlockEntry::FLAG_SECTOR_CRC;
+        }
+
         // For small files or if single unit is requested, write as single unit
-        let is_single_unit = file_data.len() <= *sector_size;
+        let is_single_unit = file_data.len() <= sector_size;
 
         if is_single_unit {
             flags |= BlockEntry::FLAG_SINGLE_UNIT;
 
-            // Set CRC flag early if enabled (needed for encryption key calculation)
-            if self.generate_crcs {
-                flags |= BlockEntry::FLAG_SECTOR_CRC;
-            }
+            // CRC of the whole uncompressed file
+            let sector_crcs = if self.generate_crcs {
+                // MPQ uses ADLER32 for sector checksums
+                let crc = adler::adler32_slice(file_data);
+                log::debug!(
+                    "Generated CRC for single unit file {}: 0x{:08X}",
+                    archive_name,
+                    crc
+                );
+                vec![crc]
+            } else {
+                Vec::new()
+            };
 
             // Compress if needed
-            let compressed_data = if *compression != 0 && !file_data.is_empty() {
+            let data = if compression != 0 && !file_data.is_empty() {
                 log::debug!(
                     "Compressing {} with method 0x{:02X}",
                     archive_name,
                     compression
                 );
-                let compressed = compress(file_data, *compression)?;
+                let compressed =
+                    self.compress_unit(file_data, compression, sector_crcs.first().copied())?;
 
                 // The compress function now handles the compression byte prefix
                 // and only returns compressed data if it's beneficial
@@ -951,184 +1177,254 @@ impl ArchiveBuilder {
                 file_data.to_vec()
             };
 
-            // Encrypt if needed
-            let final_data = if *encrypt {
-                flags |= BlockEntry::FLAG_ENCRYPTED;
-                if *use_fix_key {
-                    flags |= BlockEntry::FLAG_FIX_KEY;
-                }
-                let key =
-                    self.calculate_file_key(archive_name, *file_pos, file_data.len() as u32, flags);
-                let mut encrypted = compressed_data;
-                self.encrypt_data(&mut encrypted, key);
-                encrypted
-            } else {
-                compressed_data
-            };
-
-            // Write the data
-            writer.write_all(&final_data)?;
+            return Ok(PreparedFile {
+                flags,
+                data,
+                sector_offsets: Vec::new(),
+                sector_crcs,
+            });
+        }
 
-            // Write CRC if enabled
-            if self.generate_crcs {
-                // MPQ uses ADLER32 for sector checksums
-                let crc = adler::adler32_slice(file_data);
-                writer.write_u32_le(crc)?;
-                log::debug!(
-                    "Generated CRC for single unit file {}: 0x{:08X}",
-                    archive_name,
-                    crc
-                );
-            }
+        // Multi-sector file
+        let sector_count = file_data.len().div_ceil(sector_size);
 
-            // Return compressed size (NOT including CRC)
-            Ok((final_data.len(), flags))
+        // Reserve space for sector offset table and CRC table if enabled
+        let offset_table_size = (sector_count + 1) * 4;
+        let crc_table_size = if self.generate_crcs {
+            sector_count * 4
+        } else {
+            0
+        };
+        let data_start = offset_table_size + crc_table_size;
+
+        let mut sector_offsets = vec![0u32; sector_count + 1];
+        let mut sector_data = Vec::with_capacity(file_data.len());
+
+        // Sectors compress independently, so do them all up front, together
+        // with the CRCs of the uncompressed sectors if enabled
+        let (compressed_sectors, mut sector_crcs) = if compression != 0 {
+            let (sectors, crcs): (Vec<_>, Vec<_>) = self
+                .compress_sectors(file_data, sector_size, compression, parallel_sectors)?
+                .into_iter()
+                .unzip();
+            (Some(sectors), crcs.into_iter().flatten().collect())
+        } else if self.generate_crcs {
+            // Uncompressed sectors are checksummed in the copy loop below
+            (None, Vec::with_capacity(sector_count))
         } else {
-            // Multi-sector file
-            let sector_count = file_data.len().div_ceil(*sector_size);
+            (None, Vec::new())
+        };
 
-            // Set CRC flag early if enabled (needed for encryption key calculation)
-            if self.generate_crcs {
-                flags |= BlockEntry::FLAG_SECTOR_CRC;
-            }
+        // Process each sector
+        for (i, offset) in sector_offsets.iter_mut().enumerate().take(sector_count) {
+            let sector_start = i * sector_size;
+            let sector_end = ((i + 1) * sector_size).min(file_data.len());
+            let sector_bytes = &file_data[sector_start..sector_end];
 
-            // Reserve space for sector offset table and CRC table if enabled
-            let offset_table_size = (sector_count + 1) * 4;
-            let crc_table_size = if self.generate_crcs {
-                sector_count * 4
-            } else {
-                0
-            };
-            let data_start = offset_table_size + crc_table_size;
+            *offset = (data_start + sector_data.len()) as u32;
 
-            let mut sector_offsets = vec![0u32; sector_count + 1];
-            let mut sector_data = Vec::new();
-            let mut sector_crcs = if self.generate_crcs {
-                Vec::with_capacity(sector_count)
+            // Append the sector to sector_data, compressed if that was beneficial
+            if let Some(compressed_sectors) = &compressed_sectors {
+                // The compress function handles the compression byte prefix and
+                // returns the original data when compression is not beneficial
+                let compressed = &compressed_sectors[i];
+                if compressed.as_slice() != sector_bytes {
+                    flags |= BlockEntry::FLAG_COMPRESS;
+                }
+                sector_data.extend_from_slice(compressed);
             } else {
-                Vec::new()
-            };
-
-            // Process each sector
-            for (i, offset) in sector_offsets.iter_mut().enumerate().take(sector_count) {
-                let sector_start = i * *sector_size;
-                let sector_end = ((i + 1) * *sector_size).min(file_data.len());
-                let sector_bytes = &file_data[sector_start..sector_end];
-
-                *offset = (data_start + sector_data.len()) as u32;
-
-                // Calculate CRC for uncompressed sector if enabled
+                sector_data.extend_from_slice(sector_bytes);
                 if self.generate_crcs {
-                    // MPQ uses ADLER32 for sector checksums
-                    let crc = adler::adler32_slice(sector_bytes);
-                    sector_crcs.push(crc);
+                    // MPQ uses ADLER32 for sector checksums; take it while the
+                    // sector is still in cache from the copy
+                    sector_crcs.push(adler::adler32_slice(sector_bytes));
                 }
+            }
+        }
 
-                // Compress sector if needed
-                let compressed_sector = if *compression != 0 && !sector_bytes.is_empty() {
-                    // The compress function now handles the compression byte prefix
-                    // and only returns compressed data if it's beneficial
-                    let compressed = compress(sector_bytes, *compression)?;
-                    if compressed != *sector_bytes {
-                        // Compression was beneficial and the data now includes the method byte
-                        flags |= BlockEntry::FLAG_COMPRESS;
-                        compressed
-                    } else {
-                        // Compression not beneficial, returned original data
-                        sector_bytes.to_vec()
-                    }
-                } else {
-                    sector_bytes.to_vec()
-                };
+        // Set last offset
+        sector_offsets[sector_count] = (data_start + sector_data.len()) as u32;
 
-                sector_data.extend_from_slice(&compressed_sector);
-            }
+        // Log CRC generation if enabled
+        if self.generate_crcs {
+            log::debug!(
+                "Generated {} sector CRCs for file {}, first few: {:?}",
+                sector_count,
+                archive_name,
+                &sector_crcs[..5.min(sector_crcs.len())]
+            );
+        }
 
-            // Set last offset
-            sector_offsets[sector_count] = (data_start + sector_data.len()) as u32;
+        Ok(PreparedFile {
+            flags,
+            data: sector_data,
+            sector_offsets,
+            sector_crcs,
+        })
+    }
 
-            // Log CRC generation if enabled
-            if self.generate_crcs {
-                log::debug!(
-                    "Generated {} sector CRCs for file {}, first few: {:?}",
-                    sector_count,
-                    archive_name,
-                    &sector_crcs[..5.min(sector_crcs.len())]
-                );
+    /// Compress one file or sector, reusing its checksum when one was generated
+    fn compress_unit(
+        &self,
+        data: &[u8],
+        compression: u8,
+        checksum: Option<u32>,
+    ) -> Result<Vec<u8>> {
+        match checksum {
+            Some(adler32) => {
+                compress_with_checksum(data, compression, self.compression_level, adler32)
             }
+            None => compress_with_level(data, compression, self.compression_level),
+        }
+    }
 
-            // Encrypt if needed
-            if *encrypt {
-                flags |= BlockEntry::FLAG_ENCRYPTED;
-                if *use_fix_key {
-                    flags |= BlockEntry::FLAG_FIX_KEY;
-                }
-                let key =
-                    self.calculate_file_key(archive_name, *file_pos, file_data.len() as u32, flags);
-
-                // Save original offsets for sector encryption
-                let original_offsets = sector_offsets.clone();
-
-                // Encrypt sector offset table
-                let offset_key = key.wrapping_sub(1);
-                self.encrypt_data_u32(&mut sector_offsets, offset_key);
-
-                // Encrypt each sector using the original (unencrypted) offsets
-                let mut encrypted_sectors = Vec::new();
-                for (i, offset_pair) in original_offsets.windows(2).enumerate() {
-                    let start = (offset_pair[0] - data_start as u32) as usize;
-                    let end = (offset_pair[1] - data_start as u32) as usize;
-
-                    let mut sector = sector_data[start..end].to_vec();
-                    let sector_key = key.wrapping_add(i as u32);
-                    self.encrypt_data(&mut sector, sector_key);
-                    encrypted_sectors.extend_from_slice(&sector);
-                }
+    /// Compress every sector of a file, in order
+    ///
+    /// Large files are split into contiguous runs of sectors that are
+    /// compressed on scoped worker threads. Each sector is returned with its
+    /// checksum when sector CRCs are enabled, computed on the same worker.
+    fn compress_sectors(
+        &self,
+        file_data: &[u8],
+        sector_size: usize,
+        compression: u8,
+        parallel: bool,
+    ) -> Result<Vec<(Vec<u8>, Option<u32>)>> {
+        let compress = |sector: &[u8]| {
+            // MPQ uses ADLER32 for sector checksums
+            let crc = self.generate_crcs.then(|| adler::adler32_slice(sector));
+            self.compress_unit(sector, compression, crc)
+                .map(|compressed| (compressed, crc))
+        };
+
+        if !parallel || file_data.len() < PARALLEL_PREPARE_THRESHOLD {
+            return file_data.chunks(sector_size).map(compress).collect();
+        }
+
+        let sectors: Vec<&[u8]> = file_data.chunks(sector_size).collect();
+        let groups = map_chunks(&sectors, 2, |group| {
+            group
+                .iter()
+                .map(|&sector| compress(sector))
+                .collect::<Result<Vec<_>>>()
+        });
 
-                sector_data = encrypted_sectors;
+        let mut compressed = Vec::with_capacity(sectors.len());
+        for group in groups {
+            compressed.extend(group?);
+        }
+        Ok(compressed)
+    }
+
+    /// Encrypt a prepared file if requested and write it to the archive
+    ///
+    /// Returns the compressed size recorded in the block table, the number of
+    /// bytes written (which also counts the sector CRC table) and the block flags.
+    fn write_file<W: Write>(
+        &self,
+        writer: &mut W,
+        params: &FileWriteParams<'_>,
+        prepared: PreparedFile,
+    ) -> Result<(usize, usize, u32)> {
+        let FileWriteParams {
+            file_data,
+            archive_name,
+            encrypt,
+            use_fix_key,
+            file_pos,
+        } = params;
+        let PreparedFile {
+            mut flags,
+            mut data,
+            mut sector_offsets,
+            sector_crcs,
+        } = prepared;
+
+        let key = if *encrypt {
+            flags |= BlockEntry::FLAG_ENCRYPTED;
+            if *use_fix_key {
+                flags |= BlockEntry::FLAG_FIX_KEY;
             }
+            Some(self.calculate_file_key(archive_name, *file_pos, file_data.len() as u32, flags))
+        } else {
+            None
+        };
+
+        let crc_table_size = if self.generate_crcs {
+            sector_crcs.len() * 4
+        } else {
+            0
+        };
 
-            // Write sector offset table
-            for offset in &sector_offsets {
-                writer.write_u32_le(*offset)?;
+        if flags & BlockEntry::FLAG_SINGLE_UNIT != 0 {
+            // Encrypt if needed
+            if let Some(key) = key {
+                self.encrypt_data(&mut data, key);
             }
 
-            // Write CRC table if enabled
+            // Write the data
+            writer.write_all(&data)?;
+
+            // Write CRC if enabled
             if self.generate_crcs {
-                for crc in &sector_crcs {
-                    writer.write_u32_le(*crc)?;
-                }
+                writer.write_u32_slice_le(&sector_crcs)?;
             }
 
-            // Write sector data
-            writer.write_all(&sector_data)?;
+            // Return compressed size (NOT including CRC)
+            return Ok((data.len(), data.len() + crc_table_size, flags));
+        }
+
+        // Multi-sector file
+        let offset_table_size = sector_offsets.len() * 4;
+
+        // Encrypt if needed
+        if let Some(key) = key {
+            // Encrypt each sector in place while the offsets are still plain.
+            // Sectors are encrypted exactly once here; the offset table is
+            // encrypted afterwards and nothing else touches the sector data.
+            self.encrypt_sectors(&mut data, &sector_offsets, key);
+
+            // Encrypt sector offset table
+            let offset_key = key.wrapping_sub(1);
+            self.encrypt_data_u32(&mut sector_offsets, offset_key);
+        }
 
-            // Return size NOT including CRC table (offset table + sector data only)
-            let total_size = offset_table_size + sector_data.len();
-            Ok((total_size, flags))
+        // Write the sector offset table followed by the CRC table (if enabled)
+        // as one buffer, so each file's metadata prefix is a single write
+        if self.generate_crcs {
+            sector_offsets.extend_from_slice(&sector_crcs);
         }
+        writer.write_u32_slice_le(&sector_offsets)?;
+
+        // Write sector data
+        writer.write_all(&data)?;
+
+        // Return size NOT including CRC table (offset table + sector data only)
+        let total_size = offset_table_size + data.len();
+        Ok((total_size, total_size + crc_table_size, flags))
     }
 
     /// Add a file to the hash table
+    ///
+    /// `hashes` are the file's `(table_offset, name_a, name_b)` lookup hashes.
     fn add_to_hash_table(
         &self,
         hash_table: &mut HashTable,
         filename: &str,
+        hashes: (u32, u32, u32),
         block_index: u32,
         locale: u16,
     ) -> Result<()> {
-        let table_offset = hash_string(filename, hash_type::TABLE_OFFSET);
-        let name_a = hash_string(filename, hash_type::NAME_A);
-        let name_b = hash_string(filename, hash_type::NAME_B);
+        let (table_offset, name_a, name_b) = hashes;
 
-        let table_size = hash_table.size() as u32;
-        let mut index = table_offset & (table_size - 1);
+        // The table size is a power of two, so masking keeps every probe in bounds
+        let entries = hash_table.entries_mut();
+        let mask = entries.len() - 1;
+        let mut index = table_offset as usize & mask;
 
         // Linear probing to find empty slot
         loop {
-            let entry = hash_table
-                .get_mut(index as usize)
-                .ok_or_else(|| Error::invalid_format("Hash table index out of bounds"))?;
+            let entry = &mut entries[index];
 
             if entry.is_empty() {
                 // Found empty slot
@@ -1151,30 +1447,66 @@ impl ArchiveBuilder {
             }
 
             // Move to next slot
-            index = (index + 1) & (table_size - 1);
+            index = (index + 1) & mask;
         }
 
         Ok(())
     }
 
+    /// Build the hash table for all pending files in one pass
+    fn build_hash_table(&self, hash_table_size: u32) -> Result<HashTable> {
+        let mut hash_table = HashTable::new(hash_table_size as usize)?;
+        let hashes = self.lookup_hashes();
+
+        for (block_index, (pending_file, file_hashes)) in
+            self.pending_files.iter().zip(hashes).enumerate()
+        {
+            self.add_to_hash_table(
+                &mut hash_table,
+                &pending_file.archive_name,
+                file_hashes,
+                block_index as u32,
+                pending_file.locale,
+            )?;
+        }
+
+        Ok(hash_table)
+    }
+
+    /// Compute the hash table lookup hashes of every pending file, in order
+    ///
+    /// Each name hashes independently, so large file sets are split across
+    /// scoped worker threads.
+    fn lookup_hashes(&self) -> Vec<(u32, u32, u32)> {
+        map_chunks(&self.pending_files, PARALLEL_HASH_THRESHOLD, |files| {
+            files
+                .iter()
+                .map(|file| hash_string_lookup(&file.archive_name))
+                .collect::<Vec<_>>()
+        })
+        .into_iter()
+        .flatten()
+        .collect()
+    }
+
     /// Write the hash table
     fn write_hash_table<W: Write>(
         &self,
         writer: &mut W,
         hash_table: &HashTable,
     ) -> Result<[u8; 16]> {
-        // Convert to bytes for encryption
-        let mut table_data = Vec::new();
-        for entry in hash_table.entries() {
-            table_data.write_u32_le(entry.name_1)?;
-            table_data.write_u32_le(entry.name_2)?;
-            table_data.write_u16_le(entry.locale)?;
-            table_data.write_u16_le(entry.platform)?;
-            table_data.write_u32_le(entry.block_index)?;
+        // Start from a table of empty entries and only serialize occupied slots,
+        // since most of a sparsely filled hash table is never touched
+        let empty_entry = HashEntry::empty().to_bytes();
+        let mut table_data = empty_entry.repeat(hash_table.size());
+        for (i, entry) in hash_table.entries().iter().enumerate() {
+            if !entry.is_empty() {
+                table_data[i * 16..(i + 1) * 16].copy_from_slice(&entry.to_bytes());
+            }
         }
 
         // Encrypt the table
-        let key = hash_string("(hash table)", hash_type::FILE_KEY);
+        let key = HASH_TABLE_KEY;
         self.encrypt_data(&mut table_data, key);
 
         // Calculate MD5 of encrypted data (for v4)
@@ -1192,17 +1524,14 @@ impl ArchiveBuilder {
         writer: &mut W,
         block_table: &BlockTable,
     ) -> Result<[u8; 16]> {
-        // Convert to bytes for encryption
-        let mut table_data = Vec::new();
+        // Serialize into one contiguous buffer that is then encrypted in place
+        let mut table_data = Vec::with_capacity(block_table.entries().len() * 16);
         for entry in block_table.entries() {
-            table_data.write_u32_le(entry.file_pos)?;
-            table_data.write_u32_le(entry.compressed_size)?;
-            table_data.write_u32_le(entry.file_size)?;
-            table_data.write_u32_le(entry.flags)?;
+            table_data.extend_from_slice(&entry.to_bytes());
         }
 
         // Encrypt the table
-        let key = hash_string("(block table)", hash_type::FILE_KEY);
+        let key = BLOCK_TABLE_KEY;
         self.encrypt_data(&mut table_data, key);
 
         // Calculate MD5 of encrypted data (for v4)
@@ -1220,10 +1549,10 @@ impl ArchiveBuilder {
         writer: &mut W,
         hi_block_table: &HiBlockTable,
     ) -> Result<[u8; 16]> {
-        // Hi-block table is not encrypted
-        let mut table_data = Vec::new();
+        // Hi-block table is not encrypted; serialize it into one preallocated buffer
+        let mut table_data = Vec::with_capacity(hi_block_table.entries().len() * 2);
         for &entry in hi_block_table.entries() {
-            table_data.write_u16_le(entry)?;
+            table_data.extend_from_slice(&entry.to_le_bytes());
         }
 
         // Calculate MD5 (for v4)
@@ -1241,26 +1570,29 @@ impl ArchiveBuilder {
         writer: &mut W,
         params: &HeaderWriteParams,
     ) -> Result<()> {
+        // Serialize the whole header into one buffer and emit it with a single write
+        let mut header = Vec::with_capacity(self.version.header_size() as usize);
+
         // Write signature
-        writer.write_u32_le(crate::signatures::MPQ_ARCHIVE)?;
+        header.write_u32_le(crate::signatures::MPQ_ARCHIVE)?;
 
         // Write header size
-        writer.write_u32_le(self.version.header_size())?;
+        header.write_u32_le(self.version.header_size())?;
 
         // Write archive size (32-bit for v1, deprecated in v2+)
-        writer.write_u32_le(params.archive_size.min(u32::MAX as u64) as u32)?;
+        header.write_u32_le(params.archive_size.min(u32::MAX as u64) as u32)?;
 
         // Write format version
-        writer.write_u16_le(self.version as u16)?;
+        header.write_u16_le(self.version as u16)?;
 
         // Write block size
-        writer.write_u16_le(self.block_size)?;
+        header.write_u16_le(self.block_size)?;
 
         // Write table positions and sizes (low 32 bits)
-        writer.write_u32_le(params.hash_table_pos as u32)?;
-        writer.write_u32_le(params.block_table_pos as u32)?;
-        writer.write_u32_le(params.hash_table_size)?;
-        writer.write_u32_le(params.block_table_size)?;
+        header.write_u32_le(params.hash_table_pos as u32)?;
+        header.write_u32_le(params.block_table_pos as u32)?;
+        header.write_u32_le(params.hash_table_size)?;
+        header.write_u32_le(params.block_table_size)?;
 
         // Write version-specific fields
         match self.version {
@@ -1269,56 +1601,62 @@ impl ArchiveBuilder {
             }
             FormatVersion::V2 => {
                 // Hi-block table position
-                writer.write_u64_le(params.hi_block_table_pos.unwrap_or(0))?;
+                header.write_u64_le(params.hi_block_table_pos.unwrap_or(0))?;
 
                 // High 16 bits of positions
-                writer.write_u16_le((params.hash_table_pos >> 32) as u16)?; // hash_table_pos_hi
-                writer.write_u16_le((params.block_table_pos >> 32) as u16)?; // block_table_pos_hi
+                header.write_u16_le((params.hash_table_pos >> 32) as u16)?; // hash_table_pos_hi
+                header.write_u16_le((params.block_table_pos >> 32) as u16)?; // block_table_pos_hi
             }
             FormatVersion::V3 => {
                 // V2 fields
-                writer.write_u64_le(params.hi_block_table_pos.unwrap_or(0))?; // hi_block_table_pos
-                writer.write_u16_le((params.hash_table_pos >> 32) as u16)?; // hash_table_pos_hi
-                writer.write_u16_le((params.block_table_pos >> 32) as u16)?; // block_table_pos_hi
+                header.write_u64_le(params.hi_block_table_pos.unwrap_or(0))?; // hi_block_table_pos
+                header.write_u16_le((params.hash_table_pos >> 32) as u16)?; // hash_table_pos_hi
+                header.write_u16_le((params.block_table_pos >> 32) as u16)?; // block_table_pos_hi
 
                 // V3 fields
-                writer.write_u64_le(params.archive_size)?; // archive_size_64
-                writer.write_u64_le(params.bet_table_pos.unwrap_or(0))?; // bet_table_pos
-                writer.write_u64_le(params.het_table_pos.unwrap_or(0))?; // het_table_pos
+                header.write_u64_le(params.archive_size)?; // archive_size_64
+                header.write_u64_le(params.bet_table_pos.unwrap_or(0))?; // bet_table_pos
+                header.write_u64_le(params.het_table_pos.unwrap_or(0))?; // het_table_pos
             }
             FormatVersion::V4 => {
                 // V2 fields
-                writer.write_u64_le(params.hi_block_table_pos.unwrap_or(0))?; // hi_block_table_pos
-                writer.write_u16_le((params.hash_table_pos >> 32) as u16)?; // hash_table_pos_hi
-                writer.write_u16_le((params.block_table_pos >> 32) as u16)?; // block_table_pos_hi
+                header.write_u64_le(params.hi_block_table_pos.unwrap_or(0))?; // hi_block_table_pos
+                header.write_u16_le((params.hash_table_pos >> 32) as u16)?; // hash_table_pos_hi
+                header.write_u16_le((params.block_table_pos >> 32) as u16)?; // block_table_pos_hi
 
                 // V3 fields
-                writer.write_u64_le(params.archive_size)?; // archive_size_64
-                writer.write_u64_le(params.bet_table_pos.unwrap_or(0))?; // bet_table_pos
-                writer.write_u64_le(params.het_table_pos.unwrap_or(0))?; // het_table_pos
+                header.write_u64_le(params.archive_size)?; // archive_size_64
+                header.write_u64_le(params.bet_table_pos.unwrap_or(0))?; // bet_table_pos
+                header.write_u64_le(params.het_table_pos.unwrap_or(0))?; // het_table_pos
 
                 // V4 fields
                 if let Some(v4_data) = &params.v4_data {
-                    writer.write_u64_le(v4_data.hash_table_size_64)?;
-                    writer.write_u64_le(v4_data.block_table_size_64)?;
-                    writer.write_u64_le(v4_data.hi_block_table_size_64)?;
-                    writer.write_u64_le(v4_data.het_table_size_64)?;
-                    writer.write_u64_le(v4_data.bet_table_size_64)?;
-                    writer.write_u32_le(v4_data.raw_chunk_size)?;
+                    header.write_u64_le(v4_data.hash_table_size_64)?;
+                    header.write_u64_le(v4_data.block_table_size_64)?;
+                    header.write_u64_le(v4_data.hi_block_table_size_64)?;
+                    header.write_u64_le(v4_data.het_table_size_64)?;
+                    header.write_u64_le(v4_data.bet_table_size_64)?;
+                    header.write_u32_le(v4_data.raw_chunk_size)?;
 
                     // Write MD5 hashes (all except header MD5 which is calculated later)
-                    writer.write_all(&v4_data.md5_block_table)?;
-                    writer.write_all(&v4_data.md5_hash_table)?;
-                    writer.write_all(&v4_data.md5_hi_block_table)?;
-                    writer.write_all(&v4_data.md5_bet_table)?;
-                    writer.write_all(&v4_data.md5_het_table)?;
-                    writer.write_all(&v4_data.md5_mpq_header)?;
+                    header.write_all(&v4_data.md5_block_table)?;
+                    header.write_all(&v4_data.md5_hash_table)?;
+                    header.write_all(&v4_data.md5_hi_block_table)?;
+                    header.write_all(&v4_data.md5_bet_table)?;
+                    header.write_all(&v4_data.md5_het_table)?;
+
+                    // The header MD5 covers everything before it, which is already
+                    // in the buffer, so there is no need to read the header back
+                    let header_md5 = self.calculate_md5(&header);
+                    header.write_all(&header_md5)?;
                 } else {
                     return Err(Error::invalid_format("V4 format requires v4_data"));
                 }
             }
         }
 
+        writer.write_all(&header)?;
+
         Ok(())
     }
 
@@ -1340,22 +1678,9 @@ impl ArchiveBuilder {
             return;
         }
 
-        // Process full u32 chunks
+        // Encrypt full u32 chunks in place
         let (chunks, remainder) = data.split_at_mut((data.len() / 4) * 4);
-
-        // Convert chunks to u32 values, encrypt, and write back
-        let mut u32_buffer = Vec::with_capacity(chunks.len() / 4);
-        for chunk in chunks.chunks_exact(4) {
-            u32_buffer.push(u32::from_le_bytes([chunk[0], chunk[1], chunk[2], chunk[3]]));
-        }
-
-        encrypt_block(&mut u32_buffer, key);
-
-        // Write encrypted u32s back to bytes
-        for (i, &encrypted) in u32_buffer.iter().enumerate() {
-            let bytes = encrypted.to_le_bytes();
-            chunks[i * 4..(i + 1) * 4].copy_from_slice(&bytes);
-        }
+        encrypt_bytes(chunks, key);
 
         // Handle remaining bytes
         if !remainder.is_empty() {
@@ -1372,6 +1697,42 @@ impl ArchiveBuilder {
             remainder.copy_from_slice(&encrypted_bytes[..remainder.len()]);
         }
     }
+    /// Encrypt every sector of a multi-sector file in place
+    ///
+    /// Each sector uses its own key (`key + index`), so sectors are
+    /// independent and large files are spread across worker threads.
+    fn encrypt_sectors(&self, data: &mut [u8], sector_offsets: &[u32], key: u32) {
+        // Split the payload into one disjoint slice per sector
+        let mut sectors = Vec::with_capacity(sector_offsets.len().saturating_sub(1));
+        let mut rest = data;
+        for (i, offset_pair) in sector_offsets.windows(2).enumerate() {
+            let sector_len = (offset_pair[1] - offset_pair[0]) as usize;
+            let (sector, tail) = rest.split_at_mut(sector_len);
+            sectors.push((sector, key.wrapping_add(i as u32)));
+            rest = tail;
+        }
+
+        let workers = worker_count();
+        let total_size = sector_offsets[sector_offsets.len() - 1] - sector_offsets[0];
+        if workers < 2 || sectors.len() < 2 || (total_size as usize) < PARALLEL_PREPARE_THRESHOLD {
+            for (sector, sector_key) in sectors {
+                self.encrypt_data(sector, sector_key);
+            }
+            return;
+        }
+
+        let per_worker = sectors.len().div_ceil(workers);
+        std::thread::scope(|scope| {
+            for group in sectors.chunks_mut(per_worker) {
+                scope.spawn(move || {
+                    for (sector, sector_key) in group {
+                        self.encrypt_data(sector, *sector_key);
+                    }
+                });
+            }
+        });
+    }
+
     /// Encrypt u32 data in place
     fn encrypt_data_u32(&self, data: &mut [u32], key: u32) {
         encrypt_block(data, key);
@@ -1384,32 +1745,11 @@ impl ArchiveBuilder {
         hasher.finalize().into()
     }
 
-    /// Finalize V4 header by calculating and writing the header MD5
-    fn finalize_v4_header_md5<W: Write + Seek + Read>(&self, writer: &mut W) -> Result<()> {
-        // Read the header data (excluding the MD5 field itself)
-        writer.seek(SeekFrom::Start(0))?;
-        let header_size = self.version.header_size() as usize;
-        let md5_size = 16;
-        let header_data_size = header_size - md5_size; // 208 - 16 = 192 bytes
-
-        let mut header_data = vec![0u8; header_data_size];
-        writer.read_exact(&mut header_data)?;
-
-        // Calculate MD5 of header data
-        let header_md5 = self.calculate_md5(&header_data);
-
-        // Write the MD5 at the end of the header (offset 0xC0 = 192)
-        writer.seek(SeekFrom::Start(192))?;
-        writer.write_all(&header_md5)?;
-
-        Ok(())
-    }
-
-    /// Create HET table data
-    fn create_het_table(&self) -> Result<(Vec<u8>, HetHeader)> {
+    /// Create HET table data from the Jenkins hash of each pending file
+    fn create_het_table(&self, file_hashes: &[u64]) -> Result<(Vec<u8>, HetHeader)> {
         // Calculate required sizes
         let max_file_count = self.pending_files.len() as u32;
-        let hash_table_entries = (max_file_count * 2).next_power_of_two();
+        let hash_table_entries = hash_table_size_for(max_file_count as usize);
 
         log::debug!(
             "Creating HET table: {} files, {} hash entries",
@@ -1463,20 +1803,21 @@ impl ArchiveBuilder {
             file_indices_size
         );
 
-        // Build file hash map to track which hash slots map to which files
-        let mut file_map: Vec<Option<u32>> = vec![None; hash_table_entries as usize];
+        // Occupancy of each hash slot; the slot contents live in `hash_table`
+        let mut occupied = vec![false; hash_table_entries as usize];
+        let hash_mask = (1u64 << hash_entry_size) - 1;
+        // The slot count is a power of two, so probing wraps with a mask
+        let slot_mask = hash_table_entries as usize - 1;
 
         // Process each file
-        for (file_index, pending_file) in self.pending_files.iter().enumerate() {
-            let hash = jenkins_hash(&pending_file.archive_name);
-            let hash_mask = (1u64 << hash_entry_size) - 1;
-            let table_index = (hash & (hash_table_entries as u64 - 1)) as usize;
+        for (file_index, &hash) in file_hashes.iter().enumerate() {
+            let table_index = hash as usize & slot_mask;
 
             // Linear probing for collision resolution
             let mut current_index = table_index;
             loop {
-                if file_map[current_index].is_none() {
-                    file_map[current_index] = Some(file_index as u32);
+                if !occupied[current_index] {
+                    occupied[current_index] = true;
 
                     // Write hash entry (stores hash + file index in upper bits)
                     let hash_entry = (hash & hash_mask) | ((file_index as u64) << hash_entry_size);
@@ -1491,7 +1832,7 @@ impl ArchiveBuilder {
                     break;
                 }
 
-                current_index = (current_index + 1) % hash_table_entries as usize;
+                current_index = (current_index + 1) & slot_mask;
                 if current_index == table_index {
                     return Err(Error::invalid_format("HET table full"));
                 }
@@ -1509,8 +1850,7 @@ impl ArchiveBuilder {
 
         // Write extended header first
         let mut result = Vec::with_capacity((12 + data_size) as usize);
-        result.write_u32_le(0x1A544548)?; // "HET\x1A"
-        result.write_u32_le(1)?; // version
+        result.extend_from_slice(&HET_EXTENDED_HEADER_PREFIX); // "HET\x1A", version 1
         result.write_u32_le(data_size)?; // data_size
 
         // Then write the HET header
@@ -1615,36 +1955,35 @@ impl ArchiveBuilder {
 
         // Split extended header and table data
         let (extended_header, table_data) = data.split_at(12);
-        let mut processed_data = table_data.to_vec();
+
+        // Assemble the final table in one buffer: the extended header followed
+        // by the table data, compressed straight from the input slice if enabled
+        let mut final_data = Vec::with_capacity(data.len() + 1);
+        final_data.extend_from_slice(extended_header);
 
         // Compress if enabled and this is a v3+ archive
         if self.compress_tables && matches!(self.version, FormatVersion::V3 | FormatVersion::V4) {
-            log::debug!("Compressing HET table data: {} -> ", processed_data.len());
-            let compressed = compress(&processed_data, self.table_compression)?;
+            log::debug!("Compressing HET table data: {} -> ", table_data.len());
+            let compressed = compress(table_data, self.table_compression)?;
             log::debug!(
                 "{} bytes ({}% reduction)",
                 compressed.len(),
-                (100 * (processed_data.len() - compressed.len()) / processed_data.len())
+                (100 * (table_data.len() - compressed.len()) / table_data.len())
             );
 
             // Prepend compression type byte
-            let mut compressed_with_type = Vec::with_capacity(1 + compressed.len());
-            compressed_with_type.push(self.table_compression);
-            compressed_with_type.extend_from_slice(&compressed);
-            processed_data = compressed_with_type;
+            final_data.push(self.table_compression);
+            final_data.extend_from_slice(&compressed);
+        } else {
+            final_data.extend_from_slice(table_data);
         }
 
         // Encrypt the data portion (after extended header)
         if encrypt {
-            let key = hash_string("(hash table)", hash_type::FILE_KEY);
-            self.encrypt_data(&mut processed_data, key);
+            let key = HASH_TABLE_KEY;
+            self.encrypt_data(&mut final_data[extended_header.len()..], key);
         }
 
-        // Combine extended header with processed data
-        let mut final_data = Vec::with_capacity(extended_header.len() + processed_data.len());
-        final_data.extend_from_slice(extended_header);
-        final_data.extend_from_slice(&processed_data);
-
         // Calculate MD5 of final data
         let md5 = self.calculate_md5(&final_data);
 
@@ -1653,8 +1992,12 @@ impl ArchiveBuilder {
         Ok((written_size, md5))
     }
 
-    /// Create BET table data
-    fn create_bet_table(&self, block_table: &BlockTable) -> Result<(Vec<u8>, BetHeader)> {
+    /// Create BET table data from the Jenkins hash of each pending file
+    fn create_bet_table(
+        &self,
+        block_table: &BlockTable,
+        file_hashes: &[u64],
+    ) -> Result<(Vec<u8>, BetHeader)> {
         let file_count = self.pending_files.len() as u32;
 
         // Analyze block table to determine optimal bit widths
@@ -1744,7 +2087,7 @@ impl ArchiveBuilder {
         let mut bet_hashes = Vec::with_capacity(file_count as usize);
 
         // Fill tables
-        for (i, pending_file) in self.pending_files.iter().enumerate() {
+        for (i, &hash) in file_hashes.iter().enumerate() {
             if let Some(entry) = block_table.get(i) {
                 // Get flag index
                 let flag_index = flag_index_map.get(&entry.flags).unwrap();
@@ -1759,8 +2102,7 @@ impl ArchiveBuilder {
                 // Write to file table
                 self.write_bit_entry(&mut file_table, i, entry_bits, table_entry_size)?;
 
-                // Generate BET hash (Jenkins hash of filename)
-                let hash = jenkins_hash(&pending_file.archive_name);
+                // BET hash (Jenkins hash of filename)
                 bet_hashes.push(hash);
             }
         }
@@ -1780,8 +2122,7 @@ impl ArchiveBuilder {
         let mut result = Vec::with_capacity((12 + data_size) as usize);
 
         // Write extended header first
-        result.write_u32_le(0x1A544542)?; // "BET\x1A"
-        result.write_u32_le(1)?; // version
+        result.extend_from_slice(&BET_EXTENDED_HEADER_PREFIX); // "BET\x1A", version 1
         result.write_u32_le(data_size)?; // data_size
 
         // Then write the BET header
@@ -1840,36 +2181,35 @@ impl ArchiveBuilder {
 
         // Split extended header and table data
         let (extended_header, table_data) = data.split_at(12);
-        let mut processed_data = table_data.to_vec();
+
+        // Assemble the final table in one buffer: the extended header followed
+        // by the table data, compressed straight from the input slice if enabled
+        let mut final_data = Vec::with_capacity(data.len() + 1);
+        final_data.extend_from_slice(extended_header);
 
         // Compress if enabled and this is a v3+ archive
         if self.compress_tables && matches!(self.version, FormatVersion::V3 | FormatVersion::V4) {
-            log::debug!("Compressing BET table data: {} -> ", processed_data.len());
-            let compressed = compress(&processed_data, self.table_compression)?;
+            log::debug!("Compressing BET table data: {} -> ", table_data.len());
+            let compressed = compress(table_data, self.table_compression)?;
             log::debug!(
                 "{} bytes ({}% reduction)",
                 compressed.len(),
-                (100 * (processed_data.len() - compressed.len()) / processed_data.len())
+                (100 * (table_data.len() - compressed.len()) / table_data.len())
             );
 
             // Prepend compression type byte
-            let mut compressed_with_type = Vec::with_capacity(1 + compressed.len());
-            compressed_with_type.push(self.table_compression);
-            compressed_with_type.extend_from_slice(&compressed);
-            processed_data = compressed_with_type;
+            final_data.push(self.table_compression);
+            final_data.extend_from_slice(&compressed);
+        } else {
+            final_data.extend_from_slice(table_data);
         }
 
         // Encrypt the data portion (after extended header)
         if encrypt {
-            let key = hash_string("(block table)", hash_type::FILE_KEY);
-            self.encrypt_data(&mut processed_data, key);
+            let key = BLOCK_TABLE_KEY;
+            self.encrypt_data(&mut final_data[extended_header.len()..], key);
         }
 
-        // Combine extended header with processed data
-        let mut final_data = Vec::with_capacity(extended_header.len() + processed_data.len());
-        final_data.extend_from_slice(extended_header);
-        final_data.extend_from_slice(&processed_data);
-
         // Calculate MD5 of final data
         let md5 = self.calculate_md5(&final_data);
 
@@ -28,7 +28,15 @@ pub(crate) fn decompress(data: &[u8], expected_size: usize) -> Result<Vec<u8>> {
 
 /// Compress using BZip2
 pub(crate) fn compress(data: &[u8]) -> Result<Vec<u8>> {
-    let mut encoder = BzEncoder::new(Vec::new(), Compression::default());
+    compress_with_level(data, Compression::default().level())
+}
+
+/// Compress using BZip2 with an explicit level (1-9, clamped)
+pub(crate) fn compress_with_level(data: &[u8], level: u32) -> Result<Vec<u8>> {
+    // Size the output like the zlib backend does, so small sectors finish
+    // without growing the buffer
+    let output = Vec::with_capacity(data.len() / 2 + 64);
+    let mut encoder = BzEncoder::new(output, Compression::new(level.clamp(1, 9)));
     encoder
         .write_all(data)
         .map_err(|e| Error::compression(format!("BZip2 compression failed: {}", e)))?;
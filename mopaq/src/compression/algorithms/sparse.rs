@@ -4,11 +4,14 @@ use crate::{Error, Result};
 
 /// Decompress sparse/RLE compressed data
 pub(crate) fn decompress(data: &[u8], expected_size: usize) -> Result<Vec<u8>> {
-    // Sparse compression is a simple RLE format
-    let mut output = Vec::with_capacity(expected_size);
+    // Sparse compression is a simple RLE format. The output starts out zeroed,
+    // so runs of zeros only advance the write position and just the literal
+    // bytes are copied.
+    let mut output = vec![0u8; expected_size];
+    let mut out_len = 0;
     let mut pos = 0;
 
-    while pos < data.len() && output.len() < expected_size {
+    while pos < data.len() && out_len < expected_size {
         // Read control byte
         let control = data[pos];
         pos += 1;
@@ -20,8 +23,7 @@ pub(crate) fn decompress(data: &[u8], expected_size: usize) -> Result<Vec<u8>> {
 
         if control & 0x80 != 0 {
             // Run of zeros
-            let count = (control & 0x7F) as usize;
-            output.resize(output.len() + count, 0);
+            out_len += (control & 0x7F) as usize;
         } else {
             // Copy bytes
             let count = control as usize;
@@ -30,53 +32,48 @@ pub(crate) fn decompress(data: &[u8], expected_size: usize) -> Result<Vec<u8>> {
                     "Sparse decompression: unexpected end of data",
                 ));
             }
-            output.extend_from_slice(&data[pos..pos + count]);
+            if out_len + count > output.len() {
+                output.resize(out_len + count, 0);
+            }
+            output[out_len..out_len + count].copy_from_slice(&data[pos..pos + count]);
+            out_len += count;
             pos += count;
         }
     }
 
-    // Pad with zeros if needed
-    if output.len() < expected_size {
-        output.resize(expected_size, 0);
-    }
+    // Anything short of the expected size is already zero padding; only a
+    // trailing zero run past it still needs room
+    output.resize(out_len.max(expected_size), 0);
 
     Ok(output)
 }
 
 /// Compress using sparse/RLE compression
 pub(crate) fn compress(data: &[u8]) -> Result<Vec<u8>> {
-    let mut output = Vec::new();
-    let mut pos = 0;
-
-    while pos < data.len() {
-        // Look for runs of zeros
-        let zero_start = pos;
-        while pos < data.len() && data[pos] == 0 {
-            pos += 1;
-        }
-
-        let mut zero_count = pos - zero_start;
-        if zero_count > 0 {
-            // Encode runs of zeros
-            while zero_count > 0 {
-                let chunk = zero_count.min(0x7F);
-                output.push(0x80 | (chunk as u8));
-                zero_count -= chunk;
-            }
+    // Worst case is one control byte per 0x7F literals plus the end marker
+    let mut output = Vec::with_capacity(data.len() + data.len() / 0x7F + 2);
+    let mut rest = data;
+
+    while !rest.is_empty() {
+        // Find the end of the current run of zeros
+        let zero_count = rest.iter().position(|&b| b != 0).unwrap_or(rest.len());
+
+        // Encode runs of zeros, filling all full-length control bytes at once
+        output.resize(output.len() + zero_count / 0x7F, 0x80 | 0x7F);
+        if zero_count % 0x7F > 0 {
+            output.push(0x80 | (zero_count % 0x7F) as u8);
         }
+        rest = &rest[zero_count..];
 
-        // Look for non-zero bytes
-        let data_start = pos;
-        while pos < data.len() && data[pos] != 0 && (pos - data_start) < 0x7F {
-            pos += 1;
-        }
+        // Find the end of the following run of non-zero bytes
+        let data_count = rest.iter().position(|&b| b == 0).unwrap_or(rest.len());
 
-        let data_count = pos - data_start;
-        if data_count > 0 {
-            // Encode literal bytes
-            output.push(data_count as u8);
-            output.extend_from_slice(&data[data_start..pos]);
+        // Encode literal bytes in chunks of at most 0x7F
+        for chunk in rest[..data_count].chunks(0x7F) {
+            output.push(chunk.len() as u8);
+            output.extend_from_slice(chunk);
         }
+        rest = &rest[data_count..];
     }
 
     // Add end marker
@@ -105,6 +102,14 @@ mod tests {
         assert_eq!(decompressed, expected);
     }
 
+    #[test]
+    fn test_decompress_pads_short_stream() {
+        let compressed = vec![2, b'h', b'i', 0x83, 0xFF];
+
+        let decompressed = decompress(&compressed, 10).expect("Decompression failed");
+        assert_eq!(decompressed, b"hi\0\0\0\0\0\0\0\0");
+    }
+
     #[test]
     fn test_round_trip() {
         let original = b"Hello\0\0\0\0\0World\0\0\0!!!";
@@ -125,4 +130,16 @@ mod tests {
         let decompressed = decompress(&compressed, original.len()).expect("Decompression failed");
         assert_eq!(decompressed, original);
     }
+
+    #[test]
+    fn test_long_literal_run() {
+        let original: Vec<u8> = (0..300).map(|i| (i % 255 + 1) as u8).collect();
+
+        let compressed = compress(&original).expect("Compression failed");
+        // 300 literals need three control bytes (127 + 127 + 46) plus end marker
+        assert_eq!(compressed.len(), original.len() + 4);
+
+        let decompressed = decompress(&compressed, original.len()).expect("Decompression failed");
+        assert_eq!(decompressed, original);
+    }
 }
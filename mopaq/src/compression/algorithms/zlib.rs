@@ -2,9 +2,27 @@
 
 use crate::{Error, Result};
 use flate2::read::ZlibDecoder;
-use flate2::write::ZlibEncoder;
-use flate2::Compression;
-use std::io::{Read, Write};
+#[cfg(not(feature = "libdeflate"))]
+use flate2::{Compress, Compression, FlushCompress, Status};
+use std::cell::RefCell;
+use std::io::Read;
+
+/// Default zlib compression level, matching `flate2::Compression::default()`
+const DEFAULT_LEVEL: u32 = 6;
+
+#[cfg(not(feature = "libdeflate"))]
+type Compressor = Compress;
+#[cfg(feature = "libdeflate")]
+type Compressor = libdeflater::Compressor;
+
+thread_local! {
+    /// Compressor reused between calls on the same thread, tagged with its level
+    /// and whether it produces zlib-wrapped or raw deflate output.
+    ///
+    /// Compressing many sectors would otherwise allocate and initialize a fresh
+    /// stream (window, hash chains and output state) for every sector.
+    static COMPRESSOR: RefCell<Option<(u32, bool, Compressor)>> = const { RefCell::new(None) };
+}
 
 /// Decompress using zlib/deflate
 pub(crate) fn decompress(data: &[u8], expected_size: usize) -> Result<Vec<u8>> {
@@ -55,14 +73,130 @@ pub(crate) fn decompress(data: &[u8], expected_size: usize) -> Result<Vec<u8>> {
 
 /// Compress using zlib/deflate
 pub(crate) fn compress(data: &[u8]) -> Result<Vec<u8>> {
-    let mut encoder = ZlibEncoder::new(Vec::new(), Compression::default());
-    encoder
-        .write_all(data)
-        .map_err(|e| Error::compression(format!("Zlib compression failed: {}", e)))?;
-
-    encoder
-        .finish()
-        .map_err(|e| Error::compression(format!("Zlib compression failed: {}", e)))
+    compress_with_level(data, DEFAULT_LEVEL)
+}
+
+/// Compress using zlib/deflate with an explicit level (0-9, clamped)
+pub(crate) fn compress_with_level(data: &[u8], level: u32) -> Result<Vec<u8>> {
+    let level = level.min(9);
+    let mut output = Vec::with_capacity(data.len() / 2 + 64);
+    with_compressor(level, true, |compressor| {
+        deflate(compressor, true, data, &mut output)
+    })?;
+    Ok(output)
+}
+
+/// Compress into a zlib stream using an Adler-32 of `data` the caller already has
+///
+/// A zlib stream is a two byte header, raw deflate data and the Adler-32 of the
+/// uncompressed input. MPQ sector checksums are that same Adler-32, so when
+/// they are generated anyway the stream is assembled around raw deflate output
+/// instead of letting the compressor checksum the data a second time.
+pub(crate) fn compress_with_checksum(
+    data: &[u8],
+    level: Option<u32>,
+    adler32: u32,
+) -> Result<Vec<u8>> {
+    let level = level.unwrap_or(DEFAULT_LEVEL).min(9);
+    let mut output = Vec::with_capacity(data.len() / 2 + 64);
+    output.extend_from_slice(&zlib_header(level));
+    with_compressor(level, false, |compressor| {
+        deflate(compressor, false, data, &mut output)
+    })?;
+    output.extend_from_slice(&adler32.to_be_bytes());
+    Ok(output)
+}
+
+/// Build the zlib stream header for a 32K window at the given level
+fn zlib_header(level: u32) -> [u8; 2] {
+    const CMF: u8 = 0x78;
+    // Compression level hint, using the same buckets as zlib itself
+    let flevel: u8 = match level {
+        0..=1 => 0,
+        2..=5 => 1,
+        6 => 2,
+        _ => 3,
+    };
+    let flg = flevel << 6;
+    let fcheck = 31 - ((u16::from(CMF) << 8 | u16::from(flg)) % 31) as u8;
+    [CMF, flg | (fcheck % 31)]
+}
+
+/// Run `f` with this thread's cached compressor for the given configuration
+fn with_compressor<T>(
+    level: u32,
+    zlib_wrapped: bool,
+    f: impl FnOnce(&mut Compressor) -> Result<T>,
+) -> Result<T> {
+    COMPRESSOR.with(|cell| {
+        let mut slot = cell.borrow_mut();
+        if !matches!(&*slot, Some((cached_level, cached_wrapped, _))
+            if *cached_level == level && *cached_wrapped == zlib_wrapped)
+        {
+            *slot = Some((level, zlib_wrapped, new_compressor(level, zlib_wrapped)?));
+        }
+        let (_, _, compressor) = slot.as_mut().expect("compressor initialized above");
+        f(compressor)
+    })
+}
+
+#[cfg(not(feature = "libdeflate"))]
+fn new_compressor(level: u32, zlib_wrapped: bool) -> Result<Compressor> {
+    Ok(Compress::new(Compression::new(level), zlib_wrapped))
+}
+
+/// Compress `data`, appending the result to `output`
+#[cfg(not(feature = "libdeflate"))]
+fn deflate(
+    compressor: &mut Compressor,
+    _zlib_wrapped: bool,
+    data: &[u8],
+    output: &mut Vec<u8>,
+) -> Result<()> {
+    compressor.reset();
+
+    loop {
+        let consumed = compressor.total_in() as usize;
+        let status = compressor
+            .compress_vec(&data[consumed..], output, FlushCompress::Finish)
+            .map_err(|e| Error::compression(format!("Zlib compression failed: {}", e)))?;
+
+        match status {
+            Status::StreamEnd => return Ok(()),
+            // Output buffer is full, grow it and keep going
+            Status::Ok | Status::BufError => output.reserve(output.capacity().max(64)),
+        }
+    }
+}
+
+#[cfg(feature = "libdeflate")]
+fn new_compressor(level: u32, _zlib_wrapped: bool) -> Result<Compressor> {
+    let level = libdeflater::CompressionLvl::new(level as i32)
+        .map_err(|e| Error::compression(format!("Invalid zlib compression level: {:?}", e)))?;
+    Ok(libdeflater::Compressor::new(level))
+}
+
+/// Compress `data`, appending the result to `output`
+#[cfg(feature = "libdeflate")]
+fn deflate(
+    compressor: &mut Compressor,
+    zlib_wrapped: bool,
+    data: &[u8],
+    output: &mut Vec<u8>,
+) -> Result<()> {
+    // libdeflate compresses whole buffers in one call into a bounded output
+    let start = output.len();
+    let result = if zlib_wrapped {
+        output.resize(start + compressor.zlib_compress_bound(data.len()), 0);
+        compressor.zlib_compress(data, &mut output[start..])
+    } else {
+        output.resize(start + compressor.deflate_compress_bound(data.len()), 0);
+        compressor.deflate_compress(data, &mut output[start..])
+    };
+    let size =
+        result.map_err(|e| Error::compression(format!("Zlib compression failed: {:?}", e)))?;
+    output.truncate(start + size);
+    Ok(())
 }
 
 #[cfg(test)]
@@ -104,4 +238,40 @@ mod tests {
 
         assert_eq!(decompressed, original);
     }
+
+    #[test]
+    fn test_compressor_reuse_across_levels() {
+        let original: Vec<u8> = (0..20_000u32).map(|i| (i % 251) as u8).collect();
+
+        // Alternate levels so the cached stream is both reused and replaced
+        for level in [6, 6, 1, 9, 1] {
+            let compressed = compress_with_level(&original, level).expect("Compression failed");
+            let decompressed =
+                decompress(&compressed, original.len()).expect("Decompression failed");
+            assert_eq!(decompressed, original);
+        }
+    }
+
+    #[test]
+    fn test_compress_with_checksum_matches_zlib_stream() {
+        let original: Vec<u8> = (0..20_000u32).map(|i| (i % 251) as u8).collect();
+        let checksum = adler::adler32_slice(&original);
+
+        for level in [None, Some(1), Some(6), Some(9)] {
+            let compressed =
+                compress_with_checksum(&original, level, checksum).expect("Compression failed");
+
+            // Valid zlib header and the supplied checksum as the trailer
+            assert_eq!(compressed[0], 0x78);
+            assert_eq!(
+                (u16::from(compressed[0]) << 8 | u16::from(compressed[1])) % 31,
+                0
+            );
+            assert_eq!(compressed[compressed.len() - 4..], checksum.to_be_bytes());
+
+            let decompressed =
+                decompress(&compressed, original.len()).expect("Decompression failed");
+            assert_eq!(decompressed, original);
+        }
+    }
 }
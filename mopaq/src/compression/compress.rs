@@ -10,31 +10,62 @@ use crate::{Error, Result};
 /// - For single compression: the compression method byte followed by compressed data
 /// - For multiple compression: the combined flags byte followed by compressed data
 pub fn compress(data: &[u8], method: u8) -> Result<Vec<u8>> {
-    // Check if compression actually reduces size
-    let compressed = compress_internal(data, method)?;
+    compress_with_level(data, method, None)
+}
+
+/// Compress data using the specified compression method and level
+///
+/// The level is honored by zlib (0-9) and BZip2 (1-9) and ignored by the other
+/// methods. `None` uses each algorithm's default level, like [`compress`].
+/// Lower levels trade compression ratio for speed.
+pub fn compress_with_level(data: &[u8], method: u8, level: Option<u32>) -> Result<Vec<u8>> {
+    let compressed = compress_internal(data, method, level)?;
+    Ok(with_method_byte(data, method, compressed))
+}
+
+/// Compress like [`compress_with_level`], given the Adler-32 of `data`
+///
+/// zlib streams end with the same Adler-32 that MPQ stores as a sector checksum,
+/// so plain zlib compression reuses the caller's value instead of computing it
+/// again. Every other method ignores the checksum.
+pub(crate) fn compress_with_checksum(
+    data: &[u8],
+    method: u8,
+    level: Option<u32>,
+    adler32: u32,
+) -> Result<Vec<u8>> {
+    if method != flags::ZLIB {
+        return compress_with_level(data, method, level);
+    }
+
+    let compressed = algorithms::zlib::compress_with_checksum(data, level, adler32)?;
+    Ok(with_method_byte(data, method, compressed))
+}
 
+/// Prefix compressed data with its method byte, or fall back to the original data
+fn with_method_byte(data: &[u8], method: u8, compressed: Vec<u8>) -> Vec<u8> {
     // MPQ format requires that compression saves at least 2 bytes
     // If it doesn't, we return the original data uncompressed
     if compressed.len() >= data.len() {
         // Return uncompressed data (no compression byte prefix)
-        Ok(data.to_vec())
+        data.to_vec()
     } else {
         // Return compressed data with method byte prefix
         let mut result = Vec::with_capacity(1 + compressed.len());
         result.push(method);
         result.extend_from_slice(&compressed);
-        Ok(result)
+        result
     }
 }
 
 /// Internal compression without the method byte prefix
-fn compress_internal(data: &[u8], method: u8) -> Result<Vec<u8>> {
+fn compress_internal(data: &[u8], method: u8, level: Option<u32>) -> Result<Vec<u8>> {
     let compression = CompressionMethod::from_flags(method);
 
     match compression {
         CompressionMethod::None => Ok(data.to_vec()),
-        CompressionMethod::Zlib => algorithms::zlib::compress(data),
-        CompressionMethod::BZip2 => algorithms::bzip2::compress(data),
+        CompressionMethod::Zlib => compress_zlib(data, level),
+        CompressionMethod::BZip2 => compress_bzip2(data, level),
         CompressionMethod::Lzma => algorithms::lzma::compress(data),
         CompressionMethod::Sparse => algorithms::sparse::compress(data),
         CompressionMethod::AdpcmMono => algorithms::adpcm::compress_mono(data, 5), // Default compression level
@@ -42,12 +73,28 @@ fn compress_internal(data: &[u8], method: u8) -> Result<Vec<u8>> {
         CompressionMethod::PKWare => algorithms::pkware::compress(data),
         CompressionMethod::Implode => algorithms::implode::compress(data),
         CompressionMethod::Huffman => algorithms::huffman::compress(data),
-        CompressionMethod::Multiple(flags) => compress_multiple(data, flags),
+        CompressionMethod::Multiple(flags) => compress_multiple(data, flags, level),
+    }
+}
+
+/// Zlib compression at the requested level, or the default one
+fn compress_zlib(data: &[u8], level: Option<u32>) -> Result<Vec<u8>> {
+    match level {
+        Some(level) => algorithms::zlib::compress_with_level(data, level),
+        None => algorithms::zlib::compress(data),
+    }
+}
+
+/// BZip2 compression at the requested level, or the default one
+fn compress_bzip2(data: &[u8], level: Option<u32>) -> Result<Vec<u8>> {
+    match level {
+        Some(level) => algorithms::bzip2::compress_with_level(data, level),
+        None => algorithms::bzip2::compress(data),
     }
 }
 
 /// Handle multiple compression methods
-fn compress_multiple(data: &[u8], flags: u8) -> Result<Vec<u8>> {
+fn compress_multiple(data: &[u8], flags: u8, level: Option<u32>) -> Result<Vec<u8>> {
     // Check which compressions are requested
     let has_adpcm_mono = (flags & flags::ADPCM_MONO) != 0;
     let has_adpcm_stereo = (flags & flags::ADPCM_STEREO) != 0;
@@ -90,9 +137,9 @@ fn compress_multiple(data: &[u8], flags: u8) -> Result<Vec<u8>> {
     if has_huffman {
         current_data = algorithms::huffman::compress(&current_data)?;
     } else if has_zlib {
-        current_data = algorithms::zlib::compress(&current_data)?;
+        current_data = compress_zlib(&current_data, level)?;
     } else if has_bzip2 {
-        current_data = algorithms::bzip2::compress(&current_data)?;
+        current_data = compress_bzip2(&current_data, level)?;
     } else if has_sparse {
         current_data = algorithms::sparse::compress(&current_data)?;
     } else if has_pkware {
@@ -136,6 +183,21 @@ mod tests {
         }
     }
 
+    #[test]
+    fn test_compress_with_level_round_trip() {
+        let original = "Level one is fast. ".repeat(200).into_bytes();
+
+        for method in [flags::ZLIB, flags::BZIP2] {
+            let fast = compress_with_level(&original, method, Some(1)).expect("Compression failed");
+            assert_eq!(fast[0], method);
+
+            let decompressed =
+                super::super::decompress::decompress(&fast[1..], method, original.len())
+                    .expect("Decompression failed");
+            assert_eq!(decompressed, original);
+        }
+    }
+
     #[test]
     fn test_lzma_api() {
         let original = b"Test data for LZMA compression through the public API";
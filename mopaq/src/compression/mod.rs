@@ -6,6 +6,7 @@ mod decompress;
 mod methods;
 
 // Re-export the main public API
-pub use compress::compress;
+pub(crate) use compress::compress_with_checksum;
+pub use compress::{compress, compress_with_level};
 pub use decompress::decompress;
 pub use methods::{flags, CompressionMethod};
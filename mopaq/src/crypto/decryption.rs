@@ -1,8 +1,9 @@
 //! Decryption operations for MPQ files
 
-use super::keys::ENCRYPTION_TABLE;
+use super::keys::crypt_table_row;
 
 /// Decrypt a block of data
+#[inline]
 pub fn decrypt_block(data: &mut [u32], mut key: u32) {
     if key == 0 {
         return;
@@ -10,9 +11,12 @@ pub fn decrypt_block(data: &mut [u32], mut key: u32) {
 
     let mut seed: u32 = 0xEEEEEEEE;
 
+    // Same fifth-block lookup as encryption, indexed by the key's low byte
+    let table = crypt_table_row(4);
+
     for value in data.iter_mut() {
         // Update seed using the encryption table and key
-        seed = seed.wrapping_add(ENCRYPTION_TABLE[0x400 + (key & 0xFF) as usize]);
+        seed = seed.wrapping_add(table[(key & 0xFF) as usize]);
 
         // Decrypt the current DWORD
         let ch = *value ^ (key.wrapping_add(seed));
@@ -29,6 +33,33 @@ pub fn decrypt_block(data: &mut [u32], mut key: u32) {
     }
 }
 
+/// Decrypt the whole little-endian DWORDs of a byte buffer in place
+///
+/// Trailing bytes that do not fill a complete DWORD are left untouched.
+#[inline]
+pub fn decrypt_bytes(data: &mut [u8], mut key: u32) {
+    if key == 0 {
+        return;
+    }
+
+    let mut seed: u32 = 0xEEEEEEEE;
+    let table = crypt_table_row(4);
+
+    for chunk in data.chunks_exact_mut(4) {
+        seed = seed.wrapping_add(table[(key & 0xFF) as usize]);
+
+        let ch =
+            u32::from_le_bytes([chunk[0], chunk[1], chunk[2], chunk[3]]) ^ key.wrapping_add(seed);
+        chunk.copy_from_slice(&ch.to_le_bytes());
+
+        key = (!key << 0x15).wrapping_add(0x11111111) | (key >> 0x0B);
+        seed = ch
+            .wrapping_add(seed)
+            .wrapping_add(seed << 5)
+            .wrapping_add(3);
+    }
+}
+
 /// Decrypt a single DWORD value
 pub fn decrypt_dword(value: u32, key: u32) -> u32 {
     if key == 0 {
@@ -36,7 +67,7 @@ pub fn decrypt_dword(value: u32, key: u32) -> u32 {
     }
 
     let mut seed: u32 = 0xEEEEEEEE;
-    seed = seed.wrapping_add(ENCRYPTION_TABLE[0x400 + (key & 0xFF) as usize]);
+    seed = seed.wrapping_add(crypt_table_row(4)[(key & 0xFF) as usize]);
 
     value ^ (key.wrapping_add(seed))
 }
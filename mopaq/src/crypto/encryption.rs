@@ -1,8 +1,9 @@
 //! Encryption operations for MPQ files
 
-use super::keys::ENCRYPTION_TABLE;
+use super::keys::crypt_table_row;
 
 /// Encrypt a block of data
+#[inline]
 pub fn encrypt_block(data: &mut [u32], mut key: u32) {
     if key == 0 {
         return;
@@ -10,9 +11,13 @@ pub fn encrypt_block(data: &mut [u32], mut key: u32) {
 
     let mut seed: u32 = 0xEEEEEEEE;
 
+    // The cipher only reads the fifth block of the table, indexed by the low
+    // byte of the key, so those lookups need no bounds check
+    let table = crypt_table_row(4);
+
     for value in data.iter_mut() {
         // Update seed using the encryption table and key
-        seed = seed.wrapping_add(ENCRYPTION_TABLE[0x400 + (key & 0xFF) as usize]);
+        seed = seed.wrapping_add(table[(key & 0xFF) as usize]);
 
         // Store original value
         let ch = *value;
@@ -31,6 +36,33 @@ pub fn encrypt_block(data: &mut [u32], mut key: u32) {
     }
 }
 
+/// Encrypt the whole little-endian DWORDs of a byte buffer in place
+///
+/// Trailing bytes that do not fill a complete DWORD are left untouched.
+/// This avoids copying the buffer into a temporary `u32` vector.
+#[inline]
+pub fn encrypt_bytes(data: &mut [u8], mut key: u32) {
+    if key == 0 {
+        return;
+    }
+
+    let mut seed: u32 = 0xEEEEEEEE;
+    let table = crypt_table_row(4);
+
+    for chunk in data.chunks_exact_mut(4) {
+        seed = seed.wrapping_add(table[(key & 0xFF) as usize]);
+
+        let ch = u32::from_le_bytes([chunk[0], chunk[1], chunk[2], chunk[3]]);
+        chunk.copy_from_slice(&(ch ^ key.wrapping_add(seed)).to_le_bytes());
+
+        key = (!key << 0x15).wrapping_add(0x11111111) | (key >> 0x0B);
+        seed = ch
+            .wrapping_add(seed)
+            .wrapping_add(seed << 5)
+            .wrapping_add(3);
+    }
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -107,4 +139,26 @@ mod tests {
         assert_ne!(data1, original);
         assert_ne!(data2, original);
     }
+
+    #[test]
+    fn test_encrypt_bytes_matches_encrypt_block() {
+        let dwords = vec![0x12345678u32, 0x9ABCDEF0, 0x13579BDF, 0x2468ACE0];
+        let key = 0xC1EB1CEF;
+
+        let mut bytes: Vec<u8> = dwords.iter().flat_map(|d| d.to_le_bytes()).collect();
+        bytes.extend_from_slice(&[0xAA, 0xBB]);
+
+        let mut expected = dwords.clone();
+        encrypt_block(&mut expected, key);
+
+        encrypt_bytes(&mut bytes, key);
+
+        for (i, &value) in expected.iter().enumerate() {
+            let actual = u32::from_le_bytes(bytes[i * 4..i * 4 + 4].try_into().unwrap());
+            assert_eq!(actual, value);
+        }
+
+        // Partial trailing DWORD is not touched
+        assert_eq!(&bytes[16..], &[0xAA, 0xBB]);
+    }
 }
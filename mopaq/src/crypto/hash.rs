@@ -1,27 +1,22 @@
 //! Hash algorithms for MPQ file name hashing
 
-use super::keys::{ASCII_TO_LOWER, ASCII_TO_UPPER, ENCRYPTION_TABLE};
+use super::keys::{crypt_table_row, HASH_NAME_LOWER, HASH_NAME_UPPER};
 
 /// Hash a string using the MPQ hash algorithm
 pub fn hash_string(filename: &str, hash_type: u32) -> u32 {
     let mut seed1: u32 = 0x7FED7FED;
     let mut seed2: u32 = 0xEEEEEEEE;
 
-    for &byte in filename.as_bytes() {
-        // Get the next character and normalize it
-        let mut ch = byte;
-
-        // Convert path separators to backslash
-        if ch == b'/' {
-            ch = b'\\';
-        }
+    // Select the 256-entry block for this hash type once, so the per-character
+    // lookup is indexed by a byte and needs no bounds check
+    let table = crypt_table_row(hash_type as usize);
 
-        // Convert to uppercase using the table
-        ch = ASCII_TO_UPPER[ch as usize];
+    for &byte in filename.as_bytes() {
+        // Convert to uppercase and path separators to backslash in one lookup
+        let ch = HASH_NAME_UPPER[byte as usize];
 
         // Update the hash
-        let table_idx = (hash_type * 0x100 + ch as u32) as usize;
-        seed1 = ENCRYPTION_TABLE[table_idx] ^ (seed1.wrapping_add(seed2));
+        seed1 = table[ch as usize] ^ (seed1.wrapping_add(seed2));
         seed2 = (ch as u32)
             .wrapping_add(seed1)
             .wrapping_add(seed2)
@@ -32,21 +27,39 @@ pub fn hash_string(filename: &str, hash_type: u32) -> u32 {
     seed1
 }
 
+/// Hash a string with the three hash types used for hash table lookups
+///
+/// Returns `(table_offset, name_a, name_b)`, computed in a single pass over the
+/// filename instead of three separate [`hash_string`] calls.
+pub fn hash_string_lookup(filename: &str) -> (u32, u32, u32) {
+    let mut seeds1: [u32; 3] = [0x7FED7FED; 3];
+    let mut seeds2: [u32; 3] = [0xEEEEEEEE; 3];
+    let tables = [crypt_table_row(0), crypt_table_row(1), crypt_table_row(2)];
+
+    for &byte in filename.as_bytes() {
+        // Normalize the character once for all three hash types
+        let ch = HASH_NAME_UPPER[byte as usize];
+
+        for ((seed1, seed2), table) in seeds1.iter_mut().zip(seeds2.iter_mut()).zip(&tables) {
+            *seed1 = table[ch as usize] ^ (seed1.wrapping_add(*seed2));
+            *seed2 = (ch as u32)
+                .wrapping_add(*seed1)
+                .wrapping_add(*seed2)
+                .wrapping_add(*seed2 << 5)
+                .wrapping_add(3);
+        }
+    }
+
+    (seeds1[0], seeds1[1], seeds1[2])
+}
+
 /// Jenkins hash function for HET tables
 pub fn jenkins_hash(filename: &str) -> u64 {
     let mut hash: u64 = 0;
 
     for &byte in filename.as_bytes() {
-        // Get the next character and normalize it
-        let mut ch = byte;
-
-        // Convert path separators to backslash
-        if ch == b'/' {
-            ch = b'\\';
-        }
-
-        // Convert to lowercase using the table
-        ch = ASCII_TO_LOWER[ch as usize];
+        // Convert to lowercase and path separators to backslash in one lookup
+        let ch = HASH_NAME_LOWER[byte as usize];
 
         // Jenkins one-at-a-time hash algorithm
         hash = hash.wrapping_add(ch as u64);
@@ -193,6 +206,39 @@ mod tests {
         assert_ne!(hash_b, 0);
     }
 
+    #[test]
+    fn test_table_key_constants() {
+        use crate::crypto::keys::{BLOCK_TABLE_KEY, HASH_TABLE_KEY};
+
+        assert_eq!(
+            hash_string("(hash table)", hash_type::FILE_KEY),
+            HASH_TABLE_KEY
+        );
+        assert_eq!(
+            hash_string("(block table)", hash_type::FILE_KEY),
+            BLOCK_TABLE_KEY
+        );
+    }
+
+    #[test]
+    fn test_hash_string_lookup_matches_hash_string() {
+        for filename in [
+            "(listfile)",
+            "path/to/File.txt",
+            "units\\human\\footman.mdx",
+            "",
+        ] {
+            assert_eq!(
+                hash_string_lookup(filename),
+                (
+                    hash_string(filename, hash_type::TABLE_OFFSET),
+                    hash_string(filename, hash_type::NAME_A),
+                    hash_string(filename, hash_type::NAME_B),
+                )
+            );
+        }
+    }
+
     #[test]
     fn test_encryption_key_calculation() {
         // Test file key calculation for encryption
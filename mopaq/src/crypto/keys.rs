@@ -30,6 +30,30 @@ const fn generate_encryption_table() -> [u32; 0x500] {
 /// The static encryption table used by all MPQ operations
 pub const ENCRYPTION_TABLE: [u32; 0x500] = generate_encryption_table();
 
+/// Single shared instance of [`ENCRYPTION_TABLE`] for runtime-indexed lookups
+///
+/// A `const` is inlined at every use site, so the hashing and encryption loops
+/// index this `static` instead to guarantee one table in read-only memory.
+pub(crate) static CRYPT_TABLE: [u32; 0x500] = ENCRYPTION_TABLE;
+
+/// Get the 256-entry block of the encryption table at `index` (0..=4)
+///
+/// Blocks 0-3 are used by the hash types, block 4 by the file cipher.
+/// Indexing the returned array with a byte needs no bounds check.
+#[inline]
+pub(crate) fn crypt_table_row(index: usize) -> &'static [u32; 0x100] {
+    let start = index * 0x100;
+    CRYPT_TABLE[start..start + 0x100]
+        .try_into()
+        .expect("slice is exactly 0x100 entries")
+}
+
+/// Encryption key of the hash table (and HET table), i.e. the `FILE_KEY` hash of `"(hash table)"`
+pub const HASH_TABLE_KEY: u32 = 0xC3AF3770;
+
+/// Encryption key of the block table (and BET table), i.e. the `FILE_KEY` hash of `"(block table)"`
+pub const BLOCK_TABLE_KEY: u32 = 0xEC83B3A3;
+
 /// ASCII uppercase conversion table
 pub(crate) const ASCII_TO_UPPER: [u8; 256] = [
     // 0x00-0x0F
@@ -66,6 +90,18 @@ pub(crate) const ASCII_TO_UPPER: [u8; 256] = [
     0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
 ];
 
+/// Uppercase conversion table that also maps '/' to '\\', for MPQ name hashing
+///
+/// Folding the path separator into the case table lets the hash loops
+/// normalize each character with a single lookup and no branch. Like
+/// [`CRYPT_TABLE`] it is a `static`, so every hash loop indexes the same
+/// read-only table instead of a copy inlined at each use site.
+pub(crate) static HASH_NAME_UPPER: [u8; 256] = {
+    let mut table = ASCII_TO_UPPER;
+    table[b'/' as usize] = b'\\';
+    table
+};
+
 /// ASCII lowercase conversion table
 pub(crate) const ASCII_TO_LOWER: [u8; 256] = [
     // 0x00-0x0F
@@ -102,32 +138,75 @@ pub(crate) const ASCII_TO_LOWER: [u8; 256] = [
     0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
 ];
 
+/// Lowercase conversion table that also maps '/' to '\\', for HET name hashing
+pub(crate) static HASH_NAME_LOWER: [u8; 256] = {
+    let mut table = ASCII_TO_LOWER;
+    table[b'/' as usize] = b'\\';
+    table
+};
+
 #[cfg(test)]
 mod tests {
     use super::*;
 
+    /// Known `(index, value)` pairs of the encryption table, from the MPQ
+    /// specification: the first few, the start of each sub-table and the last few
+    const KNOWN_TABLE_VALUES: [(usize, u32); 14] = [
+        (0x000, 0x55C6_36E2),
+        (0x001, 0x02BE_0170),
+        (0x002, 0x584B_71D4),
+        (0x003, 0x2984_F00E),
+        (0x004, 0xB682_C809),
+        (0x100, 0x76F8_C1B1),
+        (0x200, 0x3DF6_965D),
+        (0x300, 0x15F2_61D3),
+        (0x400, 0x193A_A698),
+        (0x4FB, 0x6149_809C),
+        (0x4FC, 0xB009_9EF4),
+        (0x4FD, 0xC5F6_53A5),
+        (0x4FE, 0x4C10_790D),
+        (0x4FF, 0x7303_286C),
+    ];
+
     #[test]
     fn test_encryption_table_generation() {
-        // Test known values from the encryption table
-        // These values are from the MPQ specification
-        assert_eq!(ENCRYPTION_TABLE[0x000], 0x55C6_36E2);
-        assert_eq!(ENCRYPTION_TABLE[0x001], 0x02BE_0170);
-        assert_eq!(ENCRYPTION_TABLE[0x002], 0x584B_71D4);
-        assert_eq!(ENCRYPTION_TABLE[0x003], 0x2984_F00E);
-        assert_eq!(ENCRYPTION_TABLE[0x004], 0xB682_C809);
-
-        // Test some middle values
-        assert_eq!(ENCRYPTION_TABLE[0x100], 0x76F8_C1B1);
-        assert_eq!(ENCRYPTION_TABLE[0x200], 0x3DF6_965D);
-        assert_eq!(ENCRYPTION_TABLE[0x300], 0x15F2_61D3);
-        assert_eq!(ENCRYPTION_TABLE[0x400], 0x193A_A698);
-
-        // Test last few values
-        assert_eq!(ENCRYPTION_TABLE[0x4FB], 0x6149_809C);
-        assert_eq!(ENCRYPTION_TABLE[0x4FC], 0xB009_9EF4);
-        assert_eq!(ENCRYPTION_TABLE[0x4FD], 0xC5F6_53A5);
-        assert_eq!(ENCRYPTION_TABLE[0x4FE], 0x4C10_790D);
-        assert_eq!(ENCRYPTION_TABLE[0x4FF], 0x7303_286C);
+        for (index, expected) in KNOWN_TABLE_VALUES {
+            assert_eq!(
+                ENCRYPTION_TABLE[index], expected,
+                "encryption table entry 0x{index:03X}"
+            );
+        }
+
+        // The shared static copy must match the compile-time table
+        assert_eq!(CRYPT_TABLE, ENCRYPTION_TABLE);
+    }
+
+    #[test]
+    fn test_hash_name_upper_table() {
+        assert_eq!(HASH_NAME_UPPER[b'/' as usize], b'\\');
+        assert_eq!(HASH_NAME_UPPER[b'\\' as usize], b'\\');
+        assert_eq!(HASH_NAME_UPPER[b'a' as usize], b'A');
+
+        // Everything else matches the plain uppercase table
+        for ch in 0..=255u8 {
+            if ch != b'/' {
+                assert_eq!(HASH_NAME_UPPER[ch as usize], ASCII_TO_UPPER[ch as usize]);
+            }
+        }
+    }
+
+    #[test]
+    fn test_hash_name_lower_table() {
+        assert_eq!(HASH_NAME_LOWER[b'/' as usize], b'\\');
+        assert_eq!(HASH_NAME_LOWER[b'\\' as usize], b'\\');
+        assert_eq!(HASH_NAME_LOWER[b'A' as usize], b'a');
+
+        // Everything else matches the plain lowercase table
+        for ch in 0..=255u8 {
+            if ch != b'/' {
+                assert_eq!(HASH_NAME_LOWER[ch as usize], ASCII_TO_LOWER[ch as usize]);
+            }
+        }
     }
 
     #[test]
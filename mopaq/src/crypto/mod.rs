@@ -8,9 +8,9 @@ mod signature;
 mod types;
 
 // Re-export public API
-pub use decryption::{decrypt_block, decrypt_dword};
-pub use encryption::encrypt_block;
-pub use hash::{hash_string, jenkins_hash};
+pub use decryption::{decrypt_block, decrypt_bytes, decrypt_dword};
+pub use encryption::{encrypt_block, encrypt_bytes};
+pub use hash::{hash_string, hash_string_lookup, jenkins_hash};
 pub use signature::{
     calculate_mpq_hash_md5, parse_strong_signature, parse_weak_signature, public_keys,
     verify_strong_signature, verify_weak_signature, verify_weak_signature_stormlib, SignatureInfo,
@@ -20,6 +20,6 @@ pub use signature::{
 pub use types::hash_type;
 
 // Re-export constants that might be needed elsewhere
-pub use keys::ENCRYPTION_TABLE;
+pub use keys::{BLOCK_TABLE_KEY, ENCRYPTION_TABLE, HASH_TABLE_KEY};
 
 // Internal-only exports
@@ -35,6 +35,11 @@ pub const MPQ_USERDATA_SIGNATURE: u32 = 0x1B51504D;
 /// Header alignment requirement (512 bytes)
 pub const HEADER_ALIGNMENT: u64 = 0x200;
 
+/// Number of bytes read at a time while scanning for a header
+///
+/// Must be a multiple of [`HEADER_ALIGNMENT`].
+const HEADER_SCAN_WINDOW: u64 = 0x10000;
+
 /// MPQ format version
 #[repr(u16)]
 #[derive(Debug, Clone, Copy, PartialEq, Eq, PartialOrd, Ord)]
@@ -60,6 +65,11 @@ impl FormatVersion {
         }
     }
 
+    /// Get the version number as written in names and messages (1-4)
+    pub fn number(&self) -> u16 {
+        *self as u16 + 1
+    }
+
     /// Create from raw version number
     pub fn from_raw(raw: u16) -> Option<Self> {
         match raw {
@@ -276,66 +286,147 @@ impl MpqHeader {
 }
 
 /// Find the MPQ header in a file
+///
+/// Candidate positions are checked from an in-memory window of 64 KiB, so
+/// scanning past a large prefix (such as an executable stub) costs one read
+/// per window instead of one per position.
 pub fn find_header<R: Read + Seek>(
     reader: &mut R,
 ) -> Result<(u64, Option<UserDataHeader>, MpqHeader)> {
     let mut offset = 0u64;
     let file_size = reader.seek(SeekFrom::End(0))?;
-    reader.seek(SeekFrom::Start(0))?;
-
-    loop {
-        if offset >= file_size {
-            return Err(Error::invalid_format("No MPQ header found"));
-        }
+    let mut window = Vec::new();
 
+    while offset < file_size {
+        // Read the next window of candidate positions in one go
+        let window_len = (file_size - offset).min(HEADER_SCAN_WINDOW) as usize;
+        window.resize(window_len, 0);
         reader.seek(SeekFrom::Start(offset))?;
+        reader.read_exact(&mut window)?;
 
-        // Try to read a signature
-        let signature = match reader.read_u32_le() {
-            Ok(sig) => sig,
-            Err(_) => {
-                offset += HEADER_ALIGNMENT;
-                continue;
-            }
-        };
-
-        match signature {
-            MPQ_HEADER_SIGNATURE => {
-                // Found standard MPQ header
-                reader.seek(SeekFrom::Start(offset))?;
-                let header = MpqHeader::read(reader)?;
-                return Ok((offset, None, header));
-            }
-            MPQ_USERDATA_SIGNATURE => {
-                // Found user data header
-                let user_data_size = reader.read_u32_le()?;
-                let header_offset = reader.read_u32_le()?;
-                let user_data_header_size = reader.read_u32_le()?;
-
-                let user_data = UserDataHeader {
-                    user_data_size,
-                    header_offset,
-                    user_data_header_size,
-                };
-
-                // Calculate actual header position
-                let mpq_offset = offset + header_offset as u64;
-                if mpq_offset < file_size {
-                    reader.seek(SeekFrom::Start(mpq_offset))?;
-
-                    // Verify there's an MPQ header at the calculated position
-                    let mpq_sig = reader.read_u32_le()?;
-                    if mpq_sig == MPQ_HEADER_SIGNATURE {
+        for pos in (0..window_len).step_by(HEADER_ALIGNMENT as usize) {
+            // A position too close to the end of the file cannot hold a signature
+            let Some(signature) = window.get(pos..pos + 4) else {
+                break;
+            };
+            let signature = u32::from_le_bytes(signature.try_into().unwrap());
+            let candidate = offset + pos as u64;
+
+            match signature {
+                MPQ_HEADER_SIGNATURE => {
+                    // Found standard MPQ header
+                    reader.seek(SeekFrom::Start(candidate))?;
+                    let header = MpqHeader::read(reader)?;
+                    return Ok((candidate, None, header));
+                }
+                MPQ_USERDATA_SIGNATURE => {
+                    // Found user data header
+                    reader.seek(SeekFrom::Start(candidate + 4))?;
+                    let user_data_size = reader.read_u32_le()?;
+                    let header_offset = reader.read_u32_le()?;
+                    let user_data_header_size = reader.read_u32_le()?;
+
+                    let user_data = UserDataHeader {
+                        user_data_size,
+                        header_offset,
+                        user_data_header_size,
+                    };
+
+                    // Calculate actual header position
+                    let mpq_offset = candidate + header_offset as u64;
+                    if mpq_offset < file_size {
                         reader.seek(SeekFrom::Start(mpq_offset))?;
-                        let header = MpqHeader::read(reader)?;
-                        return Ok((mpq_offset, Some(user_data), header));
+
+                        // Verify there's an MPQ header at the calculated position
+                        let mpq_sig = reader.read_u32_le()?;
+                        if mpq_sig == MPQ_HEADER_SIGNATURE {
+                            reader.seek(SeekFrom::Start(mpq_offset))?;
+                            let header = MpqHeader::read(reader)?;
+                            return Ok((mpq_offset, Some(user_data), header));
+                        }
                     }
                 }
+                _ => {}
             }
-            _ => {}
         }
 
-        // Move to next potential header position
-        offset += HEADER_ALIGNMENT;
+        // Move to the next window; it stays aligned because the window size is
+        // a multiple of the header alignment
+        offset += window_len as u64;
+    }
+
+    Err(Error::invalid_format("No MPQ header found"))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::io::Cursor;
+
+    /// Serialize a minimal version 1 header
+    fn v1_header() -> Vec<u8> {
+        let mut header = Vec::with_capacity(0x20);
+        header.extend_from_slice(&MPQ_HEADER_SIGNATURE.to_le_bytes());
+        header.extend_from_slice(&0x20u32.to_le_bytes()); // header size
+        header.extend_from_slice(&0x20u32.to_le_bytes()); // archive size
+        header.extend_from_slice(&0u16.to_le_bytes()); // format version
+        header.extend_from_slice(&3u16.to_le_bytes()); // block size
+        header.extend_from_slice(&0x20u32.to_le_bytes()); // hash table position
+        header.extend_from_slice(&0x20u32.to_le_bytes()); // block table position
+        header.extend_from_slice(&0u32.to_le_bytes()); // hash table size
+        header.extend_from_slice(&0u32.to_le_bytes()); // block table size
+        header
+    }
+
+    /// Serialize a user data header pointing `header_offset` bytes ahead
+    fn user_data_header(header_offset: u32) -> Vec<u8> {
+        let mut header = Vec::with_capacity(16);
+        header.extend_from_slice(&MPQ_USERDATA_SIGNATURE.to_le_bytes());
+        header.extend_from_slice(&0x200u32.to_le_bytes()); // user data size
+        header.extend_from_slice(&header_offset.to_le_bytes());
+        header.extend_from_slice(&16u32.to_le_bytes()); // user data header size
+        header
+    }
+
+    #[test]
+    fn test_find_header_in_second_window() {
+        let offset = HEADER_SCAN_WINDOW + HEADER_ALIGNMENT;
+        let mut data = vec![0u8; offset as usize];
+        data.extend_from_slice(&v1_header());
+
+        let (pos, user_data, header) = find_header(&mut Cursor::new(data)).unwrap();
+        assert_eq!(pos, 0x10200);
+        assert!(user_data.is_none());
+        assert_eq!(header.format_version, FormatVersion::V1);
+        assert_eq!(header.block_size, 3);
+    }
+
+    #[test]
+    fn test_find_header_user_data_target_past_window() {
+        let header_offset = (HEADER_SCAN_WINDOW + HEADER_ALIGNMENT) as u32;
+        let mut data = user_data_header(header_offset);
+        data.resize(header_offset as usize, 0);
+        data.extend_from_slice(&v1_header());
+
+        let (pos, user_data, header) = find_header(&mut Cursor::new(data)).unwrap();
+        assert_eq!(pos, header_offset as u64);
+        let user_data = user_data.expect("user data header should be reported");
+        assert_eq!(user_data.header_offset, header_offset);
+        assert_eq!(user_data.user_data_size, 0x200);
+        assert_eq!(header.format_version, FormatVersion::V1);
+    }
+
+    #[test]
+    fn test_find_header_short_tail() {
+        // The last aligned position starts a window of its own and holds only
+        // the first two bytes of a signature
+        let mut data = vec![0u8; HEADER_SCAN_WINDOW as usize];
+        data.extend_from_slice(&MPQ_HEADER_SIGNATURE.to_le_bytes()[..2]);
+        let result = find_header(&mut Cursor::new(data));
+        assert!(matches!(result, Err(Error::InvalidFormat(_))));
+
+        // A file shorter than a signature
+        let result = find_header(&mut Cursor::new(vec![0x4D, 0x50, 0x51]));
+        assert!(matches!(result, Err(Error::InvalidFormat(_))));
     }
 }
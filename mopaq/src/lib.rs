@@ -52,6 +52,7 @@ pub mod crypto;
 pub mod error;
 pub mod header;
 pub mod io;
+mod parallel;
 pub mod special_files;
 pub mod tables;
 
@@ -70,7 +71,8 @@ pub use tables::{BetFileInfo, BetTable, BlockEntry, BlockTable, HashEntry, HashT
 
 // Re-export crypto for CLI usage
 pub use crypto::{
-    decrypt_block, decrypt_dword, encrypt_block, hash_string, hash_type, jenkins_hash,
+    decrypt_block, decrypt_dword, encrypt_block, hash_string, hash_string_lookup, hash_type,
+    jenkins_hash,
 };
 
 // Re-export compression for testing
@@ -0,0 +1,66 @@
+//! Spreading independent work over scoped worker threads
+
+/// Number of worker threads available for parallel work
+pub(crate) fn worker_count() -> usize {
+    std::thread::available_parallelism().map_or(1, |n| n.get())
+}
+
+/// Apply `f` to consecutive chunks of `items`, returning one result per chunk in order
+///
+/// With fewer than `min_items` items, or a single core, `f` runs once over all
+/// of `items` on the calling thread, since starting threads would cost more
+/// than the work itself. Otherwise the items are split into one chunk per
+/// worker thread. A panic on a worker is resumed on the calling thread.
+pub(crate) fn map_chunks<T, R, F>(items: &[T], min_items: usize, f: F) -> Vec<R>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&[T]) -> R + Sync,
+{
+    let workers = worker_count();
+    if workers < 2 || items.len() < min_items.max(2) {
+        return vec![f(items)];
+    }
+
+    let per_worker = items.len().div_ceil(workers);
+    std::thread::scope(|scope| {
+        let f = &f;
+        let handles: Vec<_> = items
+            .chunks(per_worker)
+            .map(|chunk| scope.spawn(move || f(chunk)))
+            .collect();
+
+        handles
+            .into_iter()
+            .map(|handle| {
+                handle
+                    .join()
+                    .unwrap_or_else(|panic| std::panic::resume_unwind(panic))
+            })
+            .collect()
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_map_chunks_below_threshold_runs_once() {
+        let items = [1, 2, 3];
+        let results = map_chunks(&items, 4, |chunk| chunk.to_vec());
+        assert_eq!(results, vec![vec![1, 2, 3]]);
+    }
+
+    #[test]
+    fn test_map_chunks_keeps_order() {
+        let items: Vec<u32> = (0..10_000).collect();
+        let results: Vec<u32> = map_chunks(&items, 2, |chunk| {
+            chunk.iter().map(|i| i * 2).collect::<Vec<_>>()
+        })
+        .into_iter()
+        .flatten()
+        .collect();
+        assert_eq!(results, items.iter().map(|i| i * 2).collect::<Vec<_>>());
+    }
+}
@@ -5,8 +5,12 @@
 
 use crate::error::{Error, Result};
 use bytes::Bytes;
+use md5::{Digest, Md5};
 use std::io::Cursor;
 
+/// Chunk size used when checksumming file data
+const CHECKSUM_CHUNK_SIZE: usize = 64 * 1024;
+
 /// Flags indicating which attributes are present in the file
 #[derive(Debug, Clone, Copy, PartialEq, Eq)]
 pub struct AttributeFlags(u32);
@@ -77,6 +81,45 @@ impl FileAttributes {
             is_patch: None,
         }
     }
+
+    /// Create attributes holding the CRC32 and MD5 of the given file data
+    ///
+    /// Both checksums are computed in a single pass: the data is fed to the
+    /// CRC32 and MD5 hashers chunk by chunk while each chunk is still in cache.
+    pub fn from_data(data: &[u8]) -> Self {
+        Self::from_data_with_flags(
+            data,
+            AttributeFlags::new(AttributeFlags::CRC32 | AttributeFlags::MD5),
+        )
+    }
+
+    /// Create attributes holding only the checksums selected by `flags`
+    ///
+    /// Only the CRC32 and MD5 flags are considered; a checksum that isn't
+    /// requested is left as `None` and its hasher never runs.
+    pub fn from_data_with_flags(data: &[u8], flags: AttributeFlags) -> Self {
+        let mut crc = flags.has_crc32().then(crc32fast::Hasher::new);
+        let mut md5 = flags.has_md5().then(Md5::new);
+
+        if md5.is_some() {
+            for chunk in data.chunks(CHECKSUM_CHUNK_SIZE) {
+                if let Some(crc) = &mut crc {
+                    crc.update(chunk);
+                }
+                if let Some(md5) = &mut md5 {
+                    md5.update(chunk);
+                }
+            }
+        } else if let Some(crc) = &mut crc {
+            crc.update(data);
+        }
+
+        Self {
+            crc32: crc.map(|crc| crc.finalize()),
+            md5: md5.map(|md5| md5.finalize().into()),
+            ..Self::new()
+        }
+    }
 }
 
 impl Default for FileAttributes {
@@ -123,19 +166,7 @@ impl Attributes {
         let flags = AttributeFlags::new(read_u32_le(&mut cursor)?);
 
         // Calculate expected size
-        let mut expected_size = 8; // header
-        if flags.has_crc32() {
-            expected_size += block_count * 4;
-        }
-        if flags.has_filetime() {
-            expected_size += block_count * 8;
-        }
-        if flags.has_md5() {
-            expected_size += block_count * 16;
-        }
-        if flags.has_patch_bit() {
-            expected_size += block_count.div_ceil(8);
-        }
+        let expected_size = Self::serialized_size(flags, block_count);
 
         if data.len() < expected_size {
             return Err(Error::invalid_format(format!(
@@ -145,78 +176,31 @@ impl Attributes {
             )));
         }
 
-        // Parse attributes for each file
-        let mut file_attributes = Vec::with_capacity(block_count);
-
-        // Parse CRC32 array if present
-        let crc32_values = if flags.has_crc32() {
-            let mut values = Vec::with_capacity(block_count);
-            for _ in 0..block_count {
-                values.push(read_u32_le(&mut cursor)?);
-            }
-            Some(values)
-        } else {
-            None
-        };
-
-        // Parse timestamp array if present
-        let filetime_values = if flags.has_filetime() {
-            let mut values = Vec::with_capacity(block_count);
-            for _ in 0..block_count {
-                values.push(read_u64_le(&mut cursor)?);
-            }
-            Some(values)
-        } else {
-            None
-        };
-
-        // Parse MD5 array if present
-        let md5_values = if flags.has_md5() {
-            let mut values = Vec::with_capacity(block_count);
-            for _ in 0..block_count {
-                let mut hash = [0u8; 16];
-                read_exact(&mut cursor, &mut hash)?;
-                values.push(hash);
-            }
-            Some(values)
-        } else {
-            None
-        };
-
-        // Parse patch bits if present
-        let patch_bits = if flags.has_patch_bit() {
-            let byte_count = block_count.div_ceil(8);
-            let mut bits = vec![0u8; byte_count];
-            read_exact(&mut cursor, &mut bits)?;
-            Some(bits)
-        } else {
-            None
-        };
+        // The size check above guarantees every present column is complete, so
+        // each one is sliced out once and decoded in place
+        let mut rest = &data[8..];
+        let crc32_column = flags
+            .has_crc32()
+            .then(|| split_column(&mut rest, block_count * 4));
+        let filetime_column = flags
+            .has_filetime()
+            .then(|| split_column(&mut rest, block_count * 8));
+        let md5_column = flags
+            .has_md5()
+            .then(|| split_column(&mut rest, block_count * 16));
+        let patch_bits = flags
+            .has_patch_bit()
+            .then(|| split_column(&mut rest, block_count.div_ceil(8)));
 
         // Combine into FileAttributes structs
-        for i in 0..block_count {
-            let mut attrs = FileAttributes::new();
-
-            if let Some(ref values) = crc32_values {
-                attrs.crc32 = Some(values[i]);
-            }
-
-            if let Some(ref values) = filetime_values {
-                attrs.filetime = Some(values[i]);
-            }
-
-            if let Some(ref values) = md5_values {
-                attrs.md5 = Some(values[i]);
-            }
-
-            if let Some(ref bits) = patch_bits {
-                let byte_index = i / 8;
-                let bit_index = i % 8;
-                attrs.is_patch = Some((bits[byte_index] & (1 << bit_index)) != 0);
-            }
-
-            file_attributes.push(attrs);
-        }
+        let file_attributes = (0..block_count)
+            .map(|i| FileAttributes {
+                crc32: crc32_column.map(|column| u32::from_le_bytes(column_entry(column, i))),
+                filetime: filetime_column.map(|column| u64::from_le_bytes(column_entry(column, i))),
+                md5: md5_column.map(|column| column_entry(column, i)),
+                is_patch: patch_bits.map(|bits| (bits[i / 8] & (1 << (i % 8))) != 0),
+            })
+            .collect();
 
         Ok(Self {
             version,
@@ -233,7 +217,7 @@ impl Attributes {
     /// Create attributes data for writing to an archive
     pub fn to_bytes(&self) -> Result<Vec<u8>> {
         let block_count = self.file_attributes.len();
-        let mut data = Vec::new();
+        let mut data = Vec::with_capacity(Self::serialized_size(self.flags, block_count));
 
         // Write header
         data.extend_from_slice(&self.version.to_le_bytes());
@@ -263,10 +247,11 @@ impl Attributes {
             }
         }
 
-        // Write patch bits if present
+        // Write patch bits if present, setting them in place in the output
         if self.flags.has_patch_bit() {
-            let byte_count = block_count.div_ceil(8);
-            let mut bits = vec![0u8; byte_count];
+            let start = data.len();
+            data.resize(start + block_count.div_ceil(8), 0);
+            let bits = &mut data[start..];
 
             for (i, attrs) in self.file_attributes.iter().enumerate() {
                 if attrs.is_patch.unwrap_or(false) {
@@ -275,12 +260,30 @@ impl Attributes {
                     bits[byte_index] |= 1 << bit_index;
                 }
             }
-
-            data.extend_from_slice(&bits);
         }
 
+        debug_assert_eq!(data.len(), Self::serialized_size(self.flags, block_count));
+
         Ok(data)
     }
+
+    /// Size in bytes of an attributes file with the given flags and entry count
+    fn serialized_size(flags: AttributeFlags, block_count: usize) -> usize {
+        let mut size = 8; // header
+        if flags.has_crc32() {
+            size += block_count * 4;
+        }
+        if flags.has_filetime() {
+            size += block_count * 8;
+        }
+        if flags.has_md5() {
+            size += block_count * 16;
+        }
+        if flags.has_patch_bit() {
+            size += block_count.div_ceil(8);
+        }
+        size
+    }
 }
 
 // Helper functions for reading from cursor
@@ -291,17 +294,19 @@ fn read_u32_le(cursor: &mut Cursor<&Bytes>) -> Result<u32> {
     Ok(u32::from_le_bytes(bytes))
 }
 
-fn read_u64_le(cursor: &mut Cursor<&Bytes>) -> Result<u64> {
-    use std::io::Read;
-    let mut bytes = [0u8; 8];
-    cursor.read_exact(&mut bytes).map_err(Error::Io)?;
-    Ok(u64::from_le_bytes(bytes))
+/// Split the next `len` bytes off the front of `rest`
+fn split_column<'a>(rest: &mut &'a [u8], len: usize) -> &'a [u8] {
+    let data: &'a [u8] = *rest;
+    let (column, tail) = data.split_at(len);
+    *rest = tail;
+    column
 }
 
-fn read_exact(cursor: &mut Cursor<&Bytes>, buf: &mut [u8]) -> Result<()> {
-    use std::io::Read;
-    cursor.read_exact(buf).map_err(Error::Io)?;
-    Ok(())
+/// Get the `index`-th fixed-size entry of an attribute column
+fn column_entry<const N: usize>(column: &[u8], index: usize) -> [u8; N] {
+    column[index * N..(index + 1) * N]
+        .try_into()
+        .expect("entry slice has exactly N bytes")
 }
 
 #[cfg(test)]
@@ -389,6 +394,7 @@ mod tests {
 
         // Convert to bytes and back
         let bytes = original.to_bytes().unwrap();
+        assert_eq!(bytes.len(), Attributes::serialized_size(original.flags, 2));
         let parsed = Attributes::parse(&Bytes::from(bytes), 2).unwrap();
 
         assert_eq!(parsed.version, original.version);
@@ -399,4 +405,43 @@ mod tests {
             assert_eq!(parsed.file_attributes[i], original.file_attributes[i]);
         }
     }
+
+    #[test]
+    fn test_file_attributes_from_data() {
+        let attrs = FileAttributes::from_data(b"The quick brown fox jumps over the lazy dog");
+        assert_eq!(attrs.crc32, Some(0x414FA339));
+        assert_eq!(
+            attrs.md5,
+            Some([
+                0x9e, 0x10, 0x7d, 0x9d, 0x37, 0x2b, 0xb6, 0x82, 0x6b, 0xd8, 0x1d, 0x35, 0x42, 0xa4,
+                0x19, 0xd6
+            ])
+        );
+        assert_eq!(attrs.filetime, None);
+        assert_eq!(attrs.is_patch, None);
+
+        // Data spanning several chunks must match a one-shot hash
+        let large: Vec<u8> = (0..200_000u32).map(|i| (i % 251) as u8).collect();
+        let attrs = FileAttributes::from_data(&large);
+        assert_eq!(attrs.crc32, Some(crc32fast::hash(&large)));
+        assert_eq!(attrs.md5, Some(Md5::digest(&large).into()));
+    }
+
+    #[test]
+    fn test_file_attributes_from_data_with_flags() {
+        let data = b"The quick brown fox jumps over the lazy dog";
+
+        let crc_only =
+            FileAttributes::from_data_with_flags(data, AttributeFlags::new(AttributeFlags::CRC32));
+        assert_eq!(crc_only.crc32, Some(0x414FA339));
+        assert_eq!(crc_only.md5, None);
+
+        let md5_only =
+            FileAttributes::from_data_with_flags(data, AttributeFlags::new(AttributeFlags::MD5));
+        assert_eq!(md5_only.crc32, None);
+        assert_eq!(md5_only.md5, FileAttributes::from_data(data).md5);
+
+        let neither = FileAttributes::from_data_with_flags(data, AttributeFlags::new(0));
+        assert_eq!(neither, FileAttributes::new());
+    }
 }
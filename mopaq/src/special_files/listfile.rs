@@ -1,6 +1,7 @@
 //! (listfile) parsing functionality
 
 use crate::Result;
+use std::borrow::Cow;
 
 /// Parse a (listfile) into individual filenames
 ///
@@ -10,12 +11,13 @@ use crate::Result;
 /// - Optional file metadata after ';' on each line
 /// - Empty lines are ignored
 pub fn parse_listfile(data: &[u8]) -> Result<Vec<String>> {
-    let content = match std::str::from_utf8(data) {
-        Ok(s) => s.to_string(),
+    // Borrow valid UTF-8 in place; only invalid input needs an owned copy
+    let content: Cow<'_, str> = match std::str::from_utf8(data) {
+        Ok(s) => Cow::Borrowed(s),
         Err(_) => {
             // Try lossy conversion for files with invalid UTF-8
             log::warn!("(listfile) contains invalid UTF-8, using lossy conversion");
-            String::from_utf8_lossy(data).into_owned()
+            String::from_utf8_lossy(data)
         }
     };
 
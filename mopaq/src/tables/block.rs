@@ -1,7 +1,7 @@
 //! Block table implementation for MPQ archives
 
 use super::common::ReadLittleEndian;
-use crate::crypto::{decrypt_block, hash_string, hash_type};
+use crate::crypto::{decrypt_bytes, BLOCK_TABLE_KEY};
 use crate::{Error, Result};
 use std::io::{Read, Seek, SeekFrom};
 
@@ -84,6 +84,16 @@ impl BlockEntry {
             flags: cursor.read_u32_le()?,
         })
     }
+
+    /// Serialize the block entry to its 16-byte little-endian on-disk form
+    pub fn to_bytes(&self) -> [u8; 16] {
+        let mut bytes = [0u8; 16];
+        bytes[0..4].copy_from_slice(&self.file_pos.to_le_bytes());
+        bytes[4..8].copy_from_slice(&self.compressed_size.to_le_bytes());
+        bytes[8..12].copy_from_slice(&self.file_size.to_le_bytes());
+        bytes[12..16].copy_from_slice(&self.flags.to_le_bytes());
+        bytes
+    }
 }
 
 /// Block table
@@ -117,21 +127,8 @@ impl BlockTable {
         let mut raw_data = vec![0u8; byte_size];
         reader.read_exact(&mut raw_data)?;
 
-        // Decrypt the table - SAFE VERSION
-        let key = hash_string("(block table)", hash_type::FILE_KEY);
-
-        // Convert to u32s, decrypt, then convert back
-        let mut u32_buffer: Vec<u32> = raw_data
-            .chunks_exact(4)
-            .map(|chunk| u32::from_le_bytes([chunk[0], chunk[1], chunk[2], chunk[3]]))
-            .collect();
-
-        decrypt_block(&mut u32_buffer, key);
-
-        // Write decrypted u32s back to bytes
-        for (chunk, &decrypted) in raw_data.chunks_exact_mut(4).zip(&u32_buffer) {
-            chunk.copy_from_slice(&decrypted.to_le_bytes());
-        }
+        // Decrypt the table in place
+        decrypt_bytes(&mut raw_data, BLOCK_TABLE_KEY);
 
         // Parse entries
         let mut entries = Vec::with_capacity(size as usize);
@@ -276,4 +273,20 @@ mod tests {
         assert!(encrypted.has_fix_key());
         assert!(!encrypted.is_compressed());
     }
+
+    #[test]
+    fn test_block_entry_bytes_round_trip() {
+        let entry = BlockEntry {
+            file_pos: 0x20,
+            compressed_size: 0x1234,
+            file_size: 0x5678,
+            flags: BlockEntry::FLAG_COMPRESS | BlockEntry::FLAG_EXISTS,
+        };
+
+        let parsed = BlockEntry::from_bytes(&entry.to_bytes()).unwrap();
+        assert_eq!(parsed.file_pos, entry.file_pos);
+        assert_eq!(parsed.compressed_size, entry.compressed_size);
+        assert_eq!(parsed.file_size, entry.file_size);
+        assert_eq!(parsed.flags, entry.flags);
+    }
 }
@@ -1,7 +1,7 @@
 //! Hash table implementation for MPQ archives
 
 use super::common::ReadLittleEndian;
-use crate::crypto::{decrypt_block, hash_string, hash_type};
+use crate::crypto::{decrypt_bytes, hash_string_lookup, HASH_TABLE_KEY};
 use crate::{Error, Result};
 use std::io::{Read, Seek, SeekFrom};
 
@@ -68,6 +68,17 @@ impl HashEntry {
             block_index: cursor.read_u32_le()?,
         })
     }
+
+    /// Serialize the hash entry to its 16-byte little-endian on-disk form
+    pub fn to_bytes(&self) -> [u8; 16] {
+        let mut bytes = [0u8; 16];
+        bytes[0..4].copy_from_slice(&self.name_1.to_le_bytes());
+        bytes[4..8].copy_from_slice(&self.name_2.to_le_bytes());
+        bytes[8..10].copy_from_slice(&self.locale.to_le_bytes());
+        bytes[10..12].copy_from_slice(&self.platform.to_le_bytes());
+        bytes[12..16].copy_from_slice(&self.block_index.to_le_bytes());
+        bytes
+    }
 }
 
 /// Hash table
@@ -103,21 +114,8 @@ impl HashTable {
         let mut raw_data = vec![0u8; byte_size];
         reader.read_exact(&mut raw_data)?;
 
-        // Decrypt the table - SAFE VERSION
-        let key = hash_string("(hash table)", hash_type::FILE_KEY);
-
-        // Convert to u32s, decrypt, then convert back
-        let mut u32_buffer: Vec<u32> = raw_data
-            .chunks_exact(4)
-            .map(|chunk| u32::from_le_bytes([chunk[0], chunk[1], chunk[2], chunk[3]]))
-            .collect();
-
-        decrypt_block(&mut u32_buffer, key);
-
-        // Write decrypted u32s back to bytes
-        for (chunk, &decrypted) in raw_data.chunks_exact_mut(4).zip(&u32_buffer) {
-            chunk.copy_from_slice(&decrypted.to_le_bytes());
-        }
+        // Decrypt the table in place
+        decrypt_bytes(&mut raw_data, HASH_TABLE_KEY);
 
         // Parse entries
         let mut entries = Vec::with_capacity(size as usize);
@@ -148,9 +146,8 @@ impl HashTable {
     /// Find a file in the hash table
     pub fn find_file(&self, filename: &str, locale: u16) -> Option<(usize, &HashEntry)> {
         // Calculate hash values
-        let name_a = hash_string(filename, hash_type::NAME_A);
-        let name_b = hash_string(filename, hash_type::NAME_B);
-        let start_index = hash_string(filename, hash_type::TABLE_OFFSET) as usize;
+        let (start_index, name_a, name_b) = hash_string_lookup(filename);
+        let start_index = start_index as usize;
 
         let table_size = self.entries.len();
         let mut index = start_index & (table_size - 1);
@@ -258,4 +255,22 @@ mod tests {
         assert!(HashTable::new(100).is_err());
         assert!(HashTable::new(0).is_err());
     }
+
+    #[test]
+    fn test_hash_entry_bytes_round_trip() {
+        let entry = HashEntry {
+            name_1: 0x12345678,
+            name_2: 0x9ABCDEF0,
+            locale: 0x0409,
+            platform: 0,
+            block_index: 7,
+        };
+
+        let parsed = HashEntry::from_bytes(&entry.to_bytes()).unwrap();
+        assert_eq!(parsed.name_1, entry.name_1);
+        assert_eq!(parsed.name_2, entry.name_2);
+        assert_eq!(parsed.locale, entry.locale);
+        assert_eq!(parsed.platform, entry.platform);
+        assert_eq!(parsed.block_index, entry.block_index);
+    }
 }
@@ -2,10 +2,16 @@
 //!
 //! Replaces the functionality of generate_test_data.py
 
+use crate::parallel::map_chunks;
 use rand::{rngs::StdRng, Rng, SeedableRng};
+use std::collections::HashSet;
 use std::fs;
+use std::io::Write;
 use std::path::{Path, PathBuf};
 
+/// Minimum number of files before they are generated on worker threads
+const PARALLEL_WRITE_THRESHOLD: usize = 16;
+
 /// Configuration for test data generation
 #[derive(Debug, Clone)]
 pub struct TestDataConfig {
@@ -266,48 +272,67 @@ pub fn generate_test_data(
         fs::remove_dir_all(&output_dir)?;
     }
 
-    // Create base directory
+    // Create base directory and subdirectories, remembering them so the file
+    // parents below don't create them a second time
+    let mut created_dirs = HashSet::new();
     fs::create_dir_all(&output_dir)?;
-
-    // Create subdirectories
+    created_dirs.insert(output_dir.clone());
     for dir in &config.directories {
-        fs::create_dir_all(output_dir.join(dir))?;
+        let dir_path = output_dir.join(dir);
+        fs::create_dir_all(&dir_path)?;
+        created_dirs.insert(dir_path);
     }
 
-    let mut files_created = Vec::new();
-
-    // Create files
+    // Create parent directories up front so the file writes are independent,
+    // skipping the ones that already exist
     for file_config in &config.files {
-        let file_path = output_dir.join(&file_config.path);
-
-        // Ensure parent directory exists
-        if let Some(parent) = file_path.parent() {
-            fs::create_dir_all(parent)?;
-        }
-
-        match file_config.file_type {
-            FileType::Text => {
-                let content = generate_text_content(file_config.size_kb, Compressibility::Medium);
-                fs::write(&file_path, content)?;
-            }
-            FileType::Binary => {
-                let content = generate_binary_content(file_config.size_kb);
-                fs::write(&file_path, content)?;
-            }
-            FileType::Empty => {
-                fs::File::create(&file_path)?;
+        if let Some(parent) = output_dir.join(&file_config.path).parent() {
+            if created_dirs.insert(parent.to_path_buf()) {
+                fs::create_dir_all(parent)?;
             }
         }
-
-        files_created.push(file_config.path.clone());
     }
 
+    // Generate and write the files, on worker threads once there are enough of them
+    map_chunks(&config.files, PARALLEL_WRITE_THRESHOLD, |chunk| {
+        chunk.iter().try_for_each(|file_config| {
+            write_test_file(&output_dir.join(&file_config.path), file_config)
+        })
+    })
+    .into_iter()
+    .collect::<Result<(), _>>()?;
+
+    let files_created = config
+        .files
+        .iter()
+        .map(|file_config| file_config.path.clone())
+        .collect();
+
     Ok(GenerationResult {
         base_path: output_dir,
         files_created,
     })
 }
 
+/// Generate the content for a single test file and write it to disk
+fn write_test_file(file_path: &Path, file_config: &FileConfig) -> Result<(), std::io::Error> {
+    match file_config.file_type {
+        FileType::Text => {
+            let content = generate_text_content(file_config.size_kb, Compressibility::Medium);
+            fs::write(file_path, content)?;
+        }
+        FileType::Binary => {
+            let content = generate_binary_content(file_config.size_kb);
+            fs::write(file_path, content)?;
+        }
+        FileType::Empty => {
+            fs::File::create(file_path)?;
+        }
+    }
+
+    Ok(())
+}
+
 /// Generate text content with specified size and compressibility
 fn generate_text_content(size_kb: usize, compressibility: Compressibility) -> Vec<u8> {
     let target_size = size_kb * 1024;
@@ -322,11 +347,7 @@ fn generate_text_content(size_kb: usize, compressibility: Compressibility) -> Ve
         Compressibility::Medium => {
             // Repeating pattern
             let pattern = b"The quick brown fox jumps over the lazy dog. ";
-            while content.len() < target_size {
-                let remaining = target_size - content.len();
-                let to_copy = remaining.min(pattern.len());
-                content.extend_from_slice(&pattern[..to_copy]);
-            }
+            content.extend(pattern.iter().cycle().take(target_size));
         }
         Compressibility::Low => {
             // Mix of lorem ipsum and structured data
@@ -363,22 +384,26 @@ fn generate_text_content(size_kb: usize, compressibility: Compressibility) -> Ve
                     }
                     content.extend_from_slice(b"\n\n");
                 } else {
-                    // Generate structured data (JSON-like or CSV-like)
+                    // Generate structured data (JSON-like or CSV-like), formatted
+                    // straight into the output buffer
                     if rng.random_bool(0.5) {
                         let id = rng.random_range(1..1000);
-                        let value: String = (0..10)
-                            .map(|_| (b'a' + rng.random::<u8>() % 26) as char)
-                            .collect();
-                        let json = format!("{{\"id\": {}, \"value\": \"{}\"}}\n", id, value);
-                        content.extend_from_slice(json.as_bytes());
+                        write!(content, "{{\"id\": {}, \"value\": \"", id)
+                            .expect("writing to a Vec cannot fail");
+                        // Draw all random bytes for the value at once
+                        let mut value = [0u8; 10];
+                        rng.fill(&mut value);
+                        content.extend(value.iter().map(|byte| b'a' + byte % 26));
+                        content.extend_from_slice(b"\"}\n");
                     } else {
-                        let csv = format!(
-                            "{},{},{:.3}\n",
+                        writeln!(
+                            content,
+                            "{},{},{:.3}",
                             rng.random_range(1..100),
                             (b'A' + rng.random::<u8>() % 26) as char,
                             rng.random::<f32>()
-                        );
-                        content.extend_from_slice(csv.as_bytes());
+                        )
+                        .expect("writing to a Vec cannot fail");
                     }
                 }
             }
@@ -2,6 +2,7 @@
 //!
 //! Replaces the functionality of mpq_tools.py
 
+use crate::special_files::{AttributeFlags, Attributes, FileAttributes};
 use crate::{compression, ArchiveBuilder, FormatVersion};
 use rand::{rngs::StdRng, Rng, SeedableRng};
 use std::fs;
@@ -24,6 +25,8 @@ pub struct TestArchiveConfig {
     pub include_listfile: bool,
     /// Whether to include an (attributes) file
     pub include_attributes: bool,
+    /// Whether the (attributes) file carries MD5 hashes (CRC32 is always included)
+    pub attributes_md5: bool,
 }
 
 /// A file to include in the test archive
@@ -62,7 +65,7 @@ impl TestArchiveConfig {
     /// Create a minimal test archive configuration
     pub fn minimal(version: FormatVersion) -> Self {
         Self {
-            name: format!("minimal_v{}", version as u8 + 1),
+            name: format!("minimal_v{}", version.number()),
             version,
             files: vec![TestFile {
                 name: "test.txt".to_string(),
@@ -75,6 +78,7 @@ impl TestArchiveConfig {
             block_size: Some(3),
             include_listfile: version == FormatVersion::V1,
             include_attributes: false,
+            attributes_md5: false,
         }
     }
 
@@ -113,6 +117,7 @@ impl TestArchiveConfig {
             block_size: Some(4),
             include_listfile: false,
             include_attributes: false,
+            attributes_md5: false,
         }
     }
 
@@ -141,6 +146,7 @@ impl TestArchiveConfig {
             block_size: Some(3),
             include_listfile: false,
             include_attributes: false,
+            attributes_md5: false,
         }
     }
 
@@ -195,6 +201,7 @@ impl TestArchiveConfig {
             block_size: Some(5),
             include_listfile: true,
             include_attributes: false,
+            attributes_md5: false,
         }
     }
 
@@ -244,13 +251,14 @@ impl TestArchiveConfig {
         }
 
         Self {
-            name: format!("comprehensive_v{}", version as u8 + 1),
+            name: format!("comprehensive_v{}", version.number()),
             version,
             files,
             hash_table_size: Some(128),
             block_size: Some(7), // 64KB sectors
             include_listfile: true,
             include_attributes: version >= FormatVersion::V2,
+            attributes_md5: false,
         }
     }
 
@@ -270,6 +278,7 @@ impl TestArchiveConfig {
             block_size: Some(3),
             include_listfile: false,
             include_attributes: false,
+            attributes_md5: false,
         }
     }
 }
@@ -278,6 +287,19 @@ impl TestArchiveConfig {
 pub fn create_test_archive(
     output_path: &Path,
     config: &TestArchiveConfig,
+) -> Result<PathBuf, crate::Error> {
+    build_test_archive(output_path, config.clone(), None)
+}
+
+/// Create a test MPQ archive, optionally reusing (attributes) data that was
+/// already generated for the same file set
+///
+/// Takes the configuration by value so file data moves into the builder
+/// instead of being copied for every archive.
+fn build_test_archive(
+    output_path: &Path,
+    config: TestArchiveConfig,
+    cached_attributes: Option<Vec<u8>>,
 ) -> Result<PathBuf, crate::Error> {
     let mut builder = if config.include_listfile {
         // If we're manually including a listfile, don't auto-generate
@@ -287,8 +309,8 @@ pub fn create_test_archive(
         ArchiveBuilder::new().listfile_option(crate::ListfileOption::Generate)
     };
 
-    // Set version
-    builder = builder.version(config.version);
+    // Set version; test archives favor fast compression over ratio
+    builder = builder.version(config.version).compression_level(1);
 
     // Set block size if specified
     if let Some(block_size) = config.block_size {
@@ -297,11 +319,28 @@ pub fn create_test_archive(
 
     // Note: hash_table_size is automatically determined by the builder
 
+    // Generate the special files while the file data is still borrowed
+    let listfile = config.include_listfile.then(|| {
+        let mut listfile_content =
+            Vec::with_capacity(config.files.iter().map(|f| f.name.len() + 1).sum::<usize>());
+        for (i, file) in config.files.iter().enumerate() {
+            if i > 0 {
+                listfile_content.push(b'\n');
+            }
+            listfile_content.extend_from_slice(file.name.as_bytes());
+        }
+        listfile_content
+    });
+    let attributes = config.include_attributes.then(|| {
+        cached_attributes
+            .unwrap_or_else(|| generate_attributes(&config.files, config.attributes_md5))
+    });
+
     // Add files
-    for file in &config.files {
+    for file in config.files {
         if file.encrypted {
             builder = builder.add_file_data_with_encryption(
-                file.data.clone(),
+                file.data,
                 &file.name,
                 file.compression.unwrap_or(0),
                 file.fix_key,
@@ -309,31 +348,24 @@ pub fn create_test_archive(
             );
         } else if let Some(compression) = file.compression {
             builder = builder.add_file_data_with_options(
-                file.data.clone(),
+                file.data,
                 &file.name,
                 compression,
                 false, // encrypt
                 0,     // locale
             );
         } else {
-            builder = builder.add_file_data(file.data.clone(), &file.name);
+            builder = builder.add_file_data(file.data, &file.name);
         }
     }
 
     // Add (listfile) if requested
-    if config.include_listfile {
-        let listfile_content = config
-            .files
-            .iter()
-            .map(|f| f.name.as_str())
-            .collect::<Vec<_>>()
-            .join("\n");
-        builder = builder.add_file_data(listfile_content.into_bytes(), "(listfile)");
+    if let Some(listfile_content) = listfile {
+        builder = builder.add_file_data(listfile_content, "(listfile)");
     }
 
     // Add (attributes) if requested
-    if config.include_attributes {
-        let attributes = generate_attributes(&config.files);
+    if let Some(attributes) = attributes {
         builder = builder.add_file_data(attributes, "(attributes)");
     }
 
@@ -347,15 +379,7 @@ pub fn create_test_archive(
 /// Generate compressible test data
 fn generate_compressible_data(size: usize) -> Vec<u8> {
     let pattern = b"This is test data that should compress well because it has repeated patterns. ";
-    let mut data = Vec::with_capacity(size);
-
-    while data.len() < size {
-        let remaining = size - data.len();
-        let to_copy = remaining.min(pattern.len());
-        data.extend_from_slice(&pattern[..to_copy]);
-    }
-
-    data
+    pattern.iter().cycle().take(size).copied().collect()
 }
 
 /// Generate random uncompressible data
@@ -368,37 +392,48 @@ fn generate_random_data(size: usize) -> Vec<u8> {
 
 /// Generate binary pattern data
 fn generate_binary_pattern(size: usize) -> Vec<u8> {
-    let mut data = Vec::with_capacity(size);
-    let mut value = 0u8;
-
-    while data.len() < size {
-        data.push(value);
-        value = value.wrapping_add(1);
-    }
-
-    data
+    // Byte values 0..=255, repeating
+    (0..size).map(|i| i as u8).collect()
 }
 
 /// Generate attributes file content
-fn generate_attributes(files: &[TestFile]) -> Vec<u8> {
-    // Simple attributes format: CRC32 and timestamps
-    let mut attributes = Vec::new();
-
-    // Version
-    attributes.extend_from_slice(&100u32.to_le_bytes());
-
-    // Flags (CRC32 + TIMESTAMP)
-    attributes.extend_from_slice(&0x03u32.to_le_bytes());
-
-    // For each file: CRC32 and timestamp
-    for file in files {
-        // CRC32 (simplified - just use data length as fake CRC)
-        attributes.extend_from_slice(&(file.data.len() as u32).to_le_bytes());
-        // Timestamp (fake)
-        attributes.extend_from_slice(&0x5F000000u32.to_le_bytes());
+///
+/// The (attributes) file has one row per block table entry. The builder adds
+/// (listfile) and (attributes) after `files`, so like StormLib they get
+/// trailing placeholder rows with no checksums.
+///
+/// MD5 hashes are only computed when requested; fixtures that never check
+/// them skip the hashing entirely.
+fn generate_attributes(files: &[TestFile], include_md5: bool) -> Vec<u8> {
+    let mut flags = AttributeFlags::CRC32 | AttributeFlags::FILETIME;
+    if include_md5 {
+        flags |= AttributeFlags::MD5;
     }
+    let flags = AttributeFlags::new(flags);
+
+    // The fixtures are small, so a single pass over each file on this thread
+    // is cheaper than spreading the checksums over worker threads
+    let mut file_attributes: Vec<FileAttributes> = files
+        .iter()
+        .map(|file| FileAttributes {
+            // Timestamp (fake)
+            filetime: Some(0x5F000000),
+            ..FileAttributes::from_data_with_flags(&file.data, flags)
+        })
+        .collect();
+
+    // Placeholder rows for (listfile) and (attributes)
+    file_attributes.extend([FileAttributes::new(), FileAttributes::new()]);
+
+    let attributes = Attributes {
+        version: Attributes::EXPECTED_VERSION,
+        flags,
+        file_attributes,
+    };
 
     attributes
+        .to_bytes()
+        .expect("serializing attributes to memory cannot fail")
 }
 
 /// Create all test archive types
@@ -414,28 +449,40 @@ pub fn create_all_test_archives(output_dir: &Path) -> Result<Vec<PathBuf>, crate
         FormatVersion::V4,
     ] {
         let config = TestArchiveConfig::minimal(version);
-        let path = create_test_archive(output_dir, &config)?;
+        let path = build_test_archive(output_dir, config, None)?;
         created.push(path);
     }
 
     // Create compressed archives
     for compression in ["zlib", "bzip2", "lzma", "sparse"] {
         let config = TestArchiveConfig::compressed(compression);
-        let path = create_test_archive(output_dir, &config)?;
+        let path = build_test_archive(output_dir, config, None)?;
         created.push(path);
     }
 
+    // The comprehensive file set is identical for v2 and later, so generate it
+    // and its (attributes) checksums once and only relabel it for v4
+    let comprehensive_v2 = TestArchiveConfig::comprehensive(FormatVersion::V2);
+    let comprehensive_v4 = TestArchiveConfig {
+        name: "comprehensive_v4".to_string(),
+        version: FormatVersion::V4,
+        ..comprehensive_v2.clone()
+    };
+    let comprehensive_attributes = comprehensive_v2
+        .include_attributes
+        .then(|| generate_attributes(&comprehensive_v2.files, comprehensive_v2.attributes_md5));
+
     // Create other test types
     let configs = vec![
-        TestArchiveConfig::encrypted(),
-        TestArchiveConfig::edge_cases(),
-        TestArchiveConfig::comprehensive(FormatVersion::V2),
-        TestArchiveConfig::comprehensive(FormatVersion::V4),
-        TestArchiveConfig::with_crc(),
+        (TestArchiveConfig::encrypted(), None),
+        (TestArchiveConfig::edge_cases(), None),
+        (comprehensive_v2, comprehensive_attributes.clone()),
+        (comprehensive_v4, comprehensive_attributes),
+        (TestArchiveConfig::with_crc(), None),
     ];
 
-    for config in configs {
-        let path = create_test_archive(output_dir, &config)?;
+    for (config, cached_attributes) in configs {
+        let path = build_test_archive(output_dir, config, cached_attributes)?;
         created.push(path);
     }
 
@@ -470,4 +517,30 @@ mod tests {
 
         assert!(result.exists());
     }
+
+    #[test]
+    fn test_comprehensive_archive_attributes_load() {
+        let temp_dir = TempDir::new().unwrap();
+        let config = TestArchiveConfig::comprehensive(FormatVersion::V2);
+        let path = create_test_archive(temp_dir.path(), &config).unwrap();
+        assert!(path.ends_with("comprehensive_v2.mpq"));
+
+        let mut archive = crate::Archive::open(&path).unwrap();
+        archive.load_attributes().unwrap();
+        let attributes = archive.attributes().expect("(attributes) should be loaded");
+
+        // One row per block: the files plus (listfile) and (attributes)
+        assert_eq!(attributes.file_attributes.len(), config.files.len() + 2);
+
+        for file in &config.files {
+            let info = archive.find_file(&file.name).unwrap().unwrap();
+            let attrs = archive.get_file_attributes(info.block_index).unwrap();
+            assert_eq!(
+                attrs.crc32,
+                Some(crc32fast::hash(&file.data)),
+                "CRC32 of {}",
+                file.name
+            );
+        }
+    }
 }
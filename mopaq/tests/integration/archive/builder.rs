@@ -256,6 +256,56 @@ fn test_hash_table_sizing() {
     }
 }
 
+#[test]
+fn test_hash_table_size_boundaries() {
+    let temp_dir = TempDir::new().unwrap();
+
+    // Entries include the generated listfile; tables are sized for at most
+    // 70% load and rounded up to a power of two
+    for (file_count, listfile, expected) in [
+        (0, ListfileOption::None, 16),
+        (10, ListfileOption::Generate, 16),
+        (11, ListfileOption::Generate, 32),
+        (21, ListfileOption::Generate, 32),
+        (22, ListfileOption::Generate, 64),
+        (11, ListfileOption::None, 16),
+        (12, ListfileOption::None, 32),
+    ] {
+        let archive_path = temp_dir.path().join(format!("sized_{file_count}.mpq"));
+        let mut builder = ArchiveBuilder::new().listfile_option(listfile);
+        for i in 0..file_count {
+            builder = builder.add_file_data(vec![i as u8; 16], &format!("file_{i:03}.dat"));
+        }
+        builder.build(&archive_path).unwrap();
+
+        let archive = Archive::open(&archive_path).unwrap();
+        assert_eq!(
+            archive.header().hash_table_size,
+            expected,
+            "hash table size for {file_count} files"
+        );
+    }
+}
+
+#[test]
+fn test_het_table_sized_like_hash_table() {
+    let temp_dir = TempDir::new().unwrap();
+    let archive_path = temp_dir.path().join("het_sized.mpq");
+
+    let mut builder = ArchiveBuilder::new().version(FormatVersion::V3);
+    for i in 0..11 {
+        builder = builder.add_file_data(vec![i as u8; 16], &format!("file_{i:03}.dat"));
+    }
+    builder.build(&archive_path).unwrap();
+
+    let archive = Archive::open(&archive_path).unwrap();
+    let het_header = archive.het_table().expect("HET table should exist").header;
+    let (hash_table_size, hash_entry_size) =
+        (het_header.hash_table_size, het_header.hash_entry_size);
+    assert_eq!(hash_table_size * 8 / hash_entry_size, 32);
+    assert_eq!(archive.header().hash_table_size, 32);
+}
+
 #[test]
 fn test_path_normalization() {
     let temp_dir = TempDir::new().unwrap();
@@ -647,3 +697,36 @@ fn test_v1_no_hi_block_table() {
     assert!(archive.header().hash_table_pos_hi.is_none());
     assert!(archive.header().block_table_pos_hi.is_none());
 }
+
+#[test]
+fn test_files_written_back_to_back() {
+    let temp_dir = TempDir::new().unwrap();
+    let archive_path = temp_dir.path().join("packed.mpq");
+
+    // Odd sizes that would be padded by any alignment scheme
+    ArchiveBuilder::new()
+        .version(FormatVersion::V1)
+        .add_file_data(vec![0x11; 1], "a.bin")
+        .add_file_data(vec![0x22; 17], "b.bin")
+        .add_file_data(vec![0x33; 4099], "c.bin")
+        .build(&archive_path)
+        .unwrap();
+
+    let archive = Archive::open(&archive_path).unwrap();
+    let header_size = archive.header().header_size;
+    let mut entries: Vec<_> = archive
+        .block_table()
+        .unwrap()
+        .entries()
+        .iter()
+        .filter(|entry| entry.file_size > 0)
+        .collect();
+    entries.sort_by_key(|entry| entry.file_pos);
+
+    // File data starts directly after the header and each file directly after
+    // the previous one, with no gaps between them
+    assert_eq!(entries[0].file_pos, header_size);
+    for pair in entries.windows(2) {
+        assert_eq!(pair[1].file_pos, pair[0].file_pos + pair[0].compressed_size);
+    }
+}
@@ -3,13 +3,16 @@
 use anyhow::{Context, Result};
 use colored::Colorize;
 use mopaq::compression::CompressionMethod;
-use mopaq::{Archive, ArchiveBuilder, FormatVersion, ListfileOption, OpenOptions, SignatureStatus};
+use mopaq::{
+    Archive, ArchiveBuilder, ArchiveInfo, FormatVersion, ListfileOption, OpenOptions,
+    SignatureStatus,
+};
 use serde_json;
 use std::collections::HashMap;
 use std::path::Path;
 use walkdir::WalkDir;
 
-use crate::output::{print_archive_info, print_json};
+use crate::output::{archive_info_json, print_archive_info, print_archive_info_data, print_json};
 use crate::{OutputFormat, GLOBAL_OPTS};
 
 #[derive(Debug, Clone)]
@@ -156,7 +159,102 @@ pub fn info(archive_path: &str) -> Result<()> {
 }
 
 /// Verify archive integrity
-pub fn verify(archive_path: &str, check_crc: bool, check_contents: bool) -> Result<()> {
+///
+/// With `show_info` the archive information is printed first, reusing the
+/// already opened archive instead of a separate `info` run. JSON output puts
+/// it under an `info` key of the verification report instead, so stdout stays
+/// a single document.
+pub fn verify(
+    archive_path: &str,
+    check_crc: bool,
+    check_contents: bool,
+    show_info: bool,
+) -> Result<()> {
+    let global_opts = GLOBAL_OPTS.get().expect("Global options not set");
+
+    let (results, info) = check_archive(archive_path, check_crc, check_contents, show_info)?;
+    print_detailed_verify_result(
+        &results,
+        info.as_ref(),
+        global_opts.output,
+        global_opts.quiet,
+    )?;
+
+    if !results.errors.is_empty() {
+        anyhow::bail!("Verification failed with {} errors", results.errors.len());
+    }
+
+    Ok(())
+}
+
+/// Verify several archives, reporting every failure
+///
+/// Text and CSV output print one report per archive. JSON output collects the
+/// reports into a single array, with an `error` entry for archives that could
+/// not be checked at all.
+pub fn verify_all(
+    archive_paths: &[String],
+    check_crc: bool,
+    check_contents: bool,
+    show_info: bool,
+) -> Result<()> {
+    let global_opts = GLOBAL_OPTS.get().expect("Global options not set");
+    let mut failed = 0;
+
+    if global_opts.output == OutputFormat::Json {
+        let mut reports = Vec::with_capacity(archive_paths.len());
+        for archive_path in archive_paths {
+            match check_archive(archive_path, check_crc, check_contents, show_info) {
+                Ok((results, info)) => {
+                    if !results.errors.is_empty() {
+                        failed += 1;
+                    }
+                    reports.push(verification_json(&results, info.as_ref()));
+                }
+                Err(e) => {
+                    failed += 1;
+                    reports.push(serde_json::json!({
+                        "archive": archive_path,
+                        "error": e.to_string(),
+                        "passed": false,
+                    }));
+                }
+            }
+        }
+
+        if !global_opts.quiet {
+            print_json(&reports)?;
+        }
+    } else {
+        for archive_path in archive_paths {
+            if let Err(e) = verify(archive_path, check_crc, check_contents, show_info) {
+                eprintln!("{}: {}", archive_path, e);
+                failed += 1;
+            }
+        }
+    }
+
+    if failed > 0 {
+        anyhow::bail!(
+            "{} of {} archives failed verification",
+            failed,
+            archive_paths.len()
+        );
+    }
+
+    Ok(())
+}
+
+/// Run the verification checks on one archive
+///
+/// Archive information requested with `show_info` is printed straight away for
+/// text and CSV output, and returned for embedding in JSON output.
+fn check_archive(
+    archive_path: &str,
+    check_crc: bool,
+    check_contents: bool,
+    show_info: bool,
+) -> Result<(VerificationResults, Option<ArchiveInfo>)> {
     let global_opts = GLOBAL_OPTS.get().expect("Global options not set");
 
     if !global_opts.quiet && global_opts.output == OutputFormat::Text {
@@ -169,6 +267,10 @@ pub fn verify(archive_path: &str, check_crc: bool, check_contents: bool) -> Resu
     // Get archive info for detailed verification information
     let archive_info = archive.get_info()?;
 
+    if show_info && global_opts.output != OutputFormat::Json {
+        print_archive_info_data(&archive_info, global_opts.output)?;
+    }
+
     // Start verification results
     let mut verification_results = VerificationResults {
         archive_path: archive_path.to_string(),
@@ -288,17 +390,9 @@ pub fn verify(archive_path: &str, check_crc: bool, check_contents: bool) -> Resu
         }
     }
 
-    // Print detailed verification results
-    print_detailed_verify_result(&verification_results, global_opts.output, global_opts.quiet)?;
-
-    if !verification_results.errors.is_empty() {
-        anyhow::bail!(
-            "Verification failed with {} errors",
-            verification_results.errors.len()
-        );
-    }
+    let info = (show_info && global_opts.output == OutputFormat::Json).then_some(archive_info);
 
-    Ok(())
+    Ok((verification_results, info))
 }
 
 #[derive(Debug)]
@@ -348,8 +442,60 @@ struct FileChecks {
     files_corrupted: usize, // Files found but failed to read/decompress (subset of files_found)
 }
 
+/// Build the JSON report for one verified archive
+fn verification_json(
+    results: &VerificationResults,
+    info: Option<&ArchiveInfo>,
+) -> serde_json::Value {
+    let mut report = serde_json::json!({
+        "archive": results.archive_path,
+        "format_version": results.format_version.number(),
+        "total_files": results.total_files,
+        "verified_files": results.verified_files,
+        "header_checks": {
+            "signature_valid": results.header_checks.signature_valid,
+            "version_supported": results.header_checks.version_supported,
+            "signature_status": format!("{:?}", results.header_checks.signature_status),
+        },
+        "table_checks": {
+            "hash_table_loaded": results.table_checks.hash_table_loaded,
+            "block_table_loaded": results.table_checks.block_table_loaded,
+            "het_table_loaded": results.table_checks.het_table_loaded,
+            "bet_table_loaded": results.table_checks.bet_table_loaded,
+            "md5_checksums": results.table_checks.md5_checksums.as_ref().map(|md5| {
+                serde_json::json!({
+                    "header_valid": md5.header_valid,
+                    "hash_table_valid": md5.hash_table_valid,
+                    "block_table_valid": md5.block_table_valid,
+                    "hi_block_table_valid": md5.hi_block_table_valid,
+                    "het_table_valid": md5.het_table_valid,
+                    "bet_table_valid": md5.bet_table_valid,
+                })
+            }),
+        },
+        "file_checks": {
+            "files_found": results.file_checks.files_found,
+            "files_readable": results.file_checks.files_readable,
+            "files_missing": results.file_checks.files_missing,
+            "files_corrupted": results.file_checks.files_corrupted,
+        },
+        "warnings": results.warnings,
+        "errors": results.errors.iter().map(|(f, e)| {
+            serde_json::json!({"file": f, "error": e})
+        }).collect::<Vec<_>>(),
+        "passed": results.errors.is_empty(),
+    });
+
+    if let Some(info) = info {
+        report["info"] = archive_info_json(info);
+    }
+
+    report
+}
+
 fn print_detailed_verify_result(
     results: &VerificationResults,
+    info: Option<&ArchiveInfo>,
     format: OutputFormat,
     quiet: bool,
 ) -> Result<()> {
@@ -362,7 +508,7 @@ fn print_detailed_verify_result(
             println!("\n{}", "Archive Verification Report".bold());
             println!("{}", "=".repeat(60));
             println!("Archive: {}", results.archive_path.cyan());
-            println!("Format: MPQ v{}", results.format_version as u16 + 1);
+            println!("Format: MPQ v{}", results.format_version.number());
 
             // Header verification
             println!("\n{}", "Header Verification".bold());
@@ -378,7 +524,7 @@ fn print_detailed_verify_result(
             println!(
                 "Format Version:     {}",
                 if results.header_checks.version_supported {
-                    format!("Supported (v{})", results.format_version as u16 + 1).green()
+                    format!("Supported (v{})", results.format_version.number()).green()
                 } else {
                     "Unsupported".red()
                 }
@@ -556,50 +702,12 @@ fn print_detailed_verify_result(
             }
         }
         OutputFormat::Json => {
-            let json_result = serde_json::json!({
-                "archive": results.archive_path,
-                "format_version": results.format_version as u16 + 1,
-                "total_files": results.total_files,
-                "verified_files": results.verified_files,
-                "header_checks": {
-                    "signature_valid": results.header_checks.signature_valid,
-                    "version_supported": results.header_checks.version_supported,
-                    "signature_status": format!("{:?}", results.header_checks.signature_status),
-                },
-                "table_checks": {
-                    "hash_table_loaded": results.table_checks.hash_table_loaded,
-                    "block_table_loaded": results.table_checks.block_table_loaded,
-                    "het_table_loaded": results.table_checks.het_table_loaded,
-                    "bet_table_loaded": results.table_checks.bet_table_loaded,
-                    "md5_checksums": results.table_checks.md5_checksums.as_ref().map(|md5| {
-                        serde_json::json!({
-                            "header_valid": md5.header_valid,
-                            "hash_table_valid": md5.hash_table_valid,
-                            "block_table_valid": md5.block_table_valid,
-                            "hi_block_table_valid": md5.hi_block_table_valid,
-                            "het_table_valid": md5.het_table_valid,
-                            "bet_table_valid": md5.bet_table_valid,
-                        })
-                    }),
-                },
-                "file_checks": {
-                    "files_found": results.file_checks.files_found,
-                    "files_readable": results.file_checks.files_readable,
-                    "files_missing": results.file_checks.files_missing,
-                    "files_corrupted": results.file_checks.files_corrupted,
-                },
-                "warnings": results.warnings,
-                "errors": results.errors.iter().map(|(f, e)| {
-                    serde_json::json!({"file": f, "error": e})
-                }).collect::<Vec<_>>(),
-                "passed": results.errors.is_empty(),
-            });
-            print_json(&json_result)?;
+            print_json(&verification_json(results, info))?;
         }
         OutputFormat::Csv => {
             println!("metric,value");
             println!("archive,{}", results.archive_path);
-            println!("format_version,{}", results.format_version as u16 + 1);
+            println!("format_version,{}", results.format_version.number());
             println!("total_files,{}", results.total_files);
             println!("verified_files,{}", results.verified_files);
             println!("errors,{}", results.errors.len());
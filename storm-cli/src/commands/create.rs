@@ -1,5 +1,6 @@
 //! Create command implementation
 
+use crate::output::format_size;
 use anyhow::{Context, Result};
 use colored::*;
 use indicatif::{ProgressBar, ProgressStyle};
@@ -74,7 +75,7 @@ pub fn create(archive_path: &str, source: &str, options: CreateOptions) -> Resul
     println!(
         "  {}: v{} ({})",
         "Format".bold(),
-        options.version as u16 + 1,
+        options.version.number(),
         format_version_name(options.version)
     );
     println!(
@@ -251,24 +252,6 @@ struct FileEntry {
     archive_name: String,
 }
 
-/// Format file size
-fn format_size(size: u64) -> String {
-    const UNITS: &[&str] = &["B", "KB", "MB", "GB"];
-    let mut size = size as f64;
-    let mut unit_index = 0;
-
-    while size >= 1024.0 && unit_index < UNITS.len() - 1 {
-        size /= 1024.0;
-        unit_index += 1;
-    }
-
-    if unit_index == 0 {
-        format!("{} {}", size as u64, UNITS[unit_index])
-    } else {
-        format!("{:.1} {}", size, UNITS[unit_index])
-    }
-}
-
 /// Get human-readable format version name
 fn format_version_name(version: FormatVersion) -> &'static str {
     match version {
@@ -2,7 +2,8 @@
 
 use anyhow::Result;
 use colored::Colorize;
-use mopaq::crypto::{decrypt_block, encrypt_block, hash_string, hash_type};
+use mopaq::crypto::{decrypt_block, encrypt_block, hash_string, hash_string_lookup, hash_type};
+use std::io::{self, Write};
 
 use crate::GLOBAL_OPTS;
 
@@ -36,8 +37,10 @@ pub fn test(test_name: Option<&str>) -> Result<()> {
 }
 
 fn test_hash_functions() -> Result<()> {
-    println!("{}", "Hash Function Tests".cyan());
-    println!("{}", "=".repeat(50));
+    // Buffer the report so each line doesn't flush stdout on its own
+    let mut out = io::BufWriter::new(io::stdout().lock());
+    writeln!(out, "{}", "Hash Function Tests".cyan())?;
+    writeln!(out, "{}", "=".repeat(50))?;
 
     let test_strings = [
         "(listfile)",
@@ -49,26 +52,20 @@ fn test_hash_functions() -> Result<()> {
     ];
 
     for test_str in &test_strings {
-        println!("\n{}: {}", "Input".bold(), test_str);
-        println!(
-            "  Table offset: {:#010x}",
-            hash_string(test_str, hash_type::TABLE_OFFSET)
-        );
-        println!(
-            "  Name A:       {:#010x}",
-            hash_string(test_str, hash_type::NAME_A)
-        );
-        println!(
-            "  Name B:       {:#010x}",
-            hash_string(test_str, hash_type::NAME_B)
-        );
-        println!(
+        writeln!(out, "\n{}: {}", "Input".bold(), test_str)?;
+        let (table_offset, name_a, name_b) = hash_string_lookup(test_str);
+        writeln!(out, "  Table offset: {:#010x}", table_offset)?;
+        writeln!(out, "  Name A:       {:#010x}", name_a)?;
+        writeln!(out, "  Name B:       {:#010x}", name_b)?;
+        writeln!(
+            out,
             "  File key:     {:#010x}",
             hash_string(test_str, hash_type::FILE_KEY)
-        );
+        )?;
     }
 
-    println!("\n{} Hash tests completed", "✓".green());
+    writeln!(out, "\n{} Hash tests completed", "✓".green())?;
+    out.flush()?;
     Ok(())
 }
 
@@ -106,19 +103,21 @@ fn test_encryption() -> Result<()> {
 }
 
 fn test_decryption() -> Result<()> {
-    println!("{}", "Decryption Tests".cyan());
-    println!("{}", "=".repeat(50));
+    let mut out = io::BufWriter::new(io::stdout().lock());
+    writeln!(out, "{}", "Decryption Tests".cyan())?;
+    writeln!(out, "{}", "=".repeat(50))?;
 
     // Test known encrypted values
-    println!("Testing decryption with known values...");
+    writeln!(out, "Testing decryption with known values...")?;
 
     // Test file key generation
     let filenames = ["war3map.j", "(listfile)", "(attributes)"];
     for filename in &filenames {
         let file_key = hash_string(filename, hash_type::FILE_KEY);
-        println!("File key for '{}': {:#010x}", filename, file_key);
+        writeln!(out, "File key for '{}': {:#010x}", filename, file_key)?;
     }
 
-    println!("\n{} Decryption tests completed", "✓".green());
+    writeln!(out, "\n{} Decryption tests completed", "✓".green())?;
+    out.flush()?;
     Ok(())
 }
@@ -1,11 +1,13 @@
 //! Extract command implementation
 
-use crate::{output, OutputFormat, GLOBAL_OPTS};
+use crate::output::{self, format_size};
+use crate::{OutputFormat, GLOBAL_OPTS};
 use anyhow::{Context, Result};
 use colored::*;
 use indicatif::{ProgressBar, ProgressStyle};
 use mopaq::Archive;
 use serde::{Deserialize, Serialize};
+use std::collections::HashSet;
 use std::fs;
 use std::path::{Path, PathBuf, MAIN_SEPARATOR};
 
@@ -77,7 +79,7 @@ fn extract_single_file(
     }
 
     let start_time = std::time::Instant::now();
-    let result = extract_file_safe(archive, filename, output_dir);
+    let result = extract_file_safe(archive, filename, output_dir, &mut HashSet::new());
 
     match opts.output {
         OutputFormat::Json | OutputFormat::Csv => {
@@ -244,6 +246,9 @@ fn extract_using_listfile(
         None
     };
 
+    // Directories already created during this extraction
+    let mut created_dirs = HashSet::new();
+
     for filename in &filenames {
         // Skip the listfile itself
         if filename == "(listfile)" {
@@ -267,7 +272,7 @@ fn extract_using_listfile(
             &format!("Extracting {} → {}", filename, output_path.display()),
         );
 
-        match extract_file_safe(archive, filename, output_dir) {
+        match extract_file_safe(archive, filename, output_dir, &mut created_dirs) {
             Ok(size) => {
                 if opts.output == OutputFormat::Text && !opts.quiet && progress.is_none() {
                     // Only print individual files if not using progress bar
@@ -390,7 +395,15 @@ fn extract_using_listfile(
 }
 
 /// Safely extract a file, returning the file size on success
-fn extract_file_safe(archive: &mut Archive, filename: &str, output_dir: &str) -> Result<usize> {
+///
+/// `created_dirs` remembers directories created by earlier calls so that
+/// files sharing a directory don't repeat the `create_dir_all` syscalls.
+fn extract_file_safe(
+    archive: &mut Archive,
+    filename: &str,
+    output_dir: &str,
+    created_dirs: &mut HashSet<PathBuf>,
+) -> Result<usize> {
     // Read the file data
     let data = archive
         .read_file(filename)
@@ -401,12 +414,15 @@ fn extract_file_safe(archive: &mut Archive, filename: &str, output_dir: &str) ->
 
     // Create parent directories if needed
     if let Some(parent) = output_path.parent() {
-        fs::create_dir_all(parent).with_context(|| {
-            format!(
-                "Failed to create directory structure for: {:?}",
-                output_path
-            )
-        })?;
+        if !created_dirs.contains(parent) {
+            fs::create_dir_all(parent).with_context(|| {
+                format!(
+                    "Failed to create directory structure for: {:?}",
+                    output_path
+                )
+            })?;
+            created_dirs.insert(parent.to_path_buf());
+        }
     }
 
     // Write the file
@@ -429,21 +445,3 @@ fn build_output_path(output_dir: &str, archive_filename: &str) -> PathBuf {
 
     Path::new(output_dir).join(normalized_path)
 }
-
-/// Format file size in human-readable format
-fn format_size(size: u64) -> String {
-    const UNITS: &[&str] = &["B", "KB", "MB", "GB"];
-    let mut size = size as f64;
-    let mut unit_index = 0;
-
-    while size >= 1024.0 && unit_index < UNITS.len() - 1 {
-        size /= 1024.0;
-        unit_index += 1;
-    }
-
-    if unit_index == 0 {
-        format!("{} {}", size as u64, UNITS[unit_index])
-    } else {
-        format!("{:.1} {}", size, UNITS[unit_index])
-    }
-}
@@ -2,9 +2,10 @@
 
 use anyhow::{Context, Result};
 use colored::Colorize;
-use glob::Pattern;
+use glob::{MatchOptions, Pattern};
 use mopaq::Archive;
 use regex::Regex;
+use std::collections::HashSet;
 use std::fs;
 use std::path::{Path, PathBuf};
 
@@ -111,6 +112,7 @@ pub fn extract(
         let output_dir = output.unwrap_or(".");
         let file_entries = archive.list()?;
         let files: Vec<String> = file_entries.into_iter().map(|e| e.name).collect();
+        let mut created_dirs = HashSet::new();
 
         for filename in &files {
             let data = match archive.read_file(filename) {
@@ -127,9 +129,11 @@ pub fn extract(
                 PathBuf::from(output_dir).join(Path::new(filename).file_name().unwrap())
             };
 
-            // Create parent directories if needed
+            // Create parent directories if needed, once per directory
             if let Some(parent) = output_path.parent() {
-                fs::create_dir_all(parent)?;
+                if created_dirs.insert(parent.to_path_buf()) {
+                    fs::create_dir_all(parent)?;
+                }
             }
 
             fs::write(&output_path, data)?;
@@ -182,21 +186,16 @@ pub fn find(archive_path: &str, pattern: &str, regex: bool, ignore_case: bool) -
 
         files.into_iter().filter(|f| re.is_match(f)).collect()
     } else {
-        let glob = if ignore_case {
-            Pattern::new(&pattern.to_lowercase()).context("Invalid glob pattern")?
-        } else {
-            Pattern::new(pattern).context("Invalid glob pattern")?
+        let glob = Pattern::new(pattern).context("Invalid glob pattern")?;
+        // Let the matcher fold case instead of lowercasing every file name
+        let options = MatchOptions {
+            case_sensitive: !ignore_case,
+            ..MatchOptions::new()
         };
 
         files
             .into_iter()
-            .filter(|f| {
-                if ignore_case {
-                    glob.matches(&f.to_lowercase())
-                } else {
-                    glob.matches(f)
-                }
-            })
+            .filter(|f| glob.matches_with(f, options))
             .collect()
     };
 
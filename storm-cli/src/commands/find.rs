@@ -1,5 +1,6 @@
 //! Find command implementation
 
+use crate::output::format_size;
 use anyhow::{Context, Result};
 use colored::*;
 use mopaq::{tables::BlockEntry, Archive};
@@ -137,22 +138,15 @@ pub fn find(archive_path: &str, filename: &str, verbose: bool) -> Result<()> {
                     }
                 }
 
-                // Calculate expected hash values
-                use mopaq::{hash_string, hash_type};
+                // Calculate expected hash values; the three lookup hashes come
+                // from a single pass over the name
+                use mopaq::{hash_string, hash_string_lookup, hash_type};
+                let (table_offset, name_a, name_b) = hash_string_lookup(filename);
                 println!();
                 println!("  Expected hash values:");
-                println!(
-                    "    TABLE_OFFSET: 0x{:08X}",
-                    hash_string(filename, hash_type::TABLE_OFFSET)
-                );
-                println!(
-                    "    NAME_A: 0x{:08X}",
-                    hash_string(filename, hash_type::NAME_A)
-                );
-                println!(
-                    "    NAME_B: 0x{:08X}",
-                    hash_string(filename, hash_type::NAME_B)
-                );
+                println!("    TABLE_OFFSET: 0x{:08X}", table_offset);
+                println!("    NAME_A: 0x{:08X}", name_a);
+                println!("    NAME_B: 0x{:08X}", name_b);
                 println!(
                     "    FILE_KEY: 0x{:08X}",
                     hash_string(filename, hash_type::FILE_KEY)
@@ -184,10 +178,7 @@ pub fn find(archive_path: &str, filename: &str, verbose: bool) -> Result<()> {
 
             if verbose {
                 // Show hash calculation details
-                use mopaq::{hash_string, hash_type};
-                let hash_offset = hash_string(filename, hash_type::TABLE_OFFSET);
-                let hash_a = hash_string(filename, hash_type::NAME_A);
-                let hash_b = hash_string(filename, hash_type::NAME_B);
+                let (hash_offset, hash_a, hash_b) = mopaq::hash_string_lookup(filename);
 
                 println!();
                 println!("Hash lookup details:");
@@ -218,24 +209,6 @@ pub fn find(archive_path: &str, filename: &str, verbose: bool) -> Result<()> {
     }
 }
 
-/// Format file size in human-readable format
-fn format_size(size: u64) -> String {
-    const UNITS: &[&str] = &["B", "KB", "MB", "GB"];
-    let mut size = size as f64;
-    let mut unit_index = 0;
-
-    while size >= 1024.0 && unit_index < UNITS.len() - 1 {
-        size /= 1024.0;
-        unit_index += 1;
-    }
-
-    if unit_index == 0 {
-        format!("{} {}", size as u64, UNITS[unit_index])
-    } else {
-        format!("{:.1} {}", size, UNITS[unit_index])
-    }
-}
-
 /// Format locale code
 fn format_locale(locale: u16) -> &'static str {
     match locale {
@@ -1,6 +1,7 @@
 //! List command implementation
 
-use crate::{output, OutputFormat, GLOBAL_OPTS};
+use crate::output::{self, format_size};
+use crate::{OutputFormat, GLOBAL_OPTS};
 use anyhow::{Context, Result};
 use colored::*;
 use mopaq::{tables::BlockEntry, Archive};
@@ -633,24 +634,6 @@ fn format_file_flags_vec(flags: u32) -> Vec<String> {
     parts
 }
 
-/// Format file size in human-readable format
-fn format_size(size: u64) -> String {
-    const UNITS: &[&str] = &["B", "KB", "MB", "GB"];
-    let mut size = size as f64;
-    let mut unit_index = 0;
-
-    while size >= 1024.0 && unit_index < UNITS.len() - 1 {
-        size /= 1024.0;
-        unit_index += 1;
-    }
-
-    if unit_index == 0 {
-        format!("{} {}", size as u64, UNITS[unit_index])
-    } else {
-        format!("{:.1} {}", size, UNITS[unit_index])
-    }
-}
-
 /// Format file flags as a readable string
 fn format_file_flags(flags: u32) -> String {
     let mut parts = Vec::new();
@@ -175,8 +175,9 @@ enum ArchiveCommands {
 
     /// Verify archive integrity
     Verify {
-        /// Path to the MPQ archive
-        archive: String,
+        /// Paths to the MPQ archives
+        #[arg(required = true)]
+        archives: Vec<String>,
 
         /// Check CRC values
         #[arg(long)]
@@ -185,6 +186,10 @@ enum ArchiveCommands {
         /// Check file contents
         #[arg(long)]
         check_contents: bool,
+
+        /// Print archive information before verifying
+        #[arg(long)]
+        show_info: bool,
     },
 
     /// List files in an archive (alias for 'file list')
@@ -558,11 +563,17 @@ fn main() -> Result<()> {
                 commands::archive::info(&archive)?;
             }
             ArchiveCommands::Verify {
-                archive,
+                archives,
                 check_crc,
                 check_contents,
+                show_info,
             } => {
-                commands::archive::verify(&archive, check_crc, check_contents)?;
+                if let [archive] = archives.as_slice() {
+                    commands::archive::verify(archive, check_crc, check_contents, show_info)?;
+                } else {
+                    // Verify every archive in this process and report all failures
+                    commands::archive::verify_all(&archives, check_crc, check_contents, show_info)?;
+                }
             }
             ArchiveCommands::List {
                 archive,
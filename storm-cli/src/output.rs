@@ -2,13 +2,17 @@ use crate::{OutputFormat, GLOBAL_OPTS};
 use colored::*;
 use mopaq::{Archive, ArchiveInfo, FileEntry, SignatureStatus};
 use serde::Serialize;
-use std::io;
+use std::io::{self, Write};
 
 /// Print JSON output
+///
+/// The document is serialized straight into locked stdout rather than built
+/// up as an intermediate `String` first.
 pub fn print_json<T: Serialize>(data: &T) -> Result<(), io::Error> {
-    let json = serde_json::to_string_pretty(data)?;
-    println!("{}", json);
-    Ok(())
+    let mut out = io::BufWriter::new(io::stdout().lock());
+    serde_json::to_writer_pretty(&mut out, data)?;
+    writeln!(out)?;
+    out.flush()
 }
 
 /// Print archive information
@@ -20,10 +24,15 @@ pub fn print_archive_info(archive: &mut Archive, format: OutputFormat) -> Result
         )
     })?;
 
+    print_archive_info_data(&info, format)
+}
+
+/// Print already collected archive information
+pub fn print_archive_info_data(info: &ArchiveInfo, format: OutputFormat) -> Result<(), io::Error> {
     match format {
-        OutputFormat::Text => print_archive_info_text(&info),
-        OutputFormat::Json => print_archive_info_json(&info),
-        OutputFormat::Csv => print_archive_info_csv(&info),
+        OutputFormat::Text => print_archive_info_text(info),
+        OutputFormat::Json => print_archive_info_json(info),
+        OutputFormat::Csv => print_archive_info_csv(info),
     }
 }
 
@@ -36,7 +45,7 @@ fn print_archive_info_text(info: &ArchiveInfo) -> Result<(), io::Error> {
     println!(
         "{}: {} bytes",
         "Archive size".bright_cyan(),
-        format_size(info.file_size)
+        format_byte_size(info.file_size)
     );
     println!(
         "{}: 0x{:X}",
@@ -46,7 +55,7 @@ fn print_archive_info_text(info: &ArchiveInfo) -> Result<(), io::Error> {
     println!(
         "{}: v{}",
         "Format version".bright_cyan(),
-        info.format_version as u16 + 1
+        info.format_version.number()
     );
 
     // File statistics
@@ -186,20 +195,42 @@ fn print_md5_status(name: &str, valid: bool) {
     );
 }
 
-fn format_size(bytes: u64) -> String {
-    const UNITS: &[&str] = &["B", "KB", "MB", "GB", "TB"];
-    let mut size = bytes as f64;
-    let mut unit_index = 0;
+/// Scale a byte count to the largest of `units` it reaches
+///
+/// Returns the scaled value and the index of its unit.
+fn scale_size(bytes: u64, units: &[&str]) -> (f64, usize) {
+    // Each unit is 2^10 times the previous one, so the unit follows from the
+    // position of the highest set bit
+    let unit_index = (bytes.checked_ilog2().unwrap_or(0) / 10).min(units.len() as u32 - 1);
+    let size = bytes as f64 / (1u64 << (10 * unit_index)) as f64;
+    (size, unit_index as usize)
+}
 
-    while size >= 1024.0 && unit_index < UNITS.len() - 1 {
-        size /= 1024.0;
-        unit_index += 1;
+/// Format file size in human-readable format, e.g. "100 B" or "1.5 KB"
+///
+/// Used by the create, extract, find and list command modules, which are not
+/// part of the `commands` module tree yet.
+#[allow(dead_code)]
+pub(crate) fn format_size(size: u64) -> String {
+    const UNITS: &[&str] = &["B", "KB", "MB", "GB"];
+    let (scaled, unit_index) = scale_size(size, UNITS);
+
+    if unit_index == 0 {
+        format!("{} {}", size, UNITS[unit_index])
+    } else {
+        format!("{:.1} {}", scaled, UNITS[unit_index])
     }
+}
+
+/// Format a size for archive and file listings, leaving plain byte counts bare
+fn format_byte_size(bytes: u64) -> String {
+    const UNITS: &[&str] = &["B", "KB", "MB", "GB", "TB"];
+    let (scaled, unit_index) = scale_size(bytes, UNITS);
 
     if unit_index == 0 {
         format!("{}", bytes)
     } else {
-        format!("{:.2} {}", size, UNITS[unit_index])
+        format!("{:.2} {}", scaled, UNITS[unit_index])
     }
 }
 
@@ -215,11 +246,16 @@ fn format_signature_status(status: &SignatureStatus) -> ColoredString {
 }
 
 fn print_archive_info_json(info: &ArchiveInfo) -> Result<(), io::Error> {
-    let json_info = serde_json::json!({
+    print_json(&archive_info_json(info))
+}
+
+/// Build the JSON document describing an archive
+pub fn archive_info_json(info: &ArchiveInfo) -> serde_json::Value {
+    serde_json::json!({
         "path": info.path.display().to_string(),
         "file_size": info.file_size,
         "archive_offset": info.archive_offset,
-        "format_version": info.format_version as u16 + 1,
+        "format_version": info.format_version.number(),
         "file_count": info.file_count,
         "max_file_count": info.max_file_count,
         "sector_size": info.sector_size,
@@ -274,9 +310,7 @@ fn print_archive_info_json(info: &ArchiveInfo) -> Result<(), io::Error> {
             "het_table_valid": md5.het_table_valid,
             "bet_table_valid": md5.bet_table_valid,
         })),
-    });
-
-    print_json(&json_info)
+    })
 }
 
 fn print_archive_info_csv(info: &ArchiveInfo) -> Result<(), io::Error> {
@@ -284,7 +318,7 @@ fn print_archive_info_csv(info: &ArchiveInfo) -> Result<(), io::Error> {
     println!("path,{}", info.path.display());
     println!("file_size,{}", info.file_size);
     println!("archive_offset,{}", info.archive_offset);
-    println!("format_version,{}", info.format_version as u16 + 1);
+    println!("format_version,{}", info.format_version.number());
     println!("file_count,{}", info.file_count);
     println!("max_file_count,{}", info.max_file_count);
     println!("sector_size,{}", info.sector_size);
@@ -462,8 +496,8 @@ pub fn print_file_list_verbose(files: &[FileEntry]) -> Result<(), io::Error> {
             println!(
                 "{:<40} {:>12} {:>12} {:>6}% {:>10X} {:>10X} {}",
                 display_name,
-                format_size(entry.size),
-                format_size(entry.compressed_size),
+                format_byte_size(entry.size),
+                format_byte_size(entry.compressed_size),
                 compression_ratio,
                 hash1,
                 hash2,
@@ -473,8 +507,8 @@ pub fn print_file_list_verbose(files: &[FileEntry]) -> Result<(), io::Error> {
             println!(
                 "{:<40} {:>12} {:>12} {:>6}% {}",
                 display_name,
-                format_size(entry.size),
-                format_size(entry.compressed_size),
+                format_byte_size(entry.size),
+                format_byte_size(entry.compressed_size),
                 compression_ratio,
                 flags_str
             );
@@ -496,8 +530,8 @@ pub fn print_file_list_verbose(files: &[FileEntry]) -> Result<(), io::Error> {
     println!(
         "{:<40} {:>12} {:>12} {:>6}%",
         format!("Total: {} files", files.len()).bold(),
-        format_size(total_size).bold(),
-        format_size(total_compressed).bold(),
+        format_byte_size(total_size).bold(),
+        format_byte_size(total_compressed).bold(),
         total_ratio.to_string().bold()
     );
 
@@ -540,7 +574,7 @@ pub fn print_file_list_verbose(files: &[FileEntry]) -> Result<(), io::Error> {
             let saved = total_size - total_compressed;
             println!(
                 "Space saved:       {} ({:.1}%)",
-                format_size(saved),
+                format_byte_size(saved),
                 ((saved as f64 / total_size as f64) * 100.0)
             );
         }
@@ -572,3 +606,29 @@ pub fn print_file_info(filename: &str, size: u64, format: OutputFormat) -> Resul
     }
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_format_size_boundaries() {
+        assert_eq!(format_size(1023), "1023 B");
+        assert_eq!(format_size(1024), "1.0 KB");
+        assert_eq!(format_size(1024 * 1024 - 1), "1024.0 KB");
+        assert_eq!(format_size(1024 * 1024), "1.0 MB");
+        // GB is the largest unit
+        assert_eq!(format_size(1 << 40), "1024.0 GB");
+    }
+
+    #[test]
+    fn test_format_byte_size_boundaries() {
+        assert_eq!(format_byte_size(0), "0");
+        assert_eq!(format_byte_size(1023), "1023");
+        assert_eq!(format_byte_size(1024), "1.00 KB");
+        assert_eq!(format_byte_size(1024 * 1024), "1.00 MB");
+        assert_eq!(format_byte_size(1 << 40), "1.00 TB");
+        // TB is the largest unit
+        assert_eq!(format_byte_size(1 << 50), "1024.00 TB");
+    }
+}
@@ -0,0 +1,57 @@
+//! Integration tests for verify command
+
+use assert_cmd::Command;
+use std::fs;
+use std::path::{Path, PathBuf};
+use tempfile::TempDir;
+
+/// Create an archive named `name` from a couple of small files
+fn create_archive(temp_dir: &Path, name: &str) -> PathBuf {
+    let source_dir = temp_dir.join(format!("{}_source", name));
+    let archive_path = temp_dir.join(format!("{}.mpq", name));
+
+    fs::create_dir_all(&source_dir).unwrap();
+    fs::write(source_dir.join("file1.txt"), "Hello, MPQ!").unwrap();
+    fs::write(source_dir.join("file2.txt"), "Another file").unwrap();
+
+    let mut cmd = Command::cargo_bin("storm-cli").unwrap();
+    cmd.arg("archive")
+        .arg("create")
+        .arg(archive_path.to_str().unwrap())
+        .arg(source_dir.to_str().unwrap())
+        .assert()
+        .success();
+
+    archive_path
+}
+
+#[test]
+fn test_verify_multiple_archives_json() {
+    let temp_dir = TempDir::new().unwrap();
+    let first = create_archive(temp_dir.path(), "first");
+    let second = create_archive(temp_dir.path(), "second");
+
+    let mut cmd = Command::cargo_bin("storm-cli").unwrap();
+    let output = cmd
+        .arg("-o")
+        .arg("json")
+        .arg("archive")
+        .arg("verify")
+        .arg("--show-info")
+        .arg(first.to_str().unwrap())
+        .arg(second.to_str().unwrap())
+        .output()
+        .unwrap();
+    assert!(output.status.success());
+
+    // The whole of stdout must be one JSON document holding both reports
+    let reports: serde_json::Value = serde_json::from_slice(&output.stdout).unwrap();
+    let reports = reports.as_array().expect("expected a JSON array");
+    assert_eq!(reports.len(), 2);
+
+    for (report, path) in reports.iter().zip([&first, &second]) {
+        assert_eq!(report["archive"], path.to_str().unwrap());
+        assert_eq!(report["passed"], true);
+        assert!(report["info"].is_object());
+    }
+}
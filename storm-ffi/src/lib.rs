@@ -7,8 +7,10 @@ use std::ffi::{CStr, CString};
 use std::fs;
 use std::path::Path;
 use std::ptr;
+use std::sync::atomic::{AtomicUsize, Ordering};
 use std::sync::{LazyLock, Mutex};
 
+use mopaq::special_files::{AttributeFlags, FileAttributes};
 use mopaq::{Archive, ArchiveBuilder, FormatVersion, ListfileOption};
 
 /// Archive handle type
@@ -17,8 +19,8 @@ pub type HANDLE = *mut c_void;
 /// Invalid handle value
 pub const INVALID_HANDLE_VALUE: HANDLE = ptr::null_mut();
 
-// Thread-safe handle management with lazy initialization
-static NEXT_HANDLE: LazyLock<Mutex<usize>> = LazyLock::new(|| Mutex::new(1));
+// Thread-safe handle management; the counter is initialized at compile time
+static NEXT_HANDLE: AtomicUsize = AtomicUsize::new(1);
 static ARCHIVES: LazyLock<Mutex<HashMap<usize, ArchiveHandle>>> =
     LazyLock::new(|| Mutex::new(HashMap::new()));
 static FILES: LazyLock<Mutex<HashMap<usize, FileHandle>>> =
@@ -153,10 +155,7 @@ pub unsafe extern "C" fn SFileOpenArchive(
     match Archive::open(filename_str) {
         Ok(archive) => {
             // Generate new handle ID
-            let mut next_id = NEXT_HANDLE.lock().unwrap();
-            let handle_id = *next_id;
-            *next_id += 1;
-            drop(next_id);
+            let handle_id = NEXT_HANDLE.fetch_add(1, Ordering::Relaxed);
 
             // Store archive
             let archive_handle = ArchiveHandle {
@@ -357,10 +356,7 @@ pub unsafe extern "C" fn SFileOpenFileEx(
             match archive_handle.archive.read_file(filename_str) {
                 Ok(data) => {
                     // Generate file handle
-                    let mut next_id = NEXT_HANDLE.lock().unwrap();
-                    let file_id = *next_id;
-                    *next_id += 1;
-                    drop(next_id);
+                    let file_id = NEXT_HANDLE.fetch_add(1, Ordering::Relaxed);
 
                     // Create file handle
                     let file = FileHandle {
@@ -838,12 +834,16 @@ pub unsafe extern "C" fn SFileEnumFiles(
         return false;
     };
 
+    // Simple pattern matching (just * for now); strip the wildcards once
+    // rather than for every entry
+    let match_all = pattern == "*";
+    let needle = pattern.replace('*', "");
+
     // List files
     match archive_handle.archive.list() {
         Ok(entries) => {
             for entry in entries {
-                // Simple pattern matching (just * for now)
-                if pattern == "*" || entry.name.contains(&pattern.replace("*", "")) {
+                if match_all || entry.name.contains(needle.as_str()) {
                     let c_name = match CString::new(entry.name.as_str()) {
                         Ok(s) => s,
                         Err(_) => continue,
@@ -1075,12 +1075,16 @@ pub unsafe extern "C" fn SFileVerifyFile(
     // If no flags specified, verify everything available
     let verify_flags = if flags == 0 { SFILE_VERIFY_ALL } else { flags };
 
+    // The file is read at most once; every requested check reuses the same data
+    let mut file_data = None;
+
     // Verify sector CRC (if requested and available)
     if (verify_flags & SFILE_VERIFY_SECTOR_CRC) != 0 && file_info.has_sector_crc() {
         // Reading the file automatically validates sector CRCs
         match archive_handle.archive.read_file(filename_str) {
-            Ok(_) => {
+            Ok(data) => {
                 // File read successfully, CRCs validated automatically
+                file_data = Some(data);
             }
             Err(mopaq::Error::ChecksumMismatch { .. }) => {
                 set_last_error(ERROR_FILE_CORRUPT);
@@ -1093,61 +1097,53 @@ pub unsafe extern "C" fn SFileVerifyFile(
         }
     }
 
-    // Verify file CRC32 from attributes (if requested and available)
-    if (verify_flags & SFILE_VERIFY_FILE_CRC) != 0 {
+    // Verify file CRC32 and MD5 from attributes (if requested and available)
+    if (verify_flags & (SFILE_VERIFY_FILE_CRC | SFILE_VERIFY_FILE_MD5)) != 0 {
         // Load attributes if not already loaded
         let _ = archive_handle.archive.load_attributes();
 
-        if let Some(attrs) = archive_handle
+        let (expected_crc, expected_md5) = match archive_handle
             .archive
             .get_file_attributes(file_info.block_index)
         {
-            if let Some(expected_crc) = attrs.crc32 {
-                // Read file data to calculate CRC
-                match archive_handle.archive.read_file(filename_str) {
-                    Ok(data) => {
-                        let actual_crc = crc32fast::hash(&data);
-                        if actual_crc != expected_crc {
-                            set_last_error(ERROR_FILE_CORRUPT);
-                            return false;
-                        }
-                    }
-                    Err(_) => {
-                        set_last_error(ERROR_FILE_CORRUPT);
-                        return false;
-                    }
-                }
-            }
-        }
-    }
-
-    // Verify file MD5 from attributes (if requested and available)
-    if (verify_flags & SFILE_VERIFY_FILE_MD5) != 0 {
-        // Load attributes if not already loaded
-        let _ = archive_handle.archive.load_attributes();
+            Some(attrs) => (
+                attrs
+                    .crc32
+                    .filter(|_| (verify_flags & SFILE_VERIFY_FILE_CRC) != 0),
+                attrs
+                    .md5
+                    .filter(|_| (verify_flags & SFILE_VERIFY_FILE_MD5) != 0),
+            ),
+            None => (None, None),
+        };
 
-        if let Some(attrs) = archive_handle
-            .archive
-            .get_file_attributes(file_info.block_index)
-        {
-            if let Some(expected_md5) = attrs.md5 {
-                // Read file data to calculate MD5
-                match archive_handle.archive.read_file(filename_str) {
-                    Ok(data) => {
-                        use md5::{Digest, Md5};
-                        let mut hasher = Md5::new();
-                        hasher.update(&data);
-                        let actual_md5: [u8; 16] = hasher.finalize().into();
-                        if actual_md5 != expected_md5 {
-                            set_last_error(ERROR_FILE_CORRUPT);
-                            return false;
-                        }
-                    }
+        if expected_crc.is_some() || expected_md5.is_some() {
+            let data = match file_data {
+                Some(data) => data,
+                None => match archive_handle.archive.read_file(filename_str) {
+                    Ok(data) => data,
                     Err(_) => {
                         set_last_error(ERROR_FILE_CORRUPT);
                         return false;
                     }
-                }
+                },
+            };
+
+            // Only hash what is being checked; CRC32 and MD5 share a single pass
+            let mut checksums = 0;
+            if expected_crc.is_some() {
+                checksums |= AttributeFlags::CRC32;
+            }
+            if expected_md5.is_some() {
+                checksums |= AttributeFlags::MD5;
+            }
+            let actual =
+                FileAttributes::from_data_with_flags(&data, AttributeFlags::new(checksums));
+            let crc_mismatch = expected_crc.is_some_and(|crc| actual.crc32 != Some(crc));
+            let md5_mismatch = expected_md5.is_some_and(|md5| actual.md5 != Some(md5));
+            if crc_mismatch || md5_mismatch {
+                set_last_error(ERROR_FILE_CORRUPT);
+                return false;
             }
         }
     }